@@ -0,0 +1,105 @@
+"""Measure the per-query latency of MachoAnalyzer's database lookups, with and without the secondary indexes.
+"""
+import argparse
+import random
+import re
+import timeit
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from strongarm.macho import MachoAnalyzer, MachoParser
+from strongarm.macho.macho_analyzer import ANALYZER_SQL_CALLABLE_SYMBOL_INDEXES, ANALYZER_SQL_XREF_INDEXES
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "TestBinary1"
+
+
+def sample_queries(analyzer: MachoAnalyzer, count: int) -> List[Tuple[str, str, Sequence[Tuple]]]:
+    """Build (description, SQL, parameter sets) for each query issued by the analyzer's lookup APIs."""
+    db = analyzer._db_handle
+    rng = random.Random(0)
+
+    def params(column_query: str) -> List[Tuple]:
+        values = [row for row in db.execute(column_query)]
+        return [rng.choice(values) for _ in range(count)] if values else []
+
+    return [
+        (
+            "calls_to",
+            "SELECT * from function_calls WHERE destination_address=?",
+            params("SELECT destination_address FROM function_calls"),
+        ),
+        (
+            "objc_calls_to",
+            "SELECT * from objc_msgSends WHERE class_name IN (?) AND selector IN (?)",
+            params("SELECT class_name, selector FROM objc_msgSends"),
+        ),
+        (
+            "string_xrefs_to",
+            "SELECT accessor_func_start_address, accessor_address from string_xrefs WHERE string_literal=?",
+            params("SELECT string_literal FROM string_xrefs"),
+        ),
+        (
+            "strings_in_func",
+            "SELECT accessor_address, string_literal from string_xrefs WHERE accessor_func_start_address=?",
+            params("SELECT accessor_func_start_address FROM string_xrefs"),
+        ),
+        (
+            "get_basic_block_boundaries",
+            "SELECT start_address, end_address FROM basic_blocks WHERE entry_point=?",
+            params("SELECT entry_point FROM basic_blocks"),
+        ),
+        (
+            "callable_symbol_for_address",
+            "SELECT * from named_callable_symbols WHERE address=?",
+            params("SELECT address FROM named_callable_symbols"),
+        ),
+        (
+            "callable_symbol_for_symbol_name",
+            "SELECT * from named_callable_symbols WHERE symbol_name=?",
+            params("SELECT symbol_name FROM named_callable_symbols"),
+        ),
+    ]
+
+
+def time_queries(analyzer: MachoAnalyzer, queries: List[Tuple[str, str, Sequence[Tuple]]]) -> List[float]:
+    """Return the mean latency of each query, in microseconds."""
+    db = analyzer._db_handle
+    latencies = []
+    for _, sql, param_sets in queries:
+        elapsed = timeit.timeit(lambda: [db.execute(sql, p).fetchall() for p in param_sets], number=1)
+        latencies.append(elapsed / max(len(param_sets), 1) * 1_000_000)
+    return latencies
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="MachoAnalyzer query latency benchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--queries", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    binary = MachoParser(args.binary_path).get_arm64_slice()
+    if not binary:
+        raise ValueError(f"{args.binary_path} has no arm64 slice")
+    analyzer = MachoAnalyzer.get_analyzer(binary)
+    # Populate the xref tables
+    analyzer.calls_to(binary.get_virtual_base())
+
+    queries = sample_queries(analyzer, args.queries)
+    indexed = time_queries(analyzer, queries)
+
+    index_names = re.findall(r"CREATE INDEX IF NOT EXISTS (\w+)", ANALYZER_SQL_CALLABLE_SYMBOL_INDEXES)
+    index_names += re.findall(r"CREATE INDEX IF NOT EXISTS (\w+)", ANALYZER_SQL_XREF_INDEXES)
+    for index_name in index_names:
+        analyzer._db_handle.execute(f"DROP INDEX {index_name}")
+    unindexed = time_queries(analyzer, queries)
+
+    print(f"{args.binary_path.name}: mean latency per query (us)")
+    print(f"\t{'query':<34}{'no indexes':>12}{'indexed':>12}")
+    for (name, _, _), before, after in zip(queries, unindexed, indexed):
+        print(f"\t{name:<34}{before:>12.1f}{after:>12.1f}")
+
+    MachoAnalyzer.clear_cache()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Compare ArchIndependentStructure against the ctypes-backed implementation it replaced, and against a variant that
+decodes its fields on first access.
+
+The benchmark reads a large synthetic __objc_const section, built by repeating a binary's own __objc_const, as a
+sequence of 64-bit objc_method structures. It reports how quickly the structures are created and read, and how much
+memory is needed to keep them all alive.
+"""
+import argparse
+import timeit
+import tracemalloc
+from ctypes import Structure, sizeof
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Type, Union
+
+from strongarm.macho import MachoParser
+from strongarm.macho.arch_independent_structs import ObjcMethodStruct, _unpacker_for_layout
+from strongarm.macho.macho_definitions import ObjcMethod64
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "TestBinary1"
+
+
+class CtypesStructure:
+    """The previous implementation of ArchIndependentStructure."""
+
+    def __init__(self, binary_offset: int, struct_bytes: bytes, backing_layout: Type[Structure]) -> None:
+        struct = backing_layout.from_buffer_copy(struct_bytes)
+        for field_name, *_ in struct._fields_:
+            setattr(self, field_name, getattr(struct, field_name))
+        self.sizeof = sizeof(backing_layout)
+        self.binary_offset = binary_offset
+
+    def __getattr__(self, key: str) -> Any:
+        raise AttributeError(key)
+
+
+class LazyObjcMethodStruct(ObjcMethodStruct):
+    """An ObjcMethodStruct that keeps a copy of its bytes, and decodes its fields the first time one is accessed."""
+
+    __slots__ = ("_struct_bytes",)
+
+    def __init__(
+        self, binary_offset: int, struct_bytes: Union[bytes, bytearray, memoryview], backing_layout: Type[Structure]
+    ) -> None:
+        size = _unpacker_for_layout(backing_layout).size
+        if len(struct_bytes) < size:
+            raise ValueError(f"Buffer size too small ({len(struct_bytes)} instead of at least {size} bytes)")
+        # Store each attribute through its slot, bypassing __setattr__
+        _SLOT_SETTERS["_struct_bytes"](self, bytes(struct_bytes[:size]))
+        _SLOT_SETTERS["_backing_layout"](self, backing_layout)
+        _SLOT_SETTERS["sizeof"](self, size)
+        _SLOT_SETTERS["binary_offset"](self, binary_offset)
+
+    def __getattr__(self, name: str) -> Any:
+        if name != "_struct_bytes" and self._struct_bytes is not None:
+            self._decode_fields()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Decode the fields before one is assigned, so that decoding can't overwrite the assigned value
+        if self._struct_bytes is not None:
+            self._decode_fields()
+        object.__setattr__(self, name, value)
+
+    def _decode_fields(self) -> None:
+        struct_bytes: Optional[bytes] = self._struct_bytes
+        _SLOT_SETTERS["_struct_bytes"](self, None)
+        unpacker = _unpacker_for_layout(self._backing_layout)
+        for name, value in zip(unpacker.field_names, unpacker.unpack(struct_bytes or b"")):
+            _SLOT_SETTERS[name](self, value)
+
+
+_SLOT_SETTERS = {
+    name: getattr(LazyObjcMethodStruct, name).__set__
+    for name in ("_struct_bytes", "_backing_layout", "sizeof", "binary_offset", "name", "signature", "implementation")
+}
+
+
+def read_structures(struct_type: Callable[..., Any], section: bytes, access_fields: bool) -> List[Any]:
+    stride = sizeof(ObjcMethod64)
+    structures = []
+    for offset in range(0, len(section) - stride + 1, stride):
+        struct = struct_type(offset, section[offset : offset + stride], ObjcMethod64)
+        if access_fields:
+            struct.name
+        structures.append(struct)
+    return structures
+
+
+def peak_memory(struct_type: Callable[..., Any], section: bytes, access_fields: bool) -> int:
+    tracemalloc.start()
+    structures = read_structures(struct_type, section, access_fields)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del structures
+    return peak
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="ArchIndependentStructure allocation and throughput benchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--size-mb", type=float, default=8, help="Size of the synthetic __objc_const section")
+    args = arg_parser.parse_args()
+
+    binary = MachoParser(args.binary_path).get_arm64_slice()
+    if not binary:
+        raise ValueError(f"{args.binary_path} has no arm64 slice")
+    objc_const = binary.section_with_name("__objc_const", "__DATA")
+    if not objc_const:
+        raise ValueError(f"{args.binary_path} has no __objc_const section")
+
+    section = bytes(binary.get_bytes(objc_const.offset, objc_const.size))
+    section = section * max(1, int(args.size_mb * 1024 * 1024 / len(section)))
+    struct_count = len(section) // sizeof(ObjcMethod64)
+
+    print(f"{len(section) / (1024 * 1024):.1f}MB __objc_const, {struct_count} objc_method structures")
+    implementations = [("ctypes", CtypesStructure), ("slots", ObjcMethodStruct), ("lazy slots", LazyObjcMethodStruct)]
+    print(f"\t{'':<28}" + "".join(f"{name:>12}" for name, _ in implementations))
+    for access_fields, label in ((False, "create"), (True, "create + read a field")):
+        times = [
+            timeit.timeit(lambda: read_structures(struct_type, section, access_fields), number=1)
+            for _, struct_type in implementations
+        ]
+        print(f"\t{label + ' (s)':<28}" + "".join(f"{duration:>12.3f}" for duration in times))
+
+        peaks = [peak_memory(struct_type, section, access_fields) for _, struct_type in implementations]
+        print(f"\t{label + ' (MB)':<28}" + "".join(f"{peak / (1024 * 1024):>12.1f}" for peak in peaks))
+
+
+if __name__ == "__main__":
+    main()
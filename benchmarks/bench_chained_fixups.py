@@ -0,0 +1,176 @@
+"""Compare the chained fixup walker against the per-pointer structure reads it replaced.
+
+The benchmark parses the binary's chained fixups repeatedly, building the rebase and bind maps stored on MachoBinary,
+and the compact ChainedFixupTables they're built from. With --workers, it also times walking the chains in a pool of
+worker processes. Starting the pool costs more than walking the chains of small binaries.
+"""
+import argparse
+import timeit
+from ctypes import c_uint16, c_uint32, c_uint64, sizeof
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from strongarm.logger import strongarm_logger
+from strongarm.macho import MachoBinary, MachoParser, StaticFilePointer, VirtualMemoryPointer
+from strongarm.macho.arch_independent_structs import (
+    MachoDyldChainedFixupsHeader,
+    MachoDyldChainedPtr64Bind,
+    MachoDyldChainedPtr64Rebase,
+    MachoDyldChainedStartsInImage,
+    MachoDyldChainedStartsInSegment,
+)
+from strongarm.macho.dyld_info_parser import DyldBoundSymbol, DyldChainedPointerMagics, DyldInfoParser
+from strongarm.macho.macho_definitions import MachoDyldChainedPtrFormat
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "iOS15_chained_fixup_pointers"
+
+logger = strongarm_logger.getChild(__file__)
+
+
+def per_pointer_process_fixup_pointer_chain(
+    binary: MachoBinary,
+    dyld_bound_symbols_table: List[DyldBoundSymbol],
+    chain_base: int,
+    pointer_format: MachoDyldChainedPtrFormat,
+) -> Tuple[Dict[VirtualMemoryPointer, VirtualMemoryPointer], Dict[VirtualMemoryPointer, DyldBoundSymbol]]:
+    """The previous implementation of DyldInfoParser._process_fixup_pointer_chain()."""
+    rebased_pointers: Dict[VirtualMemoryPointer, VirtualMemoryPointer] = {}
+    dyld_bound_addresses_to_symbols: Dict[VirtualMemoryPointer, DyldBoundSymbol] = {}
+    virtual_base = binary.get_virtual_base()
+    for _ in range(10000):
+        chained_rebase_ptr = binary.read_struct(chain_base, MachoDyldChainedPtr64Rebase)
+        if chained_rebase_ptr.bind == 1:
+            chained_bind_ptr = binary.read_struct(chain_base, MachoDyldChainedPtr64Bind)
+            bound_symbol = dyld_bound_symbols_table[chained_bind_ptr.ordinal]
+            logger.debug(
+                f"\t\t{hex(chain_base)}: BIND\tordinal {chained_bind_ptr.ordinal}\t"
+                f"addend {chained_bind_ptr.addend}\treserved {chained_bind_ptr.reserved}\t"
+                f"next {chained_bind_ptr.next}\tsymbol {bound_symbol.name}\t\t"
+                f"dylib {binary.dylib_name_for_library_ordinal(bound_symbol.library_ordinal)}"
+            )
+            dyld_bound_addresses_to_symbols[VirtualMemoryPointer(chain_base + virtual_base)] = bound_symbol
+            chain_base += chained_bind_ptr.next * 4
+        else:
+            chained_ptr_raw = binary.read_word(chain_base, word_type=c_uint64, virtual=False)
+            logger.debug(
+                f"\t\t{hex(chain_base)}: DyldChainedPtr64Rebase(raw: {hex(chained_ptr_raw)}) "
+                f"target={StaticFilePointer(chained_rebase_ptr.target)}"
+            )
+            if pointer_format == MachoDyldChainedPtrFormat.DYLD_CHAINED_PTR_64_OFFSET:
+                rebase_target = virtual_base + chained_rebase_ptr.target
+            elif pointer_format == MachoDyldChainedPtrFormat.DYLD_CHAINED_PTR_64:
+                rebase_target = chained_rebase_ptr.target
+            else:
+                raise NotImplementedError(f"Unsupported chained pointer format: {pointer_format}")
+
+            rebased_pointers[VirtualMemoryPointer(chain_base + virtual_base)] = VirtualMemoryPointer(rebase_target)
+            chain_base += chained_rebase_ptr.next * 4
+
+        if chained_rebase_ptr.next == 0:
+            break
+    else:
+        raise ValueError("Failed to find end of fixup pointer chain")
+
+    return rebased_pointers, dyld_bound_addresses_to_symbols
+
+
+def per_pointer_parse_chained_fixups(
+    binary: MachoBinary,
+) -> Tuple[Dict[VirtualMemoryPointer, VirtualMemoryPointer], Dict[VirtualMemoryPointer, DyldBoundSymbol]]:
+    """The previous implementation of DyldInfoParser.parse_chained_fixups()."""
+    assert binary._dyld_chained_fixups
+    chained_fixups_data_start = binary._dyld_chained_fixups.dataoff
+    chained_fixups_header = binary.read_struct(chained_fixups_data_start, MachoDyldChainedFixupsHeader)
+    dyld_bound_symbols = DyldInfoParser._read_chained_imports(binary, chained_fixups_data_start, chained_fixups_header)
+    dyld_bound_addresses_to_symbols: Dict[VirtualMemoryPointer, DyldBoundSymbol] = {}
+
+    chained_starts_in_image_off = chained_fixups_data_start + chained_fixups_header.starts_offset
+    chained_starts_in_image = binary.read_struct(chained_starts_in_image_off, MachoDyldChainedStartsInImage)
+    chained_starts_in_seg_offsets_base = chained_starts_in_image_off + chained_starts_in_image.sizeof
+
+    rebases: Dict[VirtualMemoryPointer, VirtualMemoryPointer] = {}
+    for segment_idx in range(chained_starts_in_image.seg_count):
+        starts_in_seg_struct_offset = binary.read_word(
+            chained_starts_in_seg_offsets_base + (segment_idx * sizeof(c_uint32)), virtual=False, word_type=c_uint32
+        )
+        if starts_in_seg_struct_offset == 0:
+            continue
+
+        starts_in_seg_addr = chained_starts_in_image_off + starts_in_seg_struct_offset
+        chained_starts_in_seg = binary.read_struct(starts_in_seg_addr, MachoDyldChainedStartsInSegment)
+        offset_in_page_start = starts_in_seg_addr + chained_starts_in_seg.sizeof
+        for page_idx in range(chained_starts_in_seg.page_count):
+            offset_in_page = binary.read_word(
+                offset_in_page_start + (page_idx * sizeof(c_uint16)), virtual=False, word_type=c_uint16
+            )
+            if offset_in_page == DyldChainedPointerMagics.DYLD_CHAINED_PTR_NO_STARTS_IN_PAGE:
+                continue
+            elif offset_in_page == DyldChainedPointerMagics.DYLD_CHAINED_PTR_START_MULTI:
+                raise NotImplementedError("Encountered page with multiple chain starts")
+
+            chain_base = (
+                chained_starts_in_seg.segment_offset + (page_idx * chained_starts_in_seg.page_size) + offset_in_page
+            )
+            rebases_in_chain, bound_addresses_in_chain = per_pointer_process_fixup_pointer_chain(
+                binary, dyld_bound_symbols, chain_base, chained_starts_in_seg.pointer_format
+            )
+            rebases.update(rebases_in_chain)
+            dyld_bound_addresses_to_symbols.update(bound_addresses_in_chain)
+
+    return rebases, dyld_bound_addresses_to_symbols
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Chained fixup parsing benchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--number", type=int, default=200, help="Times to parse the chained fixups")
+    arg_parser.add_argument(
+        "--workers", type=int, default=1, help="Also walk the chains in a pool of this many processes, if above 1"
+    )
+    args = arg_parser.parse_args()
+
+    binary = MachoParser(args.binary_path).get_arm64_slice()
+    if not binary:
+        raise ValueError(f"{args.binary_path} has no arm64 slice")
+    if not binary._dyld_chained_fixups:
+        raise ValueError(f"{args.binary_path} doesn't use chained fixup pointers")
+
+    expected_rebases, expected_binds = per_pointer_parse_chained_fixups(binary)
+    rebases, binds = DyldInfoParser.parse_chained_fixups(binary)
+    assert rebases == expected_rebases
+    assert {address: symbol.name for address, symbol in binds.items()} == {
+        address: symbol.name for address, symbol in expected_binds.items()
+    }
+
+    # Every implementation reads the chained imports table the same way. Report it separately
+    imports_time = timeit.timeit(
+        lambda: DyldInfoParser._read_chained_imports(
+            binary,
+            binary._dyld_chained_fixups.dataoff,  # type: ignore
+            binary.read_struct(binary._dyld_chained_fixups.dataoff, MachoDyldChainedFixupsHeader),  # type: ignore
+        ),
+        number=args.number,
+    )
+    per_pointer_time = timeit.timeit(lambda: per_pointer_parse_chained_fixups(binary), number=args.number)
+    dicts_time = timeit.timeit(lambda: DyldInfoParser.parse_chained_fixups(binary), number=args.number)
+    tables_time = timeit.timeit(lambda: DyldInfoParser.read_chained_fixup_tables(binary), number=args.number)
+    timings = [("per-pointer", per_pointer_time), ("dicts", dicts_time), ("tables", tables_time)]
+    if args.workers > 1:
+        DyldInfoParser.CHAINED_FIXUP_WORKERS = args.workers
+        DyldInfoParser.CHAINED_FIXUP_MIN_CHUNK_SIZE = 1
+        parallel_time = timeit.timeit(lambda: DyldInfoParser.read_chained_fixup_tables(binary), number=args.number)
+        timings.append((f"tables, {args.workers} workers", parallel_time))
+
+    print(f"{args.binary_path.name}: {len(rebases)} rebases, {len(binds)} binds, parsed {args.number} times")
+    print(f"\t{'':<24}{'total':>10}{'chains':>10}{'speedup':>10}")
+    print(f"\t{'chained imports':<24}{imports_time:>9.3f}s")
+    for label, total_time in timings:
+        chains_time = total_time - imports_time
+        print(
+            f"\t{label:<24}{total_time:>9.3f}s{chains_time:>9.3f}s"
+            f"{(per_pointer_time - imports_time) / chains_time:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare MachoAnalyzer's classref index against the scans it replaced.
+
+Each query is issued for a sample of the binary's imported and local class names, as a rule engine would.
+"""
+import argparse
+import random
+import timeit
+from pathlib import Path
+from typing import Optional
+
+from more_itertools import first
+
+from strongarm.macho import MachoAnalyzer, MachoParser, VirtualMemoryPointer
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "TestBinary1"
+
+
+def scan_classref_for_class_name(analyzer: MachoAnalyzer, class_name: str) -> Optional[VirtualMemoryPointer]:
+    """The previous implementation of MachoAnalyzer.classref_for_class_name()."""
+    classrefs = [
+        addr
+        for addr, name in analyzer.imported_symbols_to_symbol_names.items()
+        if name == class_name and analyzer.binary.section_name_for_address(addr) == "__objc_classrefs"
+    ]
+    if len(classrefs):
+        return classrefs[0]
+
+    class_locations = [x.raw_struct.binary_offset for x in analyzer.objc_classes() if x.name == class_name]
+    if not len(class_locations):
+        return None
+    class_location = VirtualMemoryPointer(class_locations[0])
+
+    classref_addr_to_pointer_map = analyzer.binary.read_pointer_section("__objc_classrefs")
+    return first((k for k, v in classref_addr_to_pointer_map.items() if v == class_location), None)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Classref lookup benchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--queries", type=int, default=500)
+    args = arg_parser.parse_args()
+
+    binary = MachoParser(args.binary_path).get_arm64_slice()
+    if not binary:
+        raise ValueError(f"{args.binary_path} has no arm64 slice")
+    analyzer = MachoAnalyzer.get_analyzer(binary)
+
+    # Warm the analyzer's other caches, so only the classref lookups are timed
+    analyzer.imported_symbols_to_symbol_names
+    analyzer.class_for_class_pointer_map
+
+    imported_class_names = sorted(
+        {name for name in analyzer.imported_symbols_to_symbol_names.values() if name.startswith("_OBJC_CLASS_$_")}
+    )
+    local_class_names = [objc_class.name for objc_class in analyzer.objc_classes()]
+    if not imported_class_names or not local_class_names:
+        raise ValueError(f"{args.binary_path} needs both imported and local classes")
+
+    rng = random.Random(0)
+    print(f"{args.binary_path.name}: mean latency per classref_for_class_name() query (us)")
+    index_time = timeit.timeit(lambda: analyzer.classref_index, number=1)
+    print(f"\t{'building the index':<20}{index_time * 1_000_000:>12.1f}")
+    print(f"\t{'classes':<20}{'scan':>12}{'indexed':>12}{'speedup':>10}")
+    for kind, names in [("imported", imported_class_names), ("local", local_class_names)]:
+        sample = [rng.choice(names) for _ in range(args.queries)]
+
+        def scan() -> object:
+            return [scan_classref_for_class_name(analyzer, name) for name in sample]
+
+        def indexed() -> object:
+            return [analyzer.classref_for_class_name(name) for name in sample]
+
+        assert scan() == indexed()
+        scan_time = timeit.timeit(scan, number=1) / args.queries * 1_000_000
+        indexed_time = timeit.timeit(indexed, number=1) / args.queries * 1_000_000
+        print(f"\t{kind:<20}{scan_time:>12.1f}{indexed_time:>12.1f}{scan_time / indexed_time:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Measure how MachoAnalyzer's function-boundary computation scales with the number of worker processes.
+"""
+import argparse
+import os
+import timeit
+from pathlib import Path
+from typing import List
+
+from strongarm.macho import MachoAnalyzer, MachoParser
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "TestBinary1"
+
+
+def time_function_boundaries(binary_path: Path, worker_count: int, repeat: int) -> float:
+    """Return the best time, in seconds, to compute the function boundaries of a freshly parsed binary."""
+    MachoAnalyzer.FUNCTION_BOUNDARY_WORKERS = worker_count
+    timings = []
+    for _ in range(repeat):
+        binary = MachoParser(binary_path).get_arm64_slice()
+        if not binary:
+            raise ValueError(f"{binary_path} has no arm64 slice")
+        analyzer = MachoAnalyzer.get_analyzer(binary)
+        timings.append(timeit.timeit(lambda: analyzer.warm(stages=["function_boundaries"]), number=1))
+        MachoAnalyzer.clear_cache()
+    return min(timings)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="MachoAnalyzer function-boundary scaling benchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    # Powers of two up to --max-workers, then --max-workers itself
+    worker_counts: List[int] = sorted({2**i for i in range(8) if 2**i < args.max_workers} | {args.max_workers})
+
+    print(f"{args.binary_path.name}: function boundaries + basic blocks ({os.cpu_count()} CPUs)")
+    print(f"\t{'workers':<10}{'seconds':>10}{'speedup':>10}")
+    baseline = None
+    for worker_count in worker_counts:
+        elapsed = time_function_boundaries(args.binary_path, worker_count, args.repeat)
+        baseline = baseline or elapsed
+        print(f"\t{worker_count:<10}{elapsed:>10.3f}{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Compare LEB128 stream decoding against the per-value read_uleb() calls it replaced.
+
+The benchmark decodes a synthetic LC_FUNCTION_STARTS blob, built by repeating the spacing of a binary's own functions,
+then interprets the binary's bind and lazy-bind opcodes.
+"""
+import argparse
+import timeit
+from ctypes import c_int8, c_long, sizeof
+from pathlib import Path
+from typing import Dict, List, Set, Tuple, Union
+
+from strongarm.macho import (
+    BindOpcode,
+    DyldBoundSymbol,
+    DyldInfoParser,
+    MachoBinary,
+    MachoParser,
+    StaticFilePointer,
+    VirtualMemoryPointer,
+)
+from strongarm.macho.leb128 import read_uleb_deltas
+from strongarm.macho.macho_definitions import BindSpecialDylibOrdinal
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "TestBinary1"
+
+
+def per_value_read_uleb(data: Union[bytes, bytearray, memoryview], offset: int) -> Tuple[int, int]:
+    """The previous implementation of DyldInfoParser.read_uleb()."""
+    byte = data[offset]
+    offset += 1
+
+    result = byte & 0x7F
+    shift = 7
+    while byte & 0x80:
+        byte = data[offset]
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        offset += 1
+
+    # attempt to catch signed values and convert them if encountered
+    if result > 0x100000000:
+        result = c_long(result).value
+
+    return result, offset
+
+
+def per_value_get_functions(function_starts_data: bytes, virtual_base: int) -> Set[VirtualMemoryPointer]:
+    """The previous implementation of MachoBinary.get_functions()."""
+    functions_list = set()
+    address = virtual_base
+    idx = 0
+    while idx < len(function_starts_data):
+        address_delta, idx = per_value_read_uleb(function_starts_data, idx)
+        address += address_delta
+        functions_list.add(VirtualMemoryPointer(address))
+    return functions_list
+
+
+def per_value_parse_dyld_bytestream(
+    binary: MachoBinary, file_offset: StaticFilePointer, size: int
+) -> Dict[VirtualMemoryPointer, DyldBoundSymbol]:
+    """The previous implementation of DyldInfoParser._parse_dyld_bytestream()."""
+    dyld_stubs_to_symbols: Dict[VirtualMemoryPointer, DyldBoundSymbol] = {}
+    binding_info = bytes(binary.get_bytes(file_offset, size))
+    pointer_size = sizeof(binary.platform_word_type)
+
+    index = 0
+    name_bytes = b""
+    segment_index = 0
+    segment_offset = 0
+    library_ordinal = 0
+
+    def commit_stub() -> None:
+        segment_start = binary.segment_for_index(segment_index).vmaddr
+        stub_addr = VirtualMemoryPointer(segment_start + segment_offset)
+        dyld_stubs_to_symbols[stub_addr] = DyldBoundSymbol(
+            binary, stub_addr, library_ordinal, name_bytes.decode("utf-8")
+        )
+
+    while index != len(binding_info):
+        byte = binding_info[index]
+        opcode = BindOpcode.BIND_OPCODE_MASK & byte
+        immediate = BindOpcode.BIND_IMMEDIATE_MASK & byte
+        index += 1
+
+        if opcode == BindOpcode.BIND_OPCODE_DONE:
+            pass
+        elif opcode == BindOpcode.BIND_OPCODE_SET_DYLIB_ORDINAL_IMM:
+            library_ordinal = immediate
+        elif opcode == BindOpcode.BIND_OPCODE_SET_DYLIB_ORDINAL_ULEB:
+            library_ordinal, index = per_value_read_uleb(binding_info, index)
+        elif opcode == BindOpcode.BIND_OPCODE_SET_DYLIB_SPECIAL_IMM:
+            if immediate == 0:
+                library_ordinal = BindSpecialDylibOrdinal.BIND_SPECIAL_DYLIB_SELF
+            else:
+                library_ordinal = c_int8(BindOpcode.BIND_OPCODE_MASK | immediate).value
+        elif opcode == BindOpcode.BIND_OPCODE_SET_SYMBOL_TRAILING_FLAGS_IMM:
+            name_end = binding_info.find(b"\0", index)
+            name_bytes = binding_info[index:name_end]
+            index = name_end
+        elif opcode == BindOpcode.BIND_OPCODE_SET_TYPE_IMM:
+            pass
+        elif opcode == BindOpcode.BIND_OPCODE_SET_ADDEND_SLEB:
+            _, index = per_value_read_uleb(binding_info, index)
+        elif opcode == BindOpcode.BIND_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB:
+            segment_index = immediate
+            segment_offset, index = per_value_read_uleb(binding_info, index)
+        elif opcode == BindOpcode.BIND_OPCODE_ADD_ADDR_ULEB:
+            addend, index = per_value_read_uleb(binding_info, index)
+            segment_offset += addend
+        elif opcode == BindOpcode.BIND_OPCODE_DO_BIND:
+            commit_stub()
+            segment_offset += pointer_size
+        elif opcode == BindOpcode.BIND_OPCODE_DO_BIND_ADD_ADDR_ULEB:
+            commit_stub()
+            addend, index = per_value_read_uleb(binding_info, index)
+            segment_offset += pointer_size + addend
+        elif opcode == BindOpcode.BIND_OPCODE_DO_BIND_ADD_ADDR_IMM_SCALED:
+            commit_stub()
+            segment_offset += pointer_size + (immediate * pointer_size)
+        elif opcode == BindOpcode.BIND_OPCODE_DO_BIND_ULEB_TIMES_SKIPPING_ULEB:
+            count, index = per_value_read_uleb(binding_info, index)
+            skip, index = per_value_read_uleb(binding_info, index)
+            for _ in range(count):
+                commit_stub()
+                segment_offset += pointer_size + skip
+        elif opcode == BindOpcode.BIND_OPCODE_THREADED:
+            if immediate == BindOpcode.BIND_SUBOPCODE_THREADED_SET_BIND_ORDINAL_TABLE_SIZE_ULEB:
+                _, index = per_value_read_uleb(binding_info, index)
+
+    return dyld_stubs_to_symbols
+
+
+def encode_uleb(value: int) -> bytes:
+    encoded = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if not value:
+            encoded.append(byte)
+            return bytes(encoded)
+        encoded.append(byte | 0x80)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="LEB128 stream decoding benchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--functions", type=int, default=300000, help="Entries in the synthetic function starts")
+    arg_parser.add_argument("--number", type=int, default=20, help="Times to interpret the bind opcodes")
+    args = arg_parser.parse_args()
+
+    binary = MachoParser(args.binary_path).get_arm64_slice()
+    if not binary:
+        raise ValueError(f"{args.binary_path} has no arm64 slice")
+    if not binary.dyld_info:
+        raise ValueError(f"{args.binary_path} has no LC_DYLD_INFO")
+
+    # Repeat the spacing of the binary's own functions to build a large LC_FUNCTION_STARTS blob
+    virtual_base = int(binary.get_virtual_base())
+    function_starts = binary.get_function_starts()
+    deltas: List[int] = [function_starts[0] - virtual_base] + [
+        function_starts[i + 1] - function_starts[i] for i in range(len(function_starts) - 1)
+    ]
+    deltas = (deltas * (args.functions // len(deltas) + 1))[: args.functions]
+    function_starts_data = b"".join(map(encode_uleb, deltas)) + b"\x00\x00\x00\x00"
+
+    expected_functions = per_value_get_functions(function_starts_data, virtual_base)
+    assert set(read_uleb_deltas(function_starts_data, virtual_base)) == expected_functions
+
+    per_value_functions_time = timeit.timeit(
+        lambda: per_value_get_functions(function_starts_data, virtual_base), number=1
+    )
+    array_time = timeit.timeit(lambda: read_uleb_deltas(function_starts_data, virtual_base), number=1)
+    set_time = timeit.timeit(
+        lambda: set(map(VirtualMemoryPointer, read_uleb_deltas(function_starts_data, virtual_base))), number=1
+    )
+
+    dyld_info = binary.dyld_info
+    bind_streams = [(dyld_info.bind_off, dyld_info.bind_size), (dyld_info.lazy_bind_off, dyld_info.lazy_bind_size)]
+
+    def run_per_value_binds() -> None:
+        for offset, size in bind_streams:
+            per_value_parse_dyld_bytestream(binary, offset, size)  # type: ignore
+
+    def run_binds() -> None:
+        for offset, size in bind_streams:
+            DyldInfoParser._parse_dyld_bytestream(binary, offset, size)  # type: ignore
+
+    expected_binds = {}
+    binds = {}
+    for offset, size in bind_streams:
+        expected_binds.update(per_value_parse_dyld_bytestream(binary, offset, size))  # type: ignore
+        binds.update(DyldInfoParser._parse_dyld_bytestream(binary, offset, size))  # type: ignore
+    assert {address: symbol.name for address, symbol in binds.items()} == {
+        address: symbol.name for address, symbol in expected_binds.items()
+    }
+    per_value_binds_time = timeit.timeit(run_per_value_binds, number=args.number)
+    binds_time = timeit.timeit(run_binds, number=args.number)
+
+    print(f"{args.functions} synthetic function starts ({len(function_starts_data)} bytes)")
+    print(f"\t{'':<24}{'time':>10}{'speedup':>10}")
+    print(f"\t{'per-value, set':<24}{per_value_functions_time:>9.3f}s")
+    print(f"\t{'batch, array':<24}{array_time:>9.3f}s{per_value_functions_time / array_time:>9.1f}x")
+    print(f"\t{'batch, set':<24}{set_time:>9.3f}s{per_value_functions_time / set_time:>9.1f}x")
+    print(f"{args.binary_path.name}: {len(binds)} binds, interpreted {args.number} times")
+    print(f"\t{'per-value':<24}{per_value_binds_time:>9.3f}s")
+    print(f"\t{'cursor':<24}{binds_time:>9.3f}s{per_value_binds_time / binds_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compare answering many _objc_msgSend queries at once against a query per predicate.
+
+The predicates are sampled from the binary's own call-sites, as the rules of a scan would be: a third match a class,
+a third a selector, and a third a selector on a class.
+"""
+import argparse
+import random
+import timeit
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from strongarm.macho import MachoAnalyzer, MachoParser, ObjcMsgSendPredicate, ObjcMsgSendXref
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "TestBinary1"
+
+
+def interpolated_objc_calls_to(
+    analyzer: MachoAnalyzer, objc_class_names: List[str], objc_selectors: List[str], requires_class_and_sel_found: bool
+) -> List[ObjcMsgSendXref]:
+    """The previous implementation of MachoAnalyzer.objc_calls_to()."""
+    classes_int_list = ", ".join(f'"{x}"' for x in objc_class_names)
+    selectors_int_list = ", ".join(f'"{x}"' for x in objc_selectors)
+
+    query_predicate = "AND" if requires_class_and_sel_found else "OR"
+    query = (
+        f"SELECT * from objc_msgSends"
+        f" WHERE class_name IN ({classes_int_list}) {query_predicate} selector IN ({selectors_int_list})"
+    )
+    objc_calls_cursor = analyzer._db_handle.execute(query)
+    return [ObjcMsgSendXref(x[0], x[1], x[2], x[3], x[4]) for x in objc_calls_cursor]
+
+
+def per_predicate(
+    objc_calls_to: Callable[[List[str], List[str], bool], List[ObjcMsgSendXref]],
+    predicates: List[ObjcMsgSendPredicate],
+) -> Dict[ObjcMsgSendPredicate, List[ObjcMsgSendXref]]:
+    """Answer each predicate with its own objc_calls_to() query."""
+    return {
+        predicate: objc_calls_to(
+            [predicate.class_name] if predicate.class_name else [],
+            [predicate.selector] if predicate.selector else [],
+            bool(predicate.class_name and predicate.selector),
+        )
+        for predicate in predicates
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Batched _objc_msgSend query benchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--predicates", type=int, default=3000)
+    args = arg_parser.parse_args()
+
+    binary = MachoParser(args.binary_path).get_arm64_slice()
+    if not binary:
+        raise ValueError(f"{args.binary_path} has no arm64 slice")
+    analyzer = MachoAnalyzer.get_analyzer(binary)
+    analyzer.warm(["xrefs"])
+
+    call_sites = [
+        (class_name, selector)
+        for class_name, selector in analyzer._db_handle.execute("SELECT class_name, selector FROM objc_msgSends")
+        if class_name and selector
+    ]
+    if not call_sites:
+        raise ValueError(f"{args.binary_path} doesn't message any classes")
+    rng = random.Random(0)
+    predicates = []
+    for _ in range(args.predicates // 3):
+        class_name, selector = rng.choice(call_sites)
+        predicates.append(ObjcMsgSendPredicate(class_name=class_name))
+        predicates.append(ObjcMsgSendPredicate(selector=selector))
+        predicates.append(ObjcMsgSendPredicate(class_name=class_name, selector=selector))
+    predicates = list(dict.fromkeys(predicates))
+
+    interpolated = partial(interpolated_objc_calls_to, analyzer)
+    expected = {predicate: sorted(calls) for predicate, calls in per_predicate(interpolated, predicates).items()}
+    for results in [per_predicate(analyzer.objc_calls_to, predicates), analyzer.objc_calls_matching(predicates)]:
+        assert {predicate: sorted(calls) for predicate, calls in results.items()} == expected
+
+    interpolated_time = timeit.timeit(lambda: per_predicate(interpolated, predicates), number=1)
+    table_time = timeit.timeit(lambda: per_predicate(analyzer.objc_calls_to, predicates), number=1)
+    batch_time = timeit.timeit(lambda: analyzer.objc_calls_matching(predicates), number=1)
+
+    call_count = sum(len(calls) for calls in expected.values())
+    print(f"{args.binary_path.name}: {len(predicates)} distinct predicates matching {call_count} call-sites")
+    print(f"\t{'':<36}{'time':>10}{'speedup':>10}")
+    print(f"\t{'objc_calls_to(), interpolated':<36}{interpolated_time * 1000:>8.1f}ms")
+    for name, duration in [("objc_calls_to()", table_time), ("objc_calls_matching()", batch_time)]:
+        print(f"\t{name:<36}{duration * 1000:>8.1f}ms{interpolated_time / duration:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compare an eager ObjcRuntimeDataParser against a lazy one that parses each class on first use.
+
+A lazy parser is timed when constructed, when a single class's methods are then read, and when every selector is then
+resolved, as a query over the whole binary would.
+"""
+import argparse
+import timeit
+from pathlib import Path
+
+from strongarm.macho import MachoParser, ObjcRuntimeDataParser
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "TestBinary1"
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Lazy ObjC class parsing benchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--number", type=int, default=10, help="Times to parse the binary")
+    args = arg_parser.parse_args()
+
+    binary = MachoParser(args.binary_path).get_arm64_slice()
+    if not binary:
+        raise ValueError(f"{args.binary_path} has no arm64 slice")
+    class_name = ObjcRuntimeDataParser(binary).classes[-1].name
+
+    def construct_lazy() -> ObjcRuntimeDataParser:
+        return ObjcRuntimeDataParser(binary, lazy=True)
+
+    def query_one_class() -> ObjcRuntimeDataParser:
+        parser = construct_lazy()
+        objc_class = parser.objc_class_for_name(class_name)
+        assert objc_class
+        objc_class.selectors
+        return parser
+
+    eager_time = timeit.timeit(lambda: ObjcRuntimeDataParser(binary, lazy=False), number=args.number) / args.number
+    lazy_time = timeit.timeit(construct_lazy, number=args.number) / args.number
+    one_class_time = timeit.timeit(query_one_class, number=args.number) / args.number
+    resolve_time = timeit.timeit(lambda: query_one_class().selrefs_to_selectors(), number=args.number) / args.number
+
+    print(f"{args.binary_path.name}: {len(ObjcRuntimeDataParser(binary).classes)} classes, mean time (ms)")
+    print(f"\t{'':<32}{'time':>10}{'speedup':>10}")
+    print(f"\t{'eager parse':<32}{eager_time * 1000:>10.1f}")
+    for name, duration in [
+        ("lazy parse", lazy_time),
+        ("lazy parse, one class", one_class_time),
+        ("lazy parse, every selector", resolve_time),
+    ]:
+        print(f"\t{name:<32}{duration * 1000:>10.1f}{eager_time / duration:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Compare ObjcRuntimeDataParser's indexed lookups against the linear scans they replaced.
+
+Each query is issued for a sample of the binary's own selectors, IMPs and methods, as a rule engine would.
+"""
+import argparse
+import random
+import timeit
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from strongarm.macho import MachoParser, ObjcClass, ObjcRuntimeDataParser, ObjcSelector, VirtualMemoryPointer
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "TestBinary1"
+
+
+def scan_selref_for_selector_name(parser: ObjcRuntimeDataParser, selector_name: str) -> Optional[VirtualMemoryPointer]:
+    """The previous implementation of ObjcRuntimeDataParser.selref_for_selector_name()."""
+    return next(
+        (selref for selref, selector in parser._selref_ptr_to_selector_map.items() if selector.name == selector_name),
+        None,
+    )
+
+
+def scan_get_method_imp_addresses(parser: ObjcRuntimeDataParser, selector: str) -> List[VirtualMemoryPointer]:
+    """The previous implementation of ObjcRuntimeDataParser.get_method_imp_addresses()."""
+    return [
+        objc_sel.implementation
+        for objc_class in parser.classes
+        for objc_sel in objc_class.selectors
+        if objc_sel.name == selector and objc_sel.implementation
+    ]
+
+
+def scan_method_for_imp(
+    parser: ObjcRuntimeDataParser, entry_point: VirtualMemoryPointer
+) -> Optional[Tuple[ObjcClass, ObjcSelector]]:
+    """The previous implementation of MachoAnalyzer.method_info_for_entry_point()."""
+    for objc_cls in parser.classes:
+        for sel in objc_cls.selectors:
+            if sel.implementation == entry_point:
+                return objc_cls, sel
+    return None
+
+
+def scan_method_for_signature(
+    parser: ObjcRuntimeDataParser, class_name: str, sel_name: str
+) -> Optional[Tuple[ObjcClass, ObjcSelector]]:
+    """The previous implementation of ObjcFunctionAnalyzer.get_function_analyzer_for_signature()."""
+    for objc_cls in parser.classes:
+        if objc_cls.name == class_name:
+            for sel in objc_cls.selectors:
+                if sel.name == sel_name:
+                    return objc_cls, sel
+    return None
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="ObjC runtime data lookup benchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--queries", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    binary = MachoParser(args.binary_path).get_arm64_slice()
+    if not binary:
+        raise ValueError(f"{args.binary_path} has no arm64 slice")
+    parser = ObjcRuntimeDataParser(binary)
+
+    rng = random.Random(0)
+    methods = [(objc_class, selector) for objc_class in parser.classes for selector in objc_class.selectors]
+    if not methods:
+        raise ValueError(f"{args.binary_path} implements no Objective-C methods")
+    methods = [rng.choice(methods) for _ in range(args.queries)]
+    selector_names = [selector.name for _, selector in methods]
+    imps = [VirtualMemoryPointer(selector.implementation or 0) for _, selector in methods]
+    signatures = [(objc_class.name, selector.name) for objc_class, selector in methods]
+
+    queries: Sequence[Tuple[str, Callable[[], object], Callable[[], object]]] = [
+        (
+            "selref_for_selector_name",
+            lambda: [scan_selref_for_selector_name(parser, name) for name in selector_names],
+            lambda: [parser.selref_for_selector_name(name) for name in selector_names],
+        ),
+        (
+            "get_method_imp_addresses",
+            lambda: [scan_get_method_imp_addresses(parser, name) for name in selector_names],
+            lambda: [parser.get_method_imp_addresses(name) for name in selector_names],
+        ),
+        (
+            "method_for_imp",
+            lambda: [scan_method_for_imp(parser, imp) for imp in imps],
+            lambda: [parser.method_for_imp(imp) for imp in imps],
+        ),
+        (
+            "method_for_signature",
+            lambda: [scan_method_for_signature(parser, *signature) for signature in signatures],
+            lambda: [parser.method_for_signature(*signature) for signature in signatures],
+        ),
+    ]
+
+    # The indexes are built by the first lookup. Time building them separately
+    index_time = timeit.timeit(lambda: (parser.selrefs_for_selector_name(""), parser._build_class_indexes()), number=1)
+
+    print(f"{args.binary_path.name}: {len(parser.classes)} classes, mean latency per query (us)")
+    print(f"\t{'building the indexes':<28}{index_time * 1_000_000:>12.1f}")
+    print(f"\t{'query':<28}{'scan':>12}{'indexed':>12}{'speedup':>10}")
+    for name, scan, indexed in queries:
+        assert scan() == indexed()
+        scan_time = timeit.timeit(scan, number=1) / args.queries * 1_000_000
+        indexed_time = timeit.timeit(indexed, number=1) / args.queries * 1_000_000
+        print(f"\t{name:<28}{scan_time:>12.1f}{indexed_time:>12.1f}{scan_time / indexed_time:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare MachoBinary.read_pointer_section() against the per-pointer loop it replaced.
+
+The benchmark reads each pointer-list section of the binary (__objc_selrefs, __objc_classrefs, and so on) repeatedly.
+"""
+import argparse
+import timeit
+from ctypes import sizeof
+from pathlib import Path
+from typing import Dict
+
+from strongarm.macho import MachoBinary, MachoParser, VirtualMemoryPointer
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "iOS15_chained_fixup_pointers"
+
+_POINTER_SECTIONS = [
+    "__objc_selrefs",
+    "__objc_classrefs",
+    "__objc_superrefs",
+    "__objc_classlist",
+    "__objc_catlist",
+    "__objc_protolist",
+    "__mod_init_func",
+]
+
+
+def per_pointer_read_pointer_section(
+    binary: MachoBinary, section_name: str
+) -> Dict[VirtualMemoryPointer, VirtualMemoryPointer]:
+    """The previous implementation of MachoBinary.read_pointer_section(), without its per-pointer debug logging."""
+    for segment in ["__DATA", "__DATA_CONST"]:
+        section = binary.section_with_name(section_name, segment)
+        if section:
+            break
+    else:
+        return {}
+
+    address_to_pointer_map: Dict[VirtualMemoryPointer, VirtualMemoryPointer] = {}
+    section_base = section.address
+    section_data = binary.get_bytes(section.offset, section.size)
+    binary_word = binary.platform_word_type
+    pointer_count = int(len(section_data) / sizeof(binary_word))
+    pointer_off = 0
+    for _ in range(pointer_count):
+        ptr_location = VirtualMemoryPointer(section_base + pointer_off)
+        if ptr_location in binary.dyld_rebased_pointers:
+            ptr_value = binary.dyld_rebased_pointers[ptr_location]
+        else:
+            data_end = pointer_off + sizeof(binary_word)
+            ptr_value = VirtualMemoryPointer(
+                binary_word.from_buffer(bytearray(section_data[pointer_off:data_end])).value
+            )
+        address_to_pointer_map[ptr_location] = VirtualMemoryPointer(ptr_value)
+        pointer_off += sizeof(binary_word)
+    return address_to_pointer_map
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Pointer section decoding benchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--number", type=int, default=200, help="Times to read each section")
+    args = arg_parser.parse_args()
+
+    binary = MachoParser(args.binary_path).get_arm64_slice()
+    if not binary:
+        raise ValueError(f"{args.binary_path} has no arm64 slice")
+
+    print(f"{args.binary_path.name}: {len(binary.dyld_rebased_pointers)} rebased pointers")
+    print(f"\t{'section':<20}{'pointers':>10}{'per-pointer':>14}{'dict':>10}{'arrays':>10}")
+    for section_name in _POINTER_SECTIONS:
+        expected = per_pointer_read_pointer_section(binary, section_name)
+        if not expected:
+            continue
+        assert binary.read_pointer_section(section_name) == expected
+
+        per_pointer_time = timeit.timeit(
+            lambda: per_pointer_read_pointer_section(binary, section_name), number=args.number
+        )
+        dict_time = timeit.timeit(lambda: binary.read_pointer_section(section_name), number=args.number)
+        arrays_time = timeit.timeit(lambda: binary.read_pointer_section_arrays(section_name), number=args.number)
+        print(
+            f"\t{section_name:<20}{len(expected):>10}{per_pointer_time:>13.3f}s"
+            f"{per_pointer_time / dict_time:>9.1f}x{per_pointer_time / arrays_time:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare MachoBinary.section_for_address() against the linear scan it replaced.
+"""
+import argparse
+import random
+import timeit
+from pathlib import Path
+from typing import List, Optional
+
+from strongarm.macho import MachoBinary, MachoParser, MachoSection, VirtualMemoryPointer
+
+_DEFAULT_BINARY = Path(__file__).parents[1] / "tests" / "bin" / "TestBinary1"
+
+
+def linear_section_for_address(binary: MachoBinary, virt_addr: VirtualMemoryPointer) -> Optional[MachoSection]:
+    """The previous implementation of MachoBinary.section_for_address()."""
+    if virt_addr < binary.get_virtual_base():
+        return None
+    max_section = next(iter(binary.sections))
+    for section in binary.sections:
+        if section.address > max_section.address:
+            max_section = section
+        if section.address <= virt_addr < section.end_address:
+            return section
+    return max_section
+
+
+def sample_addresses(binary: MachoBinary, count: int) -> List[VirtualMemoryPointer]:
+    """Pick addresses spread across every section, plus some past the end of the last section."""
+    highest_address = max(s.end_address for s in binary.sections)
+    ranges = [(s.address, s.end_address) for s in binary.sections if s.size]
+    ranges.append((highest_address, highest_address + 0x10000))
+    rng = random.Random(0)
+    addresses = []
+    for _ in range(count):
+        start, end = rng.choice(ranges)
+        addresses.append(VirtualMemoryPointer(rng.randrange(start, end)))
+    return addresses
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="section_for_address() microbenchmark")
+    arg_parser.add_argument("binary_path", type=Path, nargs="?", default=_DEFAULT_BINARY)
+    arg_parser.add_argument("--lookups", type=int, default=100_000)
+    args = arg_parser.parse_args()
+
+    binary = MachoParser(args.binary_path).get_arm64_slice()
+    if not binary:
+        raise ValueError(f"{args.binary_path} has no arm64 slice")
+
+    addresses = sample_addresses(binary, args.lookups)
+    for address in addresses:
+        assert binary.section_for_address(address) is linear_section_for_address(binary, address)
+
+    linear_time = timeit.timeit(lambda: [linear_section_for_address(binary, a) for a in addresses], number=1)
+    indexed_time = timeit.timeit(lambda: [binary.section_for_address(a) for a in addresses], number=1)
+    print(f"{args.binary_path.name}: {len(binary.sections)} sections, {len(addresses)} lookups")
+    print(f"\tlinear scan:    {linear_time:.3f}s")
+    print(f"\tinterval index: {indexed_time:.3f}s ({linear_time / indexed_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,12 +25,12 @@ for framework_name in os.listdir(frameworks_folder):
 
 i = 0
 for path in paths:
-    parser = MachoParser(Path(path))
-    binary = parser.get_arm64_slice()
-    assert binary is not None
+    with MachoParser(Path(path)) as parser:
+        binary = parser.get_arm64_slice()
+        assert binary is not None
 
-    for linked_dylib in binary.linked_dylibs:
-        print(f"{path} loads {linked_dylib.name}")
+        for linked_dylib in binary.linked_dylibs:
+            print(f"{path} loads {linked_dylib.name}")
 
 
 print(i)
@@ -360,7 +360,7 @@ def print_raw_strings(binary: MachoBinary) -> None:
         return
 
     print("\nStrings:")
-    strings_content = binary.get_bytes(strings_section.offset, strings_section.size)
+    strings_content = bytearray(binary.get_bytes(strings_section.offset, strings_section.size))
     for string in strings_content.split(b"\0"):
         try:
             print(f"\t{string.decode()}")
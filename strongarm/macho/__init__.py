@@ -19,10 +19,13 @@ from .arch_independent_structs import (
     ObjcMethodStruct,
     ObjcProtocolListStruct,
     ObjcProtocolRawStruct,
+    StructReader,
 )
-from .dyld_info_parser import BindOpcode, DyldBoundSymbol, DyldInfoParser
+from .dyld_info_parser import BindOpcode, ChainedFixupTables, DyldBoundSymbol, DyldInfoParser, RebaseOpcode
 from .dyld_shared_cache import DyldSharedCacheBinary, DyldSharedCacheParser
-from .macho_analyzer import CallerXRef, MachoAnalyzer, ObjcMsgSendXref
+from .macho_analysis_cache import MachoAnalysisCache
+from .macho_analyzer import CallerXRef, MachoAnalyzer, ObjcClassrefIndex, ObjcMsgSendPredicate, ObjcMsgSendXref
+from .macho_analyzer_cache import MachoAnalyzerCache
 from .macho_binary import (
     BinaryEncryptedError,
     InvalidAddressError,
@@ -82,10 +85,12 @@ from .macho_definitions import (
     VirtualMemoryPointer,
     swap32,
 )
+from .macho_export_trie import ExportSymbolFlags, MachoExportedSymbol, MachoExportTrie
 from .macho_imp_stubs import MachoImpStub, MachoImpStubsParser
 from .macho_load_commands import MachoLoadCommands
 from .macho_parse import ArchitectureNotSupportedError, MachoParser
-from .macho_string_table_helper import MachoStringTableEntry, MachoStringTableHelper
+from .macho_string_table_helper import LazyStringTable, MachoStringTableEntry, MachoStringTableHelper
+from .macho_symbol_table import MachoSymbolTable
 from .objc_runtime_data_parser import (
     ObjcCategory,
     ObjcClass,
@@ -116,14 +121,21 @@ __all__ = [
     "ObjcMethodStruct",
     "ObjcProtocolListStruct",
     "ObjcProtocolRawStruct",
+    "StructReader",
     "BindOpcode",
+    "ChainedFixupTables",
     "DyldBoundSymbol",
     "DyldInfoParser",
+    "RebaseOpcode",
     "DyldSharedCacheBinary",
     "DyldSharedCacheParser",
+    "MachoAnalysisCache",
     "CallerXRef",
     "MachoAnalyzer",
+    "ObjcClassrefIndex",
+    "ObjcMsgSendPredicate",
     "ObjcMsgSendXref",
+    "MachoAnalyzerCache",
     "BinaryEncryptedError",
     "InvalidAddressError",
     "LoadCommandMissingError",
@@ -131,6 +143,9 @@ __all__ = [
     "MachoSection",
     "MachoSegment",
     "NoEmptySpaceForLoadCommandError",
+    "ExportSymbolFlags",
+    "MachoExportedSymbol",
+    "MachoExportTrie",
     "CPU_TYPE",
     "HEADER_FLAGS",
     "NLIST_NTYPE",
@@ -179,6 +194,8 @@ __all__ = [
     "StaticFilePointer",
     "VirtualMemoryPointer",
     "swap32",
+    "MachoSymbolTable",
+    "LazyStringTable",
     "MachoStringTableEntry",
     "MachoStringTableHelper",
     "ArchitectureNotSupportedError",
@@ -1,6 +1,8 @@
-from ctypes import Structure, c_uint64, sizeof
+import struct
+from ctypes import Array, BigEndianStructure, LittleEndianStructure, Structure, _SimpleCData, c_char, c_uint64, sizeof
 from distutils.version import LooseVersion
-from typing import TYPE_CHECKING, Any, Optional, Type, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type, Union
 
 from strongarm.logger import strongarm_logger
 from strongarm.macho.macho_definitions import (
@@ -135,10 +137,191 @@ _64_BIT_STRUCT_ALIAS = Union[
 ]
 
 
-class ArchIndependentStructure:
+# struct module format characters for ctypes integer types, by size
+_STRUCT_INTEGER_CODES = {1: "b", 2: "h", 4: "i", 8: "q"}
+
+
+def _struct_format_code(field_type: Any) -> Optional[str]:
+    """Return the struct module format character for a ctypes field type, or None if it has no equivalent."""
+    if isinstance(field_type, type) and issubclass(field_type, Array):
+        element_type = getattr(field_type, "_type_", None)
+        if element_type is c_char:
+            return f"{field_type._length_}s"
+        return None
+    if isinstance(field_type, type) and issubclass(field_type, _SimpleCData):
+        type_code = getattr(field_type, "_type_")
+        if type_code == "c":
+            return "c"
+        if isinstance(type_code, str) and type_code in "bBhHiIlLqQ":
+            code = _STRUCT_INTEGER_CODES[sizeof(field_type)]
+            return code.upper() if type_code.isupper() else code
+    return None
+
+
+class _StructUnpacker:
+    """Decodes each field of a ctypes Structure layout with a single precompiled struct.Struct.
+
+    Integer fields, unsigned bitfields and char arrays are read by the struct.Struct. Any other field (nested
+    structures and unions, other arrays, signed bitfields) is read by copying the data into the ctypes layout.
+    """
+
+    def __init__(self, layout: Type[Structure]) -> None:
+        self.layout = layout
+        self.size = sizeof(layout)
+        # A few layouts declare a field name twice. As with ctypes, the last declaration wins
+        self.field_names = tuple(dict.fromkeys(field[0] for field in layout._fields_))
+        last_declarations = {field[0]: field for field in layout._fields_}
+
+        if issubclass(layout, BigEndianStructure):
+            byte_order = ">"
+        elif issubclass(layout, LittleEndianStructure):
+            byte_order = "<"
+        else:
+            byte_order = "="
+
+        # Storage units read by the struct.Struct, keyed by their offset into the structure
+        units: Dict[int, Tuple[str, int]] = {}
+        # (storage unit offset, bitfield shift, bitfield mask, whether to truncate at a NUL), by field name
+        decoded_fields: Dict[str, Tuple[int, int, Optional[int], bool]] = {}
+        end_of_last_unit = 0
+
+        for field in last_declarations.values():
+            name, field_type, *bit_width = field
+            is_bitfield = bool(bit_width)
+            offset = getattr(layout, name).offset
+            code = _struct_format_code(field_type)
+            if code is None or (is_bitfield and code.islower()):
+                continue
+
+            unit = (code, struct.calcsize(f"{byte_order}{code}"))
+            # Fields may only share a storage unit if they're bitfields within it. Anything else overlapping
+            # (such as union members) is left to ctypes
+            if units.get(offset) != unit and offset < end_of_last_unit:
+                continue
+            units[offset] = unit
+            end_of_last_unit = max(end_of_last_unit, offset + unit[1])
+
+            shift, mask = 0, None
+            if is_bitfield:
+                # Let ctypes tell us where the bitfield lives within its storage unit
+                probe = layout()
+                setattr(probe, name, (1 << bit_width[0]) - 1)
+                unit_bytes = bytes(probe)[offset : offset + unit[1]]
+                unit_mask = int.from_bytes(unit_bytes, "big" if byte_order == ">" else "little")
+                shift = (unit_mask & -unit_mask).bit_length() - 1
+                mask = unit_mask >> shift
+            decoded_fields[name] = (offset, shift, mask, code.endswith("s"))
+
+        unit_indexes = {}
+        format_string = byte_order
+        position = 0
+        for index, offset in enumerate(sorted(units)):
+            code, unit_size = units[offset]
+            if offset > position:
+                format_string += f"{offset - position}x"
+            format_string += code
+            position = offset + unit_size
+            unit_indexes[offset] = index
+        if self.size > position:
+            format_string += f"{self.size - position}x"
+        self.struct = struct.Struct(format_string)
+
+        # (index into the unpacked values, bitfield shift, bitfield mask, whether to truncate at a NUL) for each
+        # field, or None for fields that are read through ctypes
+        self._field_decoders: List[Optional[Tuple[int, int, Optional[int], bool]]] = []
+        for name in self.field_names:
+            if name not in decoded_fields:
+                self._field_decoders.append(None)
+                continue
+            offset, shift, mask, truncate = decoded_fields[name]
+            self._field_decoders.append((unit_indexes[offset], shift, mask, truncate))
+        self.needs_ctypes_struct = None in self._field_decoders
+        # Most layouts are a run of plain integers, whose unpacked values are already the fields' values
+        self._unpacks_to_fields = len(units) == len(self.field_names) and all(
+            decoder == (index, 0, None, False) for index, decoder in enumerate(self._field_decoders)
+        )
+
+    def unpack(self, struct_bytes: Union[bytes, bytearray, memoryview]) -> Sequence[Any]:
+        """Decode the value of each field in field_names from a buffer holding the structure."""
+        values = self.struct.unpack_from(struct_bytes)
+        if self._unpacks_to_fields:
+            return values
+
+        ctypes_struct = self.layout.from_buffer_copy(struct_bytes[: self.size]) if self.needs_ctypes_struct else None
+        fields = []
+        for name, decoder in zip(self.field_names, self._field_decoders):
+            if decoder is None:
+                fields.append(getattr(ctypes_struct, name))
+                continue
+            index, shift, mask, truncate = decoder
+            value = values[index]
+            if mask is not None:
+                value = (value >> shift) & mask
+            elif truncate:
+                # ctypes char arrays read up to the first NUL
+                value = value.split(b"\x00", 1)[0]
+            fields.append(value)
+        return fields
+
+
+@lru_cache(maxsize=None)
+def _unpacker_for_layout(layout: Type[Structure]) -> _StructUnpacker:
+    return _StructUnpacker(layout)
+
+
+class _ArchIndependentStructureType(type):
+    """Gives each ArchIndependentStructure type a slot for every field of its 32-bit and 64-bit layouts.
+    Slots declared by the class body are kept.
+    """
+
+    def __new__(mcs, name: str, bases: Tuple[type, ...], namespace: Dict[str, Any], **kwargs: Any) -> Any:
+        def inherited_attribute(attribute: str) -> Any:
+            if attribute in namespace:
+                return namespace[attribute]
+            return next((getattr(base, attribute) for base in bases if hasattr(base, attribute)), None)
+
+        declared_slots = namespace.get("__slots__", ())
+        if isinstance(declared_slots, str):
+            declared_slots = (declared_slots,)
+        existing_slots = {slot for base in bases for klass in base.__mro__ for slot in getattr(klass, "__slots__", ())}
+        existing_slots.update(declared_slots)
+
+        field_names: Dict[str, None] = {}
+        for layout in (inherited_attribute("_32_BIT_STRUCT"), inherited_attribute("_64_BIT_STRUCT")):
+            if layout is not None:
+                field_names.update(dict.fromkeys(field[0] for field in layout._fields_))
+        namespace["__slots__"] = (*declared_slots, *(x for x in field_names if x not in existing_slots))
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+class ArchIndependentStructure(metaclass=_ArchIndependentStructureType):
+    """A structure read from a binary, whose fields are available as attributes.
+
+    Each structure type has a slot for every field of its backing layouts. The fields are decoded into the slots with
+    the layout's precompiled struct.Struct when the structure is read.
+    """
+
+    __slots__ = ("binary_offset", "sizeof", "_backing_layout")
+
     _32_BIT_STRUCT: Optional[_32_BIT_STRUCT_ALIAS] = None
     _64_BIT_STRUCT: Optional[_64_BIT_STRUCT_ALIAS] = None
 
+    def __init__(
+        self, binary_offset: int, struct_bytes: Union[bytes, bytearray, memoryview], backing_layout: Type[Structure]
+    ):
+        unpacker = _unpacker_for_layout(backing_layout)
+        if len(struct_bytes) < unpacker.size:
+            raise ValueError(f"Buffer size too small ({len(struct_bytes)} instead of at least {unpacker.size} bytes)")
+
+        for field_name, value in zip(unpacker.field_names, unpacker.unpack(struct_bytes)):
+            setattr(self, field_name, value)
+
+        # record size of underlying struct, for when traversing file by structs
+        self.sizeof = unpacker.size
+        # record the location in the binary this struct was parsed from
+        self.binary_offset = binary_offset
+        self._backing_layout = backing_layout
+
     @classmethod
     def get_backing_data_layout(
         cls, is_64bit: bool = True, minimum_deployment_target: Optional[LooseVersion] = None
@@ -157,29 +340,49 @@ class ArchIndependentStructure:
 
         return struct_type
 
-    def __init__(self, binary_offset: int, struct_bytes: bytearray, backing_layout: Type[Structure]):
-        struct: ArchIndependentStructure = backing_layout.from_buffer(struct_bytes)  # type: ignore
-
-        for field_name, *_ in struct._fields_:
-            # clone fields from struct to this class
-            setattr(self, field_name, getattr(struct, field_name))
-
-        # record size of underlying struct, for when traversing file by structs
-        self.sizeof = sizeof(backing_layout)
-        # record the location in the binary this struct was parsed from
-        self.binary_offset = binary_offset
-
     if TYPE_CHECKING:
-        # GVR suggested to use this pattern to ignore dynamic attribute assignment errors
+        # The fields are stored in the slots that _ArchIndependentStructureType adds to each structure type
         def __getattr__(self, key: str) -> Any:
             pass
 
     def __repr__(self) -> str:
-        attributes = "\t".join([f"{x}: {getattr(self, x)}" for x in self.__dict__.keys()])
+        attribute_names = [*_unpacker_for_layout(self._backing_layout).field_names, "sizeof", "binary_offset"]
+        attributes = "\t".join([f"{x}: {getattr(self, x)}" for x in attribute_names])
         rep = f"{self.__class__.__name__} ({attributes})"
         return rep
 
 
+class StructReader(NamedTuple):
+    """Everything needed to read one ArchIndependentStructure type with a given backing layout.
+    MachoBinary resolves a StructReader once per structure type, rather than reflecting over the layout on every read.
+    """
+
+    structure_class: Type[ArchIndependentStructure]
+    layout: Type[Structure]
+    size: int
+    # The (name, offset) of each uint64_t field, which may hold a pointer that's rebased by dyld
+    pointer_fields: Tuple[Tuple[str, int], ...]
+
+    @staticmethod
+    def for_layout(struct_type: Type[ArchIndependentStructure], layout: Type[Structure]) -> "StructReader":
+        reader = _STRUCT_READERS.get((struct_type, layout))
+        if reader is None:
+            pointer_fields = {}
+            for field_name, field_type, *_ in layout._fields_:
+                if field_type == c_uint64:
+                    pointer_fields[field_name] = getattr(layout, field_name).offset
+            reader = StructReader(struct_type, layout, sizeof(layout), tuple(pointer_fields.items()))
+            _STRUCT_READERS[(struct_type, layout)] = reader
+        return reader
+
+    def read(self, binary_offset: int, struct_bytes: Union[bytes, bytearray, memoryview]) -> Any:
+        return self.structure_class(binary_offset, struct_bytes, self.layout)
+
+
+# The StructReader for each (structure type, backing layout)
+_STRUCT_READERS: Dict[Tuple[Type[ArchIndependentStructure], Type[Structure]], StructReader] = {}
+
+
 class MachoHeaderStruct(ArchIndependentStructure):
     _32_BIT_STRUCT = MachoHeader32
     _64_BIT_STRUCT = MachoHeader64
@@ -261,8 +464,9 @@ class ObjcMethodStruct(ArchIndependentStructure):
         struct_type = cls.get_backing_data_layout(
             binary.is_64bit, binary.get_minimum_deployment_target(), methlist_flags
         )
-        data = binary.get_contents_from_address(address=address, size=sizeof(struct_type), is_virtual=True)
-        method_ent = ObjcMethodStruct(address, data, struct_type)
+        reader = StructReader.for_layout(cls, struct_type)
+        data = binary.get_contents_from_address(address=address, size=reader.size, is_virtual=True)
+        method_ent: ObjcMethodStruct = reader.read(address, data)
 
         # If we're parsing the iOS14+ structure that encodes signed 32b offsets instead of 64b absolute addresses,
         # translate the offsets to absolute addresses for caller convenience.
@@ -277,16 +481,7 @@ class ObjcMethodStruct(ArchIndependentStructure):
             # This selref may be rebased
             method_ent.name = binary.read_rebased_pointer(selref_addr)  # type: ignore
         else:
-            for field_name, field_type, *_ in struct_type._fields_:
-                field_offset = getattr(getattr(struct_type, field_name), "offset")
-                field_address = address + field_offset
-                if field_type == c_uint64 and field_address in binary.dyld_rebased_pointers:
-                    pointer_value = binary.dyld_rebased_pointers[field_address]
-                    logger.debug(
-                        f"Setting rebased pointer within {struct_type}+{field_offset} -> "
-                        f"{pointer_value} at {field_address}"
-                    )
-                    setattr(method_ent, field_name, pointer_value)
+            binary.apply_rebased_pointers(method_ent, reader, address)
 
         return method_ent
 
@@ -152,5 +152,5 @@ class CodesignParser:
 
         xml_start = StaticFilePointer(file_offset + entitlements_blob.sizeof)
         xml_length = blob_end - xml_start
-        xml = self.binary.get_bytes(xml_start, xml_length)
+        xml = bytearray(self.binary.get_bytes(xml_start, xml_length))
         return xml
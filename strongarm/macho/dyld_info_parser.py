@@ -1,7 +1,15 @@
-from ctypes import c_int8, c_int16, c_long, c_uint16, c_uint32, c_uint64, sizeof
+import math
+import mmap
+import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from ctypes import c_int8, c_int16, c_uint16, sizeof
 from dataclasses import dataclass, field
 from enum import IntEnum
-from typing import Dict, List, Optional, Tuple, Type
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type, Union
+
+from more_itertools import chunked
 
 from strongarm.logger import strongarm_logger
 
@@ -11,12 +19,11 @@ from .arch_independent_structs import (
     MachoDyldChainedImport,
     MachoDyldChainedImportAddend,
     MachoDyldChainedImportAddend64,
-    MachoDyldChainedPtr64Bind,
-    MachoDyldChainedPtr64Rebase,
     MachoDyldChainedStartsInImage,
     MachoDyldChainedStartsInSegment,
 )
-from .macho_binary import DynamicLibrary, MachoBinary
+from .leb128 import read_sleb, read_uleb
+from .macho_binary import BinaryEncryptedError, DynamicLibrary, MachoBinary, little_endian_array
 from .macho_definitions import (
     BindSpecialDylibOrdinal,
     MachoDyldChainedImportFormat,
@@ -51,6 +58,20 @@ class BindOpcode(IntEnum):
     BIND_SUBOPCODE_THREADED_APPLY = 0x01
 
 
+class RebaseOpcode(IntEnum):
+    REBASE_OPCODE_MASK = 0xF0
+    REBASE_IMMEDIATE_MASK = 0x0F
+    REBASE_OPCODE_DONE = 0x00
+    REBASE_OPCODE_SET_TYPE_IMM = 0x10
+    REBASE_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB = 0x20
+    REBASE_OPCODE_ADD_ADDR_ULEB = 0x30
+    REBASE_OPCODE_ADD_ADDR_IMM_SCALED = 0x40
+    REBASE_OPCODE_DO_REBASE_IMM_TIMES = 0x50
+    REBASE_OPCODE_DO_REBASE_ULEB_TIMES = 0x60
+    REBASE_OPCODE_DO_REBASE_ADD_ADDR_ULEB = 0x70
+    REBASE_OPCODE_DO_REBASE_ULEB_TIMES_SKIPPING_ULEB = 0x80
+
+
 @dataclass
 class DyldBoundSymbol:
     binary: MachoBinary
@@ -70,6 +91,94 @@ class DyldChainedPointerMagics(IntEnum):
     DYLD_CHAINED_PTR_NO_STARTS_IN_PAGE = 0xFFFF
     # Multiple chain starts in this page
     DYLD_CHAINED_PTR_START_MULTI = 0x8000
+    # Last chain start for a page with multiple chain starts
+    # PT: Same value as DYLD_CHAINED_PTR_START_MULTI, so IntEnum makes this an alias
+    DYLD_CHAINED_PTR_START_LAST = 0x8000
+
+
+# Layout of DYLD_CHAINED_PTR_64 and DYLD_CHAINED_PTR_64_OFFSET pointers.
+# See MachoDyldChainedPtr64RebaseRaw and MachoDyldChainedPtr64BindRaw
+_CHAINED_PTR_64 = struct.Struct("<Q")
+_CHAINED_PTR_64_BIND = 1 << 63
+_CHAINED_PTR_64_BIND_ORDINAL_MASK = (1 << 24) - 1
+_CHAINED_PTR_64_REBASE_TARGET_MASK = (1 << 36) - 1
+_CHAINED_PTR_64_NEXT_SHIFT = 51
+_CHAINED_PTR_64_NEXT_MASK = (1 << 12) - 1
+_MAX_FIXUP_CHAIN_LENGTH = 10000
+
+# dyld computes bind and rebase addresses with 64-bit arithmetic, so large addends move an address backwards
+_UINT64_MASK = (1 << 64) - 1
+
+# The opcodes as plain ints, for the rebase and bind interpreters. IntEnum members are much slower to compare against
+# than plain ints, and the interpreters test each opcode roughly in order of how often it appears in a binary
+_REBASE_OPCODE_MASK = int(RebaseOpcode.REBASE_OPCODE_MASK)
+_REBASE_IMMEDIATE_MASK = int(RebaseOpcode.REBASE_IMMEDIATE_MASK)
+_REBASE_OPCODE_DONE = int(RebaseOpcode.REBASE_OPCODE_DONE)
+_REBASE_OPCODE_SET_TYPE_IMM = int(RebaseOpcode.REBASE_OPCODE_SET_TYPE_IMM)
+_REBASE_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB = int(RebaseOpcode.REBASE_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB)
+_REBASE_OPCODE_ADD_ADDR_ULEB = int(RebaseOpcode.REBASE_OPCODE_ADD_ADDR_ULEB)
+_REBASE_OPCODE_ADD_ADDR_IMM_SCALED = int(RebaseOpcode.REBASE_OPCODE_ADD_ADDR_IMM_SCALED)
+_REBASE_OPCODE_DO_REBASE_IMM_TIMES = int(RebaseOpcode.REBASE_OPCODE_DO_REBASE_IMM_TIMES)
+_REBASE_OPCODE_DO_REBASE_ULEB_TIMES = int(RebaseOpcode.REBASE_OPCODE_DO_REBASE_ULEB_TIMES)
+_REBASE_OPCODE_DO_REBASE_ADD_ADDR_ULEB = int(RebaseOpcode.REBASE_OPCODE_DO_REBASE_ADD_ADDR_ULEB)
+_REBASE_OPCODE_DO_REBASE_ULEB_TIMES_SKIPPING_ULEB = int(RebaseOpcode.REBASE_OPCODE_DO_REBASE_ULEB_TIMES_SKIPPING_ULEB)
+
+_BIND_OPCODE_MASK = int(BindOpcode.BIND_OPCODE_MASK)
+_BIND_IMMEDIATE_MASK = int(BindOpcode.BIND_IMMEDIATE_MASK)
+_BIND_OPCODE_DONE = int(BindOpcode.BIND_OPCODE_DONE)
+_BIND_OPCODE_SET_DYLIB_ORDINAL_IMM = int(BindOpcode.BIND_OPCODE_SET_DYLIB_ORDINAL_IMM)
+_BIND_OPCODE_SET_DYLIB_ORDINAL_ULEB = int(BindOpcode.BIND_OPCODE_SET_DYLIB_ORDINAL_ULEB)
+_BIND_OPCODE_SET_DYLIB_SPECIAL_IMM = int(BindOpcode.BIND_OPCODE_SET_DYLIB_SPECIAL_IMM)
+_BIND_OPCODE_SET_SYMBOL_TRAILING_FLAGS_IMM = int(BindOpcode.BIND_OPCODE_SET_SYMBOL_TRAILING_FLAGS_IMM)
+_BIND_OPCODE_SET_TYPE_IMM = int(BindOpcode.BIND_OPCODE_SET_TYPE_IMM)
+_BIND_OPCODE_SET_ADDEND_SLEB = int(BindOpcode.BIND_OPCODE_SET_ADDEND_SLEB)
+_BIND_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB = int(BindOpcode.BIND_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB)
+_BIND_OPCODE_ADD_ADDR_ULEB = int(BindOpcode.BIND_OPCODE_ADD_ADDR_ULEB)
+_BIND_OPCODE_DO_BIND = int(BindOpcode.BIND_OPCODE_DO_BIND)
+_BIND_OPCODE_DO_BIND_ADD_ADDR_ULEB = int(BindOpcode.BIND_OPCODE_DO_BIND_ADD_ADDR_ULEB)
+_BIND_OPCODE_DO_BIND_ADD_ADDR_IMM_SCALED = int(BindOpcode.BIND_OPCODE_DO_BIND_ADD_ADDR_IMM_SCALED)
+_BIND_OPCODE_DO_BIND_ULEB_TIMES_SKIPPING_ULEB = int(BindOpcode.BIND_OPCODE_DO_BIND_ULEB_TIMES_SKIPPING_ULEB)
+_BIND_OPCODE_THREADED = int(BindOpcode.BIND_OPCODE_THREADED)
+
+_CHAINED_FIXUP_TABLE_NAMES = ("rebase_addresses", "rebase_targets", "bind_addresses", "bind_ordinals")
+
+
+class _FixupChain(NamedTuple):
+    """The start of a chain of fixup pointers within a segment"""
+
+    segment_offset: int
+    segment_size: int
+    target_base: int
+    chain_offset: int
+
+
+@dataclass
+class ChainedFixupTables:
+    """The fixups described by a binary's chained fixup pointers, stored as compact tables.
+    rebase_addresses[i] contains a pointer that should be rebased to rebase_targets[i], given the stated virtual base.
+    bind_addresses[i] contains a pointer that should be bound to the symbol at imports[bind_ordinals[i]].
+    """
+
+    imports: List[DyldBoundSymbol]
+    rebase_addresses: "array[int]" = field(default_factory=lambda: array("Q"))
+    rebase_targets: "array[int]" = field(default_factory=lambda: array("Q"))
+    bind_addresses: "array[int]" = field(default_factory=lambda: array("Q"))
+    bind_ordinals: "array[int]" = field(default_factory=lambda: array("I"))
+
+
+def _walk_fixup_chains_in_file_region(
+    path: str, region_offset: int, region_size: int, virtual_base: int, chains: List[_FixupChain]
+) -> ChainedFixupTables:
+    """Walk chains of fixup pointers within a region of a file. Runs in DyldInfoParser's worker processes.
+    Segment offsets are relative to the start of the region.
+    """
+    fixups = ChainedFixupTables(imports=[])
+    with open(path, "rb") as binary_file, mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+        with memoryview(mapping) as file_contents, file_contents[region_offset : region_offset + region_size] as region:
+            DyldInfoParser._walk_fixup_chains(
+                fixups, chains, virtual_base, lambda offset, size: region[offset : offset + size]
+            )
+    return fixups
 
 
 class DyldInfoParser:
@@ -81,6 +190,13 @@ class DyldInfoParser:
         Also creates the map of dyld import addresses to the corresponding DyldBoundSymbol
     """
 
+    # Number of processes used to walk chained fixup pointers. With 1, they're walked in-process.
+    # Parallel walking needs a binary that's mapped from a file (see MachoBinary.get_backing_file_region()),
+    # and is skipped for other binaries, or binaries with fewer chains than CHAINED_FIXUP_MIN_CHUNK_SIZE.
+    CHAINED_FIXUP_WORKERS: int = 1
+    # Smallest number of chains sent to a worker process at once. Each page of a segment usually holds one chain.
+    CHAINED_FIXUP_MIN_CHUNK_SIZE: int = 256
+
     @staticmethod
     def _compute_library_ordinal_for_chained_import_type(lib_value: int) -> int:
         if lib_value > 0xF0:
@@ -159,6 +275,23 @@ class DyldInfoParser:
                 Dict[address containing a pointer that needs to be bound at load time, corresponding DyldBoundSymbol],
             ]
         """
+        fixups = DyldInfoParser.read_chained_fixup_tables(binary)
+        rebases = dict(
+            zip(
+                map(VirtualMemoryPointer, fixups.rebase_addresses),
+                map(VirtualMemoryPointer, fixups.rebase_targets),
+            )
+        )
+        imports = fixups.imports
+        binds = {
+            VirtualMemoryPointer(address): imports[ordinal]
+            for address, ordinal in zip(fixups.bind_addresses, fixups.bind_ordinals)
+        }
+        return rebases, binds
+
+    @staticmethod
+    def read_chained_fixup_tables(binary: MachoBinary) -> ChainedFixupTables:
+        """Parses the chained fixup pointer data in __LINKEDIT into a ChainedFixupTables"""
         if not binary._dyld_chained_fixups:
             raise ValueError("This method expects the provided binary to contain chained fixup pointers")
 
@@ -167,13 +300,10 @@ class DyldInfoParser:
 
         # First, read the table of bound symbols that are present anywhere within the binary
         # Bound fixup pointers will encode an index ("ordinal") into this table to state the symbol they're referring to
-        dyld_bound_symbols = DyldInfoParser._read_chained_imports(
-            binary, chained_fixups_data_start, chained_fixups_header
+        fixups = ChainedFixupTables(
+            imports=DyldInfoParser._read_chained_imports(binary, chained_fixups_data_start, chained_fixups_header)
         )
-        logger.debug(f"dyld chained imports table contains {len(dyld_bound_symbols)} symbols")
-
-        # By parsing each chain of fixup pointers in the binary, we'll populate this map of addresses -> binds
-        dyld_bound_addresses_to_symbols: Dict[VirtualMemoryPointer, DyldBoundSymbol] = {}
+        logger.debug(f"dyld chained imports table contains {len(fixups.imports)} symbols")
 
         # Next, parse the structure directly after the chained fixups header.
         # This structure gives the locations of each chain of fixup pointers within each binary segment.
@@ -183,129 +313,211 @@ class DyldInfoParser:
         # `struct dyld_chained_starts_in_segment`.
         chained_starts_in_image_off = chained_fixups_data_start + chained_fixups_header.starts_offset
         chained_starts_in_image = binary.read_struct(chained_starts_in_image_off, MachoDyldChainedStartsInImage)
-        chained_starts_in_seg_offsets_base = chained_starts_in_image_off + chained_starts_in_image.sizeof
-
-        rebases: Dict[VirtualMemoryPointer, VirtualMemoryPointer] = {}
-        for segment_idx in range(chained_starts_in_image.seg_count):
-            # Read entry of variable-length array of words. See comment in MachoDyldChainedStartsInImageRaw
-            starts_in_seg_struct_offset = binary.read_word(
-                chained_starts_in_seg_offsets_base + (segment_idx * sizeof(c_uint32)),
-                virtual=False,
-                word_type=c_uint32,
-            )
+        # Read the variable-length array of words. See comment in MachoDyldChainedStartsInImageRaw
+        starts_in_seg_struct_offsets = DyldInfoParser._read_little_endian_array(
+            binary,
+            chained_starts_in_image_off + chained_starts_in_image.sizeof,
+            "I",
+            chained_starts_in_image.seg_count,
+        )
+
+        virtual_base = int(binary.get_virtual_base())
+        chains: List[_FixupChain] = []
+        for segment_idx, starts_in_seg_struct_offset in enumerate(starts_in_seg_struct_offsets):
             # Skip segments that don't contain chains
             if starts_in_seg_struct_offset == 0:
                 continue
 
             starts_in_seg_addr = chained_starts_in_image_off + starts_in_seg_struct_offset
             chained_starts_in_seg = binary.read_struct(starts_in_seg_addr, MachoDyldChainedStartsInSegment)
-
+            pointer_format = chained_starts_in_seg.pointer_format
             logger.debug(
                 f"ChainedStartsInSegment\tsegment {segment_idx}\t"
-                f"pointer_fmt {chained_starts_in_seg.pointer_format}\tpage count {chained_starts_in_seg.page_count}"
+                f"pointer_fmt {pointer_format}\tpage count {chained_starts_in_seg.page_count}"
+            )
+            if pointer_format not in (
+                MachoDyldChainedPtrFormat.DYLD_CHAINED_PTR_64,
+                MachoDyldChainedPtrFormat.DYLD_CHAINED_PTR_64_OFFSET,
+            ):
+                raise NotImplementedError(f"Unsupported chained pointer format: {pointer_format}")
+
+            # Read the variable-length array of words. See comment in MachoDyldChainedStartsInSegmentRaw
+            # The size of the structure includes the overflow entries used by pages with multiple chain starts
+            page_start_count = max(
+                chained_starts_in_seg.page_count,
+                (chained_starts_in_seg.size - chained_starts_in_seg.sizeof) // sizeof(c_uint16),
+            )
+            page_starts = DyldInfoParser._read_little_endian_array(
+                binary, starts_in_seg_addr + chained_starts_in_seg.sizeof, "H", page_start_count
             )
 
-            offset_in_page_start = starts_in_seg_addr + chained_starts_in_seg.sizeof
-            for page_idx in range(chained_starts_in_seg.page_count):
-                # Read entry of variable-length array of words. See comment in MachoDyldChainedStartsInSegmentRaw
-                offset_in_page = binary.read_word(
-                    offset_in_page_start + (page_idx * sizeof(c_uint16)), virtual=False, word_type=c_uint16
+            page_size = chained_starts_in_seg.page_size
+            segment_offset = chained_starts_in_seg.segment_offset
+            segment_size = chained_starts_in_seg.page_count * page_size
+            # The target field of DYLD_CHAINED_PTR_64_OFFSET pointers is an offset from the virtual base,
+            # while DYLD_CHAINED_PTR_64 pointers store an absolute virtual address
+            if pointer_format == MachoDyldChainedPtrFormat.DYLD_CHAINED_PTR_64_OFFSET:
+                target_base = virtual_base
+            else:
+                target_base = 0
+
+            chains.extend(
+                _FixupChain(segment_offset, segment_size, target_base, page_idx * page_size + offset_in_page)
+                for page_idx, offset_in_page in DyldInfoParser._chain_starts_in_segment(
+                    page_starts, chained_starts_in_seg.page_count
                 )
+            )
 
-                # Some offset_in_page values have special meaning
-                if offset_in_page == DyldChainedPointerMagics.DYLD_CHAINED_PTR_NO_STARTS_IN_PAGE:
-                    logger.debug(f"Skipping PageIdx {page_idx} with no chain starts")
-                    continue
-                elif offset_in_page == DyldChainedPointerMagics.DYLD_CHAINED_PTR_START_MULTI:
-                    raise NotImplementedError("Encountered page with multiple chain starts")
+        # Each chain is independent, so they can be walked by several processes
+        backing_file_region = binary.get_backing_file_region()
+        if (
+            DyldInfoParser.CHAINED_FIXUP_WORKERS > 1
+            and len(chains) > DyldInfoParser.CHAINED_FIXUP_MIN_CHUNK_SIZE
+            and backing_file_region
+            # Reads from the encrypted range must raise BinaryEncryptedError, which only the serial path does
+            and not binary.is_encrypted()
+        ):
+            DyldInfoParser._walk_fixup_chains_in_parallel(fixups, chains, virtual_base, backing_file_region)
+        else:
+            DyldInfoParser._walk_fixup_chains(
+                fixups, chains, virtual_base, lambda offset, size: binary.get_bytes(StaticFilePointer(offset), size)
+            )
 
-                logger.debug(f"\tPageIdx {page_idx}, offset in page {hex(offset_in_page)}")
+        return fixups
 
-                chain_base = (
-                    chained_starts_in_seg.segment_offset + (page_idx * chained_starts_in_seg.page_size) + offset_in_page
-                )
-                # Process this chain of fixup pointers
-                rebases_in_chain, bound_addresses_in_chain = DyldInfoParser._process_fixup_pointer_chain(
-                    binary, dyld_bound_symbols, chain_base, chained_starts_in_seg.pointer_format
+    @staticmethod
+    def _read_little_endian_array(binary: MachoBinary, offset: StaticFilePointer, typecode: str, count: int) -> array:
+        """Read a little-endian array of `count` integers from the binary"""
+        values = little_endian_array(typecode, binary.get_bytes(offset, count * array(typecode).itemsize))
+        if len(values) != count:
+            raise ValueError(f"Failed to read {count} entries at {hex(offset)}")
+        return values
+
+    @staticmethod
+    def _chain_starts_in_segment(page_starts: array, page_count: int) -> List[Tuple[int, int]]:
+        """Returns the (page index, offset in page) of each chain of fixup pointers in a segment"""
+        chain_starts = []
+        for page_idx in range(page_count):
+            offset_in_page = page_starts[page_idx]
+
+            # Some offset_in_page values have special meaning
+            if offset_in_page == DyldChainedPointerMagics.DYLD_CHAINED_PTR_NO_STARTS_IN_PAGE:
+                continue
+            if not offset_in_page & DyldChainedPointerMagics.DYLD_CHAINED_PTR_START_MULTI:
+                chain_starts.append((page_idx, offset_in_page))
+                continue
+
+            # This page has several chains. The offset is an index into the overflow entries after the page starts,
+            # which list the start of each chain. The last start in the page is flagged with START_LAST.
+            overflow_idx = offset_in_page & ~DyldChainedPointerMagics.DYLD_CHAINED_PTR_START_MULTI
+            while True:
+                chain_start = page_starts[overflow_idx]
+                chain_starts.append((page_idx, chain_start & ~DyldChainedPointerMagics.DYLD_CHAINED_PTR_START_LAST))
+                if chain_start & DyldChainedPointerMagics.DYLD_CHAINED_PTR_START_LAST:
+                    break
+                overflow_idx += 1
+        return chain_starts
+
+    @staticmethod
+    def _walk_fixup_chains(
+        fixups: ChainedFixupTables,
+        chains: Iterable[_FixupChain],
+        virtual_base: int,
+        get_bytes: Callable[[int, int], memoryview],
+    ) -> None:
+        """Walk each chain of fixup pointers, reading each segment's bytes with the provided callable"""
+        segment_offset = -1
+        segment_data = memoryview(b"")
+        for chain in chains:
+            if chain.segment_offset != segment_offset:
+                segment_offset = chain.segment_offset
+                segment_data = get_bytes(segment_offset, chain.segment_size)
+            DyldInfoParser._walk_fixup_chain(
+                fixups, segment_data, chain.chain_offset, virtual_base + segment_offset, chain.target_base
+            )
+
+    @staticmethod
+    def _walk_fixup_chains_in_parallel(
+        fixups: ChainedFixupTables,
+        chains: List[_FixupChain],
+        virtual_base: int,
+        backing_file_region: Tuple[Path, int, int],
+    ) -> None:
+        """Walk the chains of fixup pointers in a pool of CHAINED_FIXUP_WORKERS processes.
+        Each worker maps the binary's file itself, so only chain starts and fixup tables are sent between processes.
+        """
+        path, region_offset, region_size = backing_file_region
+        # Hand out several chunks per worker so that a chunk of unusually long chains doesn't hold up the pool
+        chunk_size = max(
+            DyldInfoParser.CHAINED_FIXUP_MIN_CHUNK_SIZE,
+            math.ceil(len(chains) / (DyldInfoParser.CHAINED_FIXUP_WORKERS * 4)),
+        )
+        with ProcessPoolExecutor(max_workers=DyldInfoParser.CHAINED_FIXUP_WORKERS) as executor:
+            futures = [
+                executor.submit(
+                    _walk_fixup_chains_in_file_region, path.as_posix(), region_offset, region_size, virtual_base, chunk
                 )
-                rebases.update(rebases_in_chain)
-                dyld_bound_addresses_to_symbols.update(bound_addresses_in_chain)
+                for chunk in chunked(chains, chunk_size)
+            ]
+            results = [future.result() for future in futures]
 
-        return rebases, dyld_bound_addresses_to_symbols
+        # Append each worker's tables, keeping the order of the chains
+        for table_name in _CHAINED_FIXUP_TABLE_NAMES:
+            table = getattr(fixups, table_name)
+            for result in results:
+                table.extend(getattr(result, table_name))
 
     @staticmethod
-    def _process_fixup_pointer_chain(
-        binary: MachoBinary,
-        dyld_bound_symbols_table: List[DyldBoundSymbol],
-        chain_base: VirtualMemoryPointer,
-        pointer_format: MachoDyldChainedPtrFormat,
-    ) -> Tuple[Dict[VirtualMemoryPointer, VirtualMemoryPointer], Dict[VirtualMemoryPointer, DyldBoundSymbol]]:
-        rebased_pointers: Dict[VirtualMemoryPointer, VirtualMemoryPointer] = {}
-        dyld_bound_addresses_to_symbols: Dict[VirtualMemoryPointer, DyldBoundSymbol] = {}
-        virtual_base = binary.get_virtual_base()
+    def _walk_fixup_chain(
+        fixups: ChainedFixupTables,
+        segment_data: memoryview,
+        chain_offset: int,
+        segment_address: int,
+        target_base: int,
+    ) -> None:
+        """Decode a chain of 64-bit fixup pointers in a segment, and append each fixup to the provided tables.
+        The pointers are decoded with bit operations rather than through MachoDyldChainedPtr64Rebase/Bind.
+        """
+        unpack_from = _CHAINED_PTR_64.unpack_from
+        rebase_addresses_append = fixups.rebase_addresses.append
+        rebase_targets_append = fixups.rebase_targets.append
+        bind_addresses_append = fixups.bind_addresses.append
+        bind_ordinals_append = fixups.bind_ordinals.append
+
         # As each fixup pointer will tell us whether there are any more to follow, loop forever
         # XXX(PT): Impose an upper bound on this loop, just in case
-        for _ in range(10000):
-            chained_rebase_ptr = binary.read_struct(chain_base, MachoDyldChainedPtr64Rebase)
-            # Rebase or bind?
-            if chained_rebase_ptr.bind == 1:
+        for _ in range(_MAX_FIXUP_CHAIN_LENGTH):
+            try:
+                (raw_pointer,) = unpack_from(segment_data, chain_offset)
+            except struct.error:
+                raise ValueError(f"Fixup pointer chain runs past the end of its segment: {hex(chain_offset)}")
+
+            if raw_pointer & _CHAINED_PTR_64_BIND:
                 # Bind. Keep track that there is an imported symbol bind here
-                chained_bind_ptr = binary.read_struct(chain_base, MachoDyldChainedPtr64Bind)
-                bound_symbol = dyld_bound_symbols_table[chained_bind_ptr.ordinal]
-                logger.debug(
-                    f"\t\t{hex(chain_base)}: BIND\tordinal {chained_bind_ptr.ordinal}\t"
-                    f"addend {chained_bind_ptr.addend}\treserved {chained_bind_ptr.reserved}\t"
-                    f"next {chained_bind_ptr.next}\tsymbol {bound_symbol.name}\t\t"
-                    f"dylib {binary.dylib_name_for_library_ordinal(bound_symbol.library_ordinal)}"
-                )
-                dyld_bound_addresses_to_symbols[chain_base + virtual_base] = bound_symbol
-                chain_base += chained_bind_ptr.next * 4
+                bind_addresses_append(segment_address + chain_offset)
+                bind_ordinals_append(raw_pointer & _CHAINED_PTR_64_BIND_ORDINAL_MASK)
             else:
                 # Rebase. Keep track that there's a rebased pointer here
-                chained_ptr_raw = binary.read_word(chain_base, word_type=c_uint64, virtual=False)
-                logger.debug(
-                    f"\t\t{hex(chain_base)}: DyldChainedPtr64Rebase(raw: {hex(chained_ptr_raw)}) "
-                    f"target={StaticFilePointer(chained_rebase_ptr.target)}"
-                )
-                # The pointer format within this chain tells us how to interpret the target field
-                if pointer_format == MachoDyldChainedPtrFormat.DYLD_CHAINED_PTR_64_OFFSET:
-                    # The target field stores an offset from the virtual base rather than an absolute address
-                    rebase_target = virtual_base + chained_rebase_ptr.target
-                elif pointer_format == MachoDyldChainedPtrFormat.DYLD_CHAINED_PTR_64:
-                    # The target field stores an absolute virtual address
-                    rebase_target = chained_rebase_ptr.target
-                else:
-                    raise NotImplementedError(f"Unsupported chained pointer format: {pointer_format}")
-
-                rebased_pointers[VirtualMemoryPointer(chain_base + virtual_base)] = VirtualMemoryPointer(rebase_target)
-                chain_base += chained_rebase_ptr.next * 4
+                rebase_addresses_append(segment_address + chain_offset)
+                rebase_targets_append(target_base + (raw_pointer & _CHAINED_PTR_64_REBASE_TARGET_MASK))
 
             # Reached the end of the chain?
-            if chained_rebase_ptr.next == 0:
+            next_stride = (raw_pointer >> _CHAINED_PTR_64_NEXT_SHIFT) & _CHAINED_PTR_64_NEXT_MASK
+            if next_stride == 0:
                 break
+            chain_offset += next_stride * 4
         else:
             raise ValueError("Failed to find end of fixup pointer chain")
 
-        return rebased_pointers, dyld_bound_addresses_to_symbols
-
     @staticmethod
-    def read_uleb(data: bytearray, offset: int) -> Tuple[int, int]:
-        byte = data[offset]
-        offset += 1
-
-        result = byte & 0x7F
-        shift = 7
-        while byte & 0x80:
-            byte = data[offset]
-            result |= (byte & 0x7F) << shift
-            shift += 7
-            offset += 1
-
-        # attempt to catch signed values and convert them if encountered
-        if result > 0x100000000:
-            result = c_long(result).value
+    def read_uleb(data: Union[bytes, bytearray, memoryview], offset: int) -> Tuple[int, int]:
+        """Read an unsigned LEB128 value, returning the value and the offset of the byte following it."""
+        return read_uleb(data, offset)
 
-        return result, offset
+    @staticmethod
+    def read_sleb(data: Union[bytes, bytearray, memoryview], offset: int) -> Tuple[int, int]:
+        """Read a signed LEB128 value, returning the value and the offset of the byte following it."""
+        return read_sleb(data, offset)
 
     @staticmethod
     def parse_dyld_info(binary: MachoBinary) -> Dict[VirtualMemoryPointer, DyldBoundSymbol]:
@@ -319,86 +531,206 @@ class DyldInfoParser:
             ),
         }
 
+    @staticmethod
+    def parse_dyld_info_rebases(binary: MachoBinary) -> Dict[VirtualMemoryPointer, VirtualMemoryPointer]:
+        """Parses the LC_DYLD_INFO rebase opcodes
+        Returns:
+            Dict[address containing a pointer needing to be rebased, destination assuming the stated virtual base]
+        """
+        addresses, targets = DyldInfoParser.read_rebase_table(binary)
+        return dict(zip(map(VirtualMemoryPointer, addresses), map(VirtualMemoryPointer, targets)))
+
+    @staticmethod
+    def read_rebase_table(binary: MachoBinary) -> Tuple["array[int]", "array[int]"]:
+        """Interpret the LC_DYLD_INFO rebase opcodes, returning a pair of matched arrays.
+        The first array contains the virtual address of each pointer that dyld rebases.
+        The second array contains the pointer stored at each of these addresses, assuming the stated virtual base.
+        Like the bind opcodes, unknown opcodes and rebases outside of their segment are logged and skipped.
+        """
+        addresses = array("Q")
+        targets = array("Q")
+        if not binary.dyld_info:
+            raise ValueError("This method expects the provided binary to contain LC_DYLD_INFO")
+        if not binary.dyld_info.rebase_size:
+            return addresses, targets
+
+        rebase_info = bytes(binary.get_bytes(binary.dyld_info.rebase_off, binary.dyld_info.rebase_size))
+        pointer_size = sizeof(binary.platform_word_type)
+        unpack_pointer = struct.Struct("<Q" if binary.is_64bit else "<I").unpack_from
+        pointer_typecode = "Q" if binary.is_64bit else "I"
+        segment_address = 0
+        segment_file_offset = 0
+        segment_size = 0
+        segment_data: Optional[memoryview] = memoryview(b"")
+        segment_offset = 0
+
+        def do_rebases(count: int, stride: int) -> None:
+            nonlocal segment_offset
+            if count > 1 and stride == pointer_size and segment_data is not None:
+                run_end = segment_offset + count * stride
+                if run_end <= len(segment_data):
+                    # A run of adjacent pointers, such as a pointer-list section. Decode the run at once
+                    run = little_endian_array(pointer_typecode, segment_data[segment_offset:run_end])
+                    addresses.extend(range(segment_address + segment_offset, segment_address + run_end, stride))
+                    targets.extend(run if binary.is_64bit else run.tolist())
+                    segment_offset = run_end
+                    return
+
+            for rebase_idx in range(count):
+                if segment_offset + pointer_size > segment_size:
+                    # Rebases only move forwards, so the rest of the run is outside the segment too
+                    logger.error(f"Skipping {count - rebase_idx} rebases outside of their segment")
+                    segment_offset += (count - rebase_idx) * stride
+                    return
+
+                if segment_data is not None:
+                    addresses.append(segment_address + segment_offset)
+                    targets.append(unpack_pointer(segment_data, segment_offset)[0])
+                else:
+                    # The segment overlaps the encrypted range. Read each pointer on its own, and skip encrypted ones
+                    try:
+                        pointer_bytes = binary.get_bytes(
+                            StaticFilePointer(segment_file_offset + segment_offset), pointer_size
+                        )
+                        targets.append(unpack_pointer(pointer_bytes)[0])
+                        addresses.append(segment_address + segment_offset)
+                    except BinaryEncryptedError:
+                        pass
+                segment_offset += stride
+
+        index = 0
+        while index < len(rebase_info):
+            byte = rebase_info[index]
+            opcode = byte & _REBASE_OPCODE_MASK
+            immediate = byte & _REBASE_IMMEDIATE_MASK
+            index += 1
+
+            if opcode == _REBASE_OPCODE_DO_REBASE_IMM_TIMES:
+                do_rebases(immediate, pointer_size)
+            elif opcode == _REBASE_OPCODE_ADD_ADDR_IMM_SCALED:
+                segment_offset += immediate * pointer_size
+            elif opcode == _REBASE_OPCODE_DO_REBASE_ULEB_TIMES:
+                count, index = read_uleb(rebase_info, index)
+                do_rebases(count, pointer_size)
+            elif opcode == _REBASE_OPCODE_DO_REBASE_ADD_ADDR_ULEB:
+                skip, index = read_uleb(rebase_info, index)
+                do_rebases(1, pointer_size + skip)
+            elif opcode == _REBASE_OPCODE_ADD_ADDR_ULEB:
+                addend, index = read_uleb(rebase_info, index)
+                segment_offset = (segment_offset + addend) & _UINT64_MASK
+            elif opcode == _REBASE_OPCODE_DO_REBASE_ULEB_TIMES_SKIPPING_ULEB:
+                count, index = read_uleb(rebase_info, index)
+                skip, index = read_uleb(rebase_info, index)
+                do_rebases(count, pointer_size + skip)
+            elif opcode == _REBASE_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB:
+                segment_offset, index = read_uleb(rebase_info, index)
+                try:
+                    segment = binary.segment_for_index(immediate)
+                except ValueError:
+                    # Skip rebases until a valid segment is selected
+                    logger.error(f"dyld rebase opcode selects an invalid segment index {immediate}")
+                    segment_address = segment_file_offset = segment_size = 0
+                    segment_data = memoryview(b"")
+                    continue
+                segment_address = int(segment.vmaddr)
+                segment_file_offset = int(segment.offset)
+                segment_size = int(segment.size)
+                if binary.is_range_encrypted(segment.offset, segment.size):
+                    segment_data = None
+                else:
+                    segment_data = binary.get_bytes(segment.offset, segment.size)
+                    # The segment may extend past the end of the file
+                    segment_size = min(segment_size, len(segment_data))
+            elif opcode == _REBASE_OPCODE_SET_TYPE_IMM:
+                # PT: Every rebase type (pointer, and the 32-bit text relocations) rewrites a pointer-sized word
+                pass
+            elif opcode == _REBASE_OPCODE_DONE:
+                break
+            else:
+                logger.error(f"unknown dyld rebase opcode {hex(opcode)}, immediate {hex(immediate)}")
+
+        return addresses, targets
+
     @staticmethod
     def _parse_dyld_bytestream(
         binary: MachoBinary, file_offset: StaticFilePointer, size: int
     ) -> Dict[VirtualMemoryPointer, DyldBoundSymbol]:
-        from ctypes import sizeof
-
         dyld_stubs_to_symbols: Dict[VirtualMemoryPointer, DyldBoundSymbol] = {}
 
-        binding_info = binary.get_bytes(file_offset, size)
+        binding_info = bytes(binary.get_bytes(file_offset, size))
         pointer_size = sizeof(binary.platform_word_type)
 
         index = 0
-        name_bytes: bytearray
+        name = ""
         segment_index = 0
+        # Resolved from segment_index on the first bind that uses it
+        segment_address: Optional[int] = None
         segment_offset = 0
         library_ordinal = 0
 
         def commit_stub() -> None:
-            segment_command = binary.segment_for_index(segment_index)
-            segment_start = segment_command.vmaddr
-            stub_addr = VirtualMemoryPointer(segment_start + segment_offset)
-            name = name_bytes.decode("utf-8")
-
-            symbol = DyldBoundSymbol(binary, stub_addr, library_ordinal, name)
-            dyld_stubs_to_symbols[stub_addr] = symbol
-
-        while index != len(binding_info):
+            nonlocal segment_address
+            if segment_address is None:
+                segment_address = int(binary.segment_for_index(segment_index).vmaddr)
+            stub_addr = VirtualMemoryPointer(segment_address + segment_offset)
+            dyld_stubs_to_symbols[stub_addr] = DyldBoundSymbol(binary, stub_addr, library_ordinal, name)
+
+        binding_info_size = len(binding_info)
+        while index < binding_info_size:
             byte = binding_info[index]
-            opcode = BindOpcode.BIND_OPCODE_MASK & byte
-            immediate = BindOpcode.BIND_IMMEDIATE_MASK & byte
+            opcode = byte & _BIND_OPCODE_MASK
+            immediate = byte & _BIND_IMMEDIATE_MASK
             index += 1
 
-            if opcode == BindOpcode.BIND_OPCODE_DONE:
-                pass
-            elif opcode == BindOpcode.BIND_OPCODE_SET_DYLIB_ORDINAL_IMM:
-                library_ordinal = immediate
-            elif opcode == BindOpcode.BIND_OPCODE_SET_DYLIB_ORDINAL_ULEB:
-                library_ordinal, index = DyldInfoParser.read_uleb(binding_info, index)
-            elif opcode == BindOpcode.BIND_OPCODE_SET_DYLIB_SPECIAL_IMM:
-                if immediate == 0:
-                    library_ordinal = BindSpecialDylibOrdinal.BIND_SPECIAL_DYLIB_SELF
-                else:
-                    library_ordinal = c_int8(BindOpcode.BIND_OPCODE_MASK | immediate).value
-            elif opcode == BindOpcode.BIND_OPCODE_SET_SYMBOL_TRAILING_FLAGS_IMM:
-                name_end = binding_info.find(b"\0", index)
-                name_bytes = binding_info[index:name_end]
-                index = name_end
-            elif opcode == BindOpcode.BIND_OPCODE_SET_TYPE_IMM:
-                pass
-            elif opcode == BindOpcode.BIND_OPCODE_SET_ADDEND_SLEB:
-                _, index = DyldInfoParser.read_uleb(binding_info, index)
-            elif opcode == BindOpcode.BIND_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB:
-                segment_index = immediate
-                segment_offset, index = DyldInfoParser.read_uleb(binding_info, index)
-            elif opcode == BindOpcode.BIND_OPCODE_ADD_ADDR_ULEB:
-                addend, index = DyldInfoParser.read_uleb(binding_info, index)
-                segment_offset += addend
-            elif opcode == BindOpcode.BIND_OPCODE_DO_BIND:
+            if opcode == _BIND_OPCODE_DO_BIND:
                 commit_stub()
                 segment_offset += pointer_size
-            elif opcode == BindOpcode.BIND_OPCODE_DO_BIND_ADD_ADDR_ULEB:
+            elif opcode == _BIND_OPCODE_SET_SYMBOL_TRAILING_FLAGS_IMM:
+                name_end = binding_info.index(b"\0", index)
+                name = binding_info[index:name_end].decode("utf-8")
+                index = name_end + 1
+            elif opcode == _BIND_OPCODE_SET_DYLIB_ORDINAL_IMM:
+                library_ordinal = immediate
+            elif opcode == _BIND_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB:
+                segment_index = immediate
+                segment_address = None
+                segment_offset, index = read_uleb(binding_info, index)
+            elif opcode == _BIND_OPCODE_SET_TYPE_IMM:
+                pass
+            elif opcode == _BIND_OPCODE_DONE:
+                # Lazy binding info holds a run of opcodes for each symbol, each ending with BIND_OPCODE_DONE
+                pass
+            elif opcode == _BIND_OPCODE_ADD_ADDR_ULEB:
+                addend, index = read_uleb(binding_info, index)
+                segment_offset = (segment_offset + addend) & _UINT64_MASK
+            elif opcode == _BIND_OPCODE_DO_BIND_ADD_ADDR_ULEB:
                 commit_stub()
-                segment_offset += pointer_size
-
-                addend, index = DyldInfoParser.read_uleb(binding_info, index)
-                segment_offset += addend
-            elif opcode == BindOpcode.BIND_OPCODE_DO_BIND_ADD_ADDR_IMM_SCALED:
+                addend, index = read_uleb(binding_info, index)
+                segment_offset = (segment_offset + pointer_size + addend) & _UINT64_MASK
+            elif opcode == _BIND_OPCODE_DO_BIND_ADD_ADDR_IMM_SCALED:
                 commit_stub()
                 # I think the format is <immediate>, <repeat times>
                 # So, we always reserve at least one pointer, then skip the 'repeat' count pointers.
                 segment_offset += pointer_size + (immediate * pointer_size)
-            elif opcode == BindOpcode.BIND_OPCODE_DO_BIND_ULEB_TIMES_SKIPPING_ULEB:
-                count, index = DyldInfoParser.read_uleb(binding_info, index)
-                skip, index = DyldInfoParser.read_uleb(binding_info, index)
-                for i in range(count):
+            elif opcode == _BIND_OPCODE_DO_BIND_ULEB_TIMES_SKIPPING_ULEB:
+                count, index = read_uleb(binding_info, index)
+                skip, index = read_uleb(binding_info, index)
+                for _ in range(count):
                     commit_stub()
                     segment_offset += pointer_size + skip
-            elif opcode == BindOpcode.BIND_OPCODE_THREADED:
+            elif opcode == _BIND_OPCODE_SET_ADDEND_SLEB:
+                # The addend applies to the bound pointer rather than its address, so it isn't tracked
+                _, index = read_sleb(binding_info, index)
+            elif opcode == _BIND_OPCODE_SET_DYLIB_ORDINAL_ULEB:
+                library_ordinal, index = read_uleb(binding_info, index)
+            elif opcode == _BIND_OPCODE_SET_DYLIB_SPECIAL_IMM:
+                if immediate == 0:
+                    library_ordinal = BindSpecialDylibOrdinal.BIND_SPECIAL_DYLIB_SELF
+                else:
+                    library_ordinal = c_int8(_BIND_OPCODE_MASK | immediate).value
+            elif opcode == _BIND_OPCODE_THREADED:
                 if immediate == BindOpcode.BIND_SUBOPCODE_THREADED_SET_BIND_ORDINAL_TABLE_SIZE_ULEB:
-                    target_table_count, index = DyldInfoParser.read_uleb(binding_info, index)
+                    target_table_count, index = read_uleb(binding_info, index)
                     if target_table_count >= (pow(2, 16) - 1):
                         raise ValueError("Invalid target_table_count")
                 elif immediate == BindOpcode.BIND_SUBOPCODE_THREADED_APPLY:
@@ -1,5 +1,7 @@
+import mmap
 from ctypes import Structure, c_uint32, sizeof
 from pathlib import Path
+from types import TracebackType
 from typing import Dict, List, Optional, Tuple, Type, TypeVar
 
 from strongarm.logger import strongarm_logger
@@ -25,6 +27,9 @@ class DyldSharedCacheParser:
     Useful links:
         https://opensource.apple.com/source/dyld/dyld-195.6/launch-cache/dsc_iterator.cpp.auto.html
         https://opensource.apple.com/source/dyld/dyld-655.1.1/launch-cache/dyld_cache_format.h.auto.html
+
+    The cache file is memory-mapped once, and reads are served as read-only views into the mapping.
+    Use the parser as a context manager, or call close(), to release the mapping when finished with it.
     """
 
     # TODO(PT): Eventually, we could have a generic file-loader which shares some logic of MachoParser/DSCParser
@@ -34,6 +39,10 @@ class DyldSharedCacheParser:
     def __init__(self, path: Path) -> None:
         self.path = path
 
+        with open(self.path, "rb") as cache_file:
+            self._mapping: Optional[mmap.mmap] = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._file_contents: Optional[memoryview] = memoryview(self._mapping)
+
         # DSC's are split into 3 "mappings", or segments:
         # Mapping 0 is the executable segment. __TEXT of embedded binaries is placed here
         # Mapping 1 is the writable segment. __DATA/writable data of embedded binaries is placed here
@@ -50,22 +59,52 @@ class DyldSharedCacheParser:
 
         self._parse()
 
+    def __enter__(self) -> "DyldSharedCacheParser":
+        return self
+
+    def __exit__(
+        self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException], exc_tb: Optional[TracebackType]
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the mapping of the cache file. Reads from the parser are invalid after this call.
+        Views that were previously handed out (such as the data backing a DyldSharedCacheBinary) keep the pages
+        mapped until they are released.
+        """
+        if self._file_contents is None or self._mapping is None:
+            return
+
+        self._file_contents.release()
+        self._file_contents = None
+        try:
+            self._mapping.close()
+        except BufferError:
+            # Other views into the mapping are still alive. It'll be unmapped once the last of them is released
+            logger.debug(f"{self.path} is still referenced, deferring unmap")
+        self._mapping = None
+
+    @property
+    def file_contents(self) -> memoryview:
+        """A read-only view of the entire cache file."""
+        if self._file_contents is None:
+            raise ValueError(f"I/O operation on closed DyldSharedCacheParser: {self.path}")
+        return self._file_contents
+
     @property
     def file_magic(self) -> int:
         """Read file magic."""
-        return c_uint32.from_buffer(bytearray(self.get_bytes(StaticFilePointer(0), sizeof(c_uint32)))).value
+        return c_uint32.from_buffer_copy(self.get_bytes(StaticFilePointer(0), sizeof(c_uint32))).value
 
-    def get_bytes(self, offset: StaticFilePointer, size: int) -> bytes:
+    def get_bytes(self, offset: StaticFilePointer, size: int) -> memoryview:
         """Read a region of bytes from the input file
         Args:
             offset: Offset within file to begin reading from
             size: Maximum number of bytes to read
         Returns:
-            Byte list representing contents of file at provided address
+            Read-only view of the contents of file at provided address
         """
-        with open(str(self.path), "rb") as binary_file:
-            binary_file.seek(offset)
-            return binary_file.read(size)
+        return self.file_contents[offset : offset + size]
 
     def read_struct(self, file_offset: StaticFilePointer, struct_type: Type[_StructureT]) -> _StructureT:
         """Given a file offset, return the structure it describes
@@ -75,42 +114,27 @@ class DyldSharedCacheParser:
         Returns:
             struct_type loaded from the pointed address
         """
-        data = bytearray(self.get_bytes(file_offset, sizeof(struct_type)))
-        return struct_type.from_buffer(data)  # type: ignore
+        return struct_type.from_buffer_copy(self.get_bytes(file_offset, sizeof(struct_type)))  # type: ignore
 
     def _read_static_c_string(self, start_address: StaticFilePointer) -> Optional[str]:
         """Return a string containing the bytes from start_address up to the next NULL character
         This method will return None if the specified address does not point to a UTF-8 encoded string
         """
-        max_len = 16
-        symbol_name_characters = []
-        found_null_terminator = False
-
-        while not found_null_terminator:
-            name_bytes = self.get_bytes(start_address, max_len)
-            # search for null terminator in this content
-            for ch in name_bytes:
-                if ch == 0x00:
-                    found_null_terminator = True
-                    break
-                symbol_name_characters.append(ch)
-
-            # do we need to keep searching for the end of the symbol name?
-            if not found_null_terminator:
-                # since we read [start_address:start_address + max_len], trim that from search space
-                start_address += max_len
-                # double search space for next iteration
-                max_len *= 2
-            else:
-                # read full string!
-                try:
-                    symbol_name = bytearray(symbol_name_characters).decode("UTF-8")
-                    return symbol_name
-                except UnicodeDecodeError:
-                    # if decoding the string failed, we may have been passed an address which does not actually
-                    # point to a string
-                    return None
-        return None
+        mapping = self._mapping
+        if mapping is None:
+            raise ValueError(f"I/O operation on closed DyldSharedCacheParser: {self.path}")
+        if not 0 <= start_address < len(mapping):
+            return None
+        # Search the mapping directly rather than copying out chunks of it
+        end_address = mapping.find(b"\x00", start_address)
+        if end_address == -1:
+            return None
+        try:
+            return str(self.file_contents[start_address:end_address], "utf-8")
+        except UnicodeDecodeError:
+            # if decoding the string failed, we may have been passed an address which does not actually
+            # point to a string
+            return None
 
     def _parse(self) -> None:
         # Read the shared-cache header
@@ -234,17 +258,21 @@ class DyldSharedCacheBinary(MachoBinary):
     """
 
     def __init__(
-        self, dsc_parser: "DyldSharedCacheParser", path: Path, file_offset: StaticFilePointer, binary_data: bytes
+        self, dsc_parser: "DyldSharedCacheParser", path: Path, file_offset: StaticFilePointer, binary_data: memoryview
     ) -> None:
         self.dyld_shared_cache_parser = dsc_parser
         self.dyld_shared_cache_file_offset = file_offset
         super().__init__(path, binary_data)
 
+    def get_backing_file_region(self) -> Optional[Tuple[Path, StaticFilePointer, int]]:
+        # Reads from a DSC image are scattered across the cache, so there's no single region that backs it
+        return None
+
     def file_offset_for_virtual_address(self, virtual_address: VirtualMemoryPointer) -> StaticFilePointer:
         # Translate into the global DSC file
         return self.dyld_shared_cache_parser.translate_virtual_address_to_static(virtual_address)
 
-    def get_bytes(self, offset: StaticFilePointer, size: int, _translate_addr_to_file: bool = True) -> bytearray:
+    def get_bytes(self, offset: StaticFilePointer, size: int, _translate_addr_to_file: bool = True) -> memoryview:
         # There are two possibilities: The requested data is "binary-local", meaning it's within the __TEXT buffer
         # backing this object. Or, the requested data is somewhere within the global DSC.
         # It would be clear which is the case from the calling context. For example, if the pointer comes from
@@ -253,15 +281,23 @@ class DyldSharedCacheBinary(MachoBinary):
         # from every get_bytes caller, so try to determine what data is being requested here.
         # If offset+size refers to an address outside the local image, translate and read from the global DSC.
         # Otherwise, don't translate and read directly from the global DSC.
+        offset = self._dsc_file_offset(offset, size, _translate_addr_to_file)
+        return self.dyld_shared_cache_parser.get_bytes(offset, size)
+
+    def _dsc_file_offset(self, offset: StaticFilePointer, size: int, translate: bool = True) -> StaticFilePointer:
+        """Translate the offset of a read of `size` bytes into an offset within the global DSC. See get_bytes()."""
         if offset + size > self.dyld_shared_cache_file_offset + len(self._cached_binary):
             logger.debug(f"Reading from addr outside __TEXT: {offset}")
             # This address is outside the binary's buffer. If translation was disabled, an assumption has been violated
-            assert _translate_addr_to_file, f"Must translate addr outside __TEXT: {offset}"
+            assert translate, f"Must translate addr outside __TEXT: {offset}"
 
         else:
-            if _translate_addr_to_file:
+            if translate:
                 offset += self.dyld_shared_cache_file_offset
             else:
                 logger.debug(f"Translation explicitly disabled, direct read of {offset}")
 
-        return bytearray(self.dyld_shared_cache_parser.get_bytes(offset, size))
+        return offset
+
+    def _read_c_string(self, offset: StaticFilePointer) -> Optional[str]:
+        return self.dyld_shared_cache_parser._read_static_c_string(self._dsc_file_offset(offset, 1))
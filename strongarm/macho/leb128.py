@@ -0,0 +1,61 @@
+from array import array
+from typing import Tuple, Union
+
+_BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def read_uleb(data: _BytesLike, offset: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 value, returning the value and the offset of the byte following it."""
+    byte = data[offset]
+    offset += 1
+    result = byte & 0x7F
+    shift = 7
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+    return result, offset
+
+
+def read_sleb(data: _BytesLike, offset: int) -> Tuple[int, int]:
+    """Read a signed LEB128 value, returning the value and the offset of the byte following it."""
+    byte = data[offset]
+    offset += 1
+    result = byte & 0x7F
+    shift = 7
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+    # The value is negative if the sign bit of the final byte is set
+    if byte & 0x40:
+        result -= 1 << shift
+    return result, offset
+
+
+def read_uleb_deltas(data: _BytesLike, base: int) -> "array[int]":
+    """Decode a run of ULEB128 deltas, such as LC_FUNCTION_STARTS, into the running totals starting from base.
+    A zero delta terminates the run, and anything following it (such as the padding to pointer alignment) is ignored.
+    """
+    # The whole run is decoded in one loop over the bytes, rather than in a call per value
+    totals = array("Q")
+    append = totals.append
+    total = base
+    value = 0
+    shift = 0
+    for byte in bytes(data):
+        if byte & 0x80:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            continue
+
+        value |= byte << shift
+        if not value:
+            break
+        total += value
+        append(total)
+        value = 0
+        shift = 0
+    return totals
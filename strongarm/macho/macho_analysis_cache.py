@@ -0,0 +1,123 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+from strongarm import __version__
+from strongarm.logger import strongarm_logger
+from strongarm.macho.macho_binary import MachoBinary
+
+logger = strongarm_logger.getChild(__file__)
+
+
+class MachoAnalysisCache:
+    """An on-disk cache of MachoAnalyzer databases, so that re-analyzing an unchanged binary can reuse earlier work.
+
+    Entries are keyed by a hash of the analyzed slice's contents, and are only valid for the strongarm version (and
+    database schema version) that wrote them. Entries written by any other version are removed when the cache is
+    opened. Once the cache grows past max_size_bytes, the least-recently-used entries are evicted.
+
+    To enable the cache, assign an instance to MachoAnalyzer.ANALYSIS_CACHE.
+    """
+
+    # Bump this whenever the contents of the analyzer database change without a strongarm version bump
+    SCHEMA_VERSION = 1
+    _ENTRY_SUFFIX = ".db"
+
+    def __init__(self, directory: Path, max_size_bytes: int = 8 * 1024**3) -> None:
+        self.directory = directory
+        self.max_size_bytes = max_size_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._remove_stale_entries()
+
+    def __repr__(self) -> str:
+        return f"<MachoAnalysisCache {self.directory.as_posix()}>"
+
+    @property
+    def version_tag(self) -> str:
+        """The tag identifying entries that this version of strongarm can use."""
+        return f"{__version__}-{self.SCHEMA_VERSION}"
+
+    def key_for_binary(self, binary: MachoBinary) -> str:
+        return f"{binary.get_content_hash()}-{self.version_tag}"
+
+    def _path_for_key(self, key: str) -> Path:
+        return self.directory / f"{key}{self._ENTRY_SUFFIX}"
+
+    def _entries(self) -> List[Path]:
+        return [p for p in self.directory.iterdir() if p.suffix == self._ENTRY_SUFFIX]
+
+    def _remove_stale_entries(self) -> None:
+        """Delete entries that were written by a different strongarm or schema version."""
+        for entry in self._entries():
+            if not entry.stem.endswith(f"-{self.version_tag}"):
+                logger.debug(f"Removing stale analysis cache entry {entry.name}")
+                self._remove_entry(entry)
+
+    @staticmethod
+    def _remove_entry(entry: Path) -> None:
+        try:
+            entry.unlink()
+        except FileNotFoundError:
+            # Another process got to it first
+            pass
+
+    def restore(self, key: str, destination: Path) -> bool:
+        """Copy the cached database for the key to the destination path.
+        Returns whether there was a cached database for the key.
+        """
+        entry = self._path_for_key(key)
+        try:
+            shutil.copyfile(entry.as_posix(), destination.as_posix())
+            # Mark the entry as recently used
+            os.utime(entry.as_posix())
+        except FileNotFoundError:
+            return False
+
+        logger.debug(f"Restored analysis database from {entry.name}")
+        return True
+
+    def store(self, key: str, db_handle: sqlite3.Connection) -> None:
+        """Save a snapshot of the database behind db_handle as the cache entry for the key."""
+        entry = self._path_for_key(key)
+        # Write to a temporary file first, then move it into place, so readers never see a partially-written entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory.as_posix(), suffix=".tmp")
+        os.close(fd)
+        try:
+            with closing(sqlite3.connect(temp_path)) as snapshot:
+                db_handle.backup(snapshot)
+            os.replace(temp_path, entry.as_posix())
+        except BaseException:
+            self._remove_entry(Path(temp_path))
+            raise
+
+        logger.debug(f"Stored analysis database as {entry.name}")
+        self.evict(keep=entry)
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """Delete least-recently-used entries until the cache fits within max_size_bytes."""
+        entries_and_stats = []
+        for entry in self._entries():
+            try:
+                entries_and_stats.append((entry, entry.stat()))
+            except FileNotFoundError:
+                continue
+
+        total_size = sum(stat.st_size for _, stat in entries_and_stats)
+        # Oldest first
+        for entry, stat in sorted(entries_and_stats, key=lambda e: e[1].st_mtime):
+            if total_size <= self.max_size_bytes:
+                break
+            if entry == keep:
+                continue
+            logger.debug(f"Evicting analysis cache entry {entry.name}")
+            self._remove_entry(entry)
+            total_size -= stat.st_size
+
+    def clear(self) -> None:
+        """Delete every entry in the cache."""
+        for entry in self._entries():
+            self._remove_entry(entry)
@@ -1,23 +1,31 @@
 import functools
+import math
+import mmap
 import pathlib
 import shutil
 import sqlite3
 import tempfile
 import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import closing
 from ctypes import sizeof
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type, TypeVar, Union, cast
 
 from capstone import CS_ARCH_ARM64, CS_MODE_ARM, Cs, CsInsn
-from more_itertools import first, pairwise
+from more_itertools import chunked, pairwise
 
 from strongarm.logger import strongarm_logger
 from strongarm.macho.arch_independent_structs import CFString32, CFString64, CFStringStruct
 from strongarm.macho.dyld_info_parser import DyldBoundSymbol
+from strongarm.macho.macho_analysis_cache import MachoAnalysisCache
+from strongarm.macho.macho_analyzer_cache import MachoAnalyzerCache
 from strongarm.macho.macho_binary import InvalidAddressError, MachoBinary
 from strongarm.macho.macho_definitions import VirtualMemoryPointer
-from strongarm.macho.macho_imp_stubs import MachoImpStubsParser
+from strongarm.macho.macho_export_trie import ExportSymbolFlags
+from strongarm.macho.macho_imp_stubs import MachoImpStub, MachoImpStubsParser
 from strongarm.macho.macho_string_table_helper import MachoStringTableHelper
 from strongarm.macho.objc_runtime_data_parser import (
     ObjcCategory,
@@ -75,8 +83,57 @@ ANALYZER_SQL_SCHEMA = """
         accessor_address INT,
         accessor_func_start_address INT
     );
+
+    CREATE TABLE analyzer_stages(
+        name TEXT PRIMARY KEY
+    );
+"""
+
+# Secondary indexes over the tables above. Each group is created once its tables have been bulk-loaded, which is
+# cheaper than maintaining the indexes during the inserts.
+# function_boundaries and basic_blocks are already indexed on entry_point by their UNIQUE constraints.
+ANALYZER_SQL_CALLABLE_SYMBOL_INDEXES = """
+    CREATE INDEX IF NOT EXISTS named_callable_symbols_address ON named_callable_symbols(address);
+    CREATE INDEX IF NOT EXISTS named_callable_symbols_symbol_name ON named_callable_symbols(symbol_name);
+"""
+
+ANALYZER_SQL_XREF_INDEXES = """
+    CREATE INDEX IF NOT EXISTS function_calls_destination_address ON function_calls(destination_address);
+    CREATE INDEX IF NOT EXISTS objc_msgSends_class_name_selector ON objc_msgSends(class_name, selector);
+    CREATE INDEX IF NOT EXISTS objc_msgSends_selector ON objc_msgSends(selector);
+    CREATE INDEX IF NOT EXISTS string_xrefs_string_literal ON string_xrefs(string_literal);
+    CREATE INDEX IF NOT EXISTS string_xrefs_accessor_func_start_address ON string_xrefs(accessor_func_start_address);
 """
 
+# The stages of analysis that MachoAnalyzer performs on demand, each mapped to the stages it depends on.
+# See MachoAnalyzer.warm().
+ANALYZER_STAGE_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    # Symbol names from the string table
+    "string_table": (),
+    # __stubs functions, found by disassembling the stubs section
+    "imp_stubs": (),
+    # The named_callable_symbols table
+    "callable_symbols": ("string_table", "imp_stubs"),
+    # The function_boundaries and basic_blocks tables
+    "function_boundaries": (),
+    # Lookup tables from string literals to their CFString and C string addresses
+    "cfstring_map": (),
+    "cstring_map": (),
+    # The function_calls, objc_msgSends and string_xrefs tables
+    "xrefs": ("callable_symbols", "function_boundaries"),
+}
+# The stages whose results are stored in the analyzer database, and can be restored from an ANALYSIS_CACHE
+_ANALYZER_DATABASE_STAGES = {"callable_symbols", "function_boundaries", "xrefs"}
+
+# The analyzer database is a scratch file that's thrown away with the analyzer, so durability isn't needed
+DEFAULT_ANALYZER_SQL_PRAGMAS: Dict[str, Union[int, str]] = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    # Negative values are in KiB
+    "cache_size": -65536,
+    "temp_store": "MEMORY",
+}
+
 
 class DisassemblyFailedError(Exception):
     """Raised when Capstone fails to disassemble a bytecode sequence."""
@@ -95,6 +152,16 @@ class ObjcMsgSendXref(CallerXRef):
     selector: Optional[str]
 
 
+@dataclass(order=True, frozen=True)
+class ObjcMsgSendPredicate:
+    """Matches the _objc_msgSend call-sites that message a class, a selector, or a selector on a class.
+    A field that's None matches any value.
+    """
+
+    class_name: Optional[str] = None
+    selector: Optional[str] = None
+
+
 @dataclass
 class CallableSymbol:
     """A locally-defined function or externally-defined imported function."""
@@ -104,20 +171,67 @@ class CallableSymbol:
     symbol_name: str
 
 
+@dataclass
+class ObjcClassrefIndex:
+    """Maps between the classrefs in __objc_classrefs, the names of the classes they refer to, and the addresses of
+    the __objc_data structs of the classes implemented within the binary.
+    Where a class has several classrefs, the first one is used.
+    """
+
+    classrefs_to_class_names: Dict[VirtualMemoryPointer, str]
+    class_names_to_classrefs: Dict[str, VirtualMemoryPointer]
+    objc_data_to_class_names: Dict[VirtualMemoryPointer, str]
+    class_names_to_objc_data: Dict[str, VirtualMemoryPointer]
+
+
 CallableT = TypeVar("CallableT", bound=Callable)
 
 
-def _requires_xrefs_computed(func: CallableT) -> CallableT:
-    @functools.wraps(func)
-    def wrap(self: "MachoAnalyzer", *args: Any, **kwargs: Any) -> Any:
-        if not self._has_computed_xrefs:
-            logger.info(
-                f"called {func.__name__} before XRefs were computed for {self.binary.path.name}, computing now..."
-            )
-            self._build_xref_database()
-        return func(self, *args, **kwargs)
+def _compute_basic_blocks_in_file_region(
+    path: str, region_offset: int, region_size: int, functions: List[Tuple[int, int, int]]
+) -> List[Tuple[int, List[Tuple[int, int]]]]:
+    """Compute the basic blocks of each (entry point, file offset, size) function within a region of a file.
+    Runs in MachoAnalyzer's worker processes. File offsets are relative to the start of the region.
+    """
+    from strongarm_dataflow.dataflow import compute_function_basic_blocks_fast
 
-    return cast(CallableT, wrap)
+    results = []
+    with open(path, "rb") as binary_file, mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+        with memoryview(mapping) as file_contents, file_contents[region_offset : region_offset + region_size] as region:
+            for entry_point, file_offset, size in functions:
+                # The extension never releases buffers passed to it, which would prevent the mapping from being closed.
+                # Pass it a copy of the function's bytes instead.
+                bytecode = bytes(region[file_offset : file_offset + size])
+                basic_block_starts = compute_function_basic_blocks_fast(bytecode, entry_point)
+                # Convert basic-block starts to [start, end] pairs
+                results.append((entry_point, list(pairwise(basic_block_starts))))
+    return results
+
+
+def _delete_analyzer_database(db_handle: sqlite3.Connection, db_tempdir: pathlib.Path) -> None:
+    logger.debug(f"Deleting db in {db_tempdir}...")
+    db_handle.close()
+    shutil.rmtree(db_tempdir.as_posix(), ignore_errors=True)
+
+
+def _requires_stages(*stages: str) -> Callable[[CallableT], CallableT]:
+    """Build the provided MachoAnalyzer stages (and their dependencies) before running the decorated method."""
+
+    def decorator(func: CallableT) -> CallableT:
+        @functools.wraps(func)
+        def wrap(self: "MachoAnalyzer", *args: Any, **kwargs: Any) -> Any:
+            for stage in stages:
+                if stage not in self._built_stages:
+                    logger.debug(f"called {func.__name__} before {stage} was built for {self.binary.path.name}")
+                    self._require_stage(stage)
+            return func(self, *args, **kwargs)
+
+        return cast(CallableT, wrap)
+
+    return decorator
+
+
+_requires_xrefs_computed = _requires_stages("xrefs")
 
 
 class cached_property(object):
@@ -150,8 +264,26 @@ class MachoAnalyzer:
     # Therefore, we want only one instance to exist for any MachoBinary
     # Thus, the preferred interface for getting an instance of this class is MachoAnalyzer.get_analyzer(binary),
     # which utilizes this cache
-    # XXX(PT): These references live to process termination, or until clear_cache() is called
-    _ANALYZER_CACHE: Dict[MachoBinary, "MachoAnalyzer"] = {}
+    # By default, analyzers live until clear_cache() is called. Use set_cache() to bound the cache or hold them weakly.
+    _ANALYZER_CACHE: MachoAnalyzerCache = MachoAnalyzerCache()
+
+    # PRAGMAs applied to each analyzer's database connection.
+    # Assign a different mapping (on this class or a subclass) before creating analyzers to tune the database.
+    SQL_PRAGMAS: Dict[str, Union[int, str]] = DEFAULT_ANALYZER_SQL_PRAGMAS
+
+    # On-disk cache of finished analyzer databases, keyed by the contents of the binary.
+    # Disabled by default. Assign a MachoAnalysisCache to reuse analysis across analyzer instances and processes.
+    ANALYSIS_CACHE: Optional[MachoAnalysisCache] = None
+
+    # Number of processes used to compute function boundaries and basic blocks. With 1, they're computed in-process.
+    # Parallel computation needs a binary that's mapped from a file (see MachoBinary.get_backing_file_region()),
+    # and is skipped for other binaries, or binaries with fewer functions than FUNCTION_BOUNDARY_MIN_CHUNK_SIZE.
+    FUNCTION_BOUNDARY_WORKERS: int = 1
+    # Smallest number of functions sent to a worker process at once
+    FUNCTION_BOUNDARY_MIN_CHUNK_SIZE: int = 1024
+
+    # Number of callable_symbol_for_address() results each analyzer memoizes
+    MAX_CACHED_CALLABLE_SYMBOLS: int = 64
 
     def __init__(self, binary: MachoBinary) -> None:
         self.binary = binary
@@ -162,38 +294,167 @@ class MachoAnalyzer:
         # Map of each __stub function to the associated name of the DyldBoundSymbol
         self._imported_symbol_addresses_to_names: Dict[VirtualMemoryPointer, str] = {}
 
-        self.crossref_helper = MachoStringTableHelper(binary)
-        self.imported_symbols = self.crossref_helper.imported_symbols
+        # Each analysis stage is built the first time something needs it. See ANALYZER_STAGE_DEPENDENCIES.
+        self._built_stages: Set[str] = set()
+        self._crossref_helper: Optional[MachoStringTableHelper] = None
+        self._imp_stubs: List[MachoImpStub] = []
+        self._cfstrings_to_stringrefs: Dict[str, VirtualMemoryPointer] = {}
+        self._cstrings_to_stringrefs: Dict[str, VirtualMemoryPointer] = {}
 
-        self.imp_stubs = MachoImpStubsParser(binary, self.cs).imp_stubs
         self._objc_helper: Optional[ObjcRuntimeDataParser] = None
         self._objc_method_list: List[ObjcMethodInfo] = []
 
         # Use a temporary database to store cross-referenced data. This provides constant-time lookups for things like
         # finding all the calls to a particular function.
-        self._has_computed_xrefs = False
         self._db_tempdir = pathlib.Path(tempfile.mkdtemp())
         self._db_path = self._db_tempdir / "strongarm.db"
+        restored_stages = self._restore_from_analysis_cache()
         self._db_handle = sqlite3.connect(self._db_path.as_posix())
-        cursor = self._db_handle.executescript(ANALYZER_SQL_SCHEMA)
-        with self._db_handle:
-            cursor.close()
-
-        self._build_callable_symbol_index()
-        self._build_function_boundaries_index()
-
-        self._cfstring_to_stringref_map = self._build_cfstring_map()
-        self._cstring_to_stringref_map = self._build_cstring_map()
+        # Delete the database once the analyzer is closed or garbage collected (or at exit, whichever comes first)
+        self._db_finalizer = weakref.finalize(self, _delete_analyzer_database, self._db_handle, self._db_tempdir)
+        self._apply_sql_pragmas()
+        # The database stages whose results are already in ANALYSIS_CACHE
+        self._analysis_cached_stages = restored_stages & _ANALYZER_DATABASE_STAGES
+        if restored_stages:
+            self._built_stages.update(self._analysis_cached_stages)
+        else:
+            cursor = self._db_handle.executescript(ANALYZER_SQL_SCHEMA)
+            with self._db_handle:
+                cursor.close()
 
         self.__cached_strings: Optional[Set[str]] = None
         self.__cached_cstrings: Optional[Set[str]] = None
+        self._callable_symbols_by_address: "OrderedDict[VirtualMemoryPointer, Optional[CallableSymbol]]" = OrderedDict()
 
         # Done setting up, store this analyzer in class cache
-        MachoAnalyzer._ANALYZER_CACHE[binary] = self
+        MachoAnalyzer._ANALYZER_CACHE.put(binary, self)
 
     def __repr__(self) -> str:
         return f"<MachoAnalyzer binary={self.binary.path.as_posix()}>"
 
+    def close(self) -> None:
+        """Close the analyzer's database and delete its temporary directory.
+        The analyzer can't be used afterwards. Analyzers are closed when they're evicted from the analyzer cache.
+        If ANALYSIS_CACHE is enabled, any analysis that hasn't been saved to it yet is saved first.
+        """
+        if self._db_finalizer.alive:
+            self._store_in_analysis_cache()
+        self._db_finalizer()
+
+    def database_size(self) -> int:
+        """The size of the analyzer's database on disk, in bytes."""
+        try:
+            return self._db_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def warm(self, stages: Optional[Iterable[str]] = None) -> None:
+        """Build the provided analysis stages now, rather than when they're first needed.
+        Stages are named in ANALYZER_STAGE_DEPENDENCIES. Their dependencies are built first.
+        If no stages are provided, every stage is built.
+        """
+        stages = list(ANALYZER_STAGE_DEPENDENCIES) if stages is None else list(stages)
+        unknown_stages = set(stages) - ANALYZER_STAGE_DEPENDENCIES.keys()
+        if unknown_stages:
+            raise ValueError(f"Unknown MachoAnalyzer stages: {', '.join(sorted(unknown_stages))}")
+
+        for stage in stages:
+            self._require_stage(stage)
+
+    def _require_stage(self, stage: str) -> None:
+        """Build the analysis stage, after its dependencies, unless it's already been built."""
+        if stage in self._built_stages:
+            return
+        for dependency in ANALYZER_STAGE_DEPENDENCIES[stage]:
+            self._require_stage(dependency)
+
+        start_time = time.time()
+        getattr(self, self._STAGE_BUILDERS[stage])()
+        self._built_stages.add(stage)
+        logger.debug(f"{self.binary.path.name} building {stage} took {time.time() - start_time} seconds")
+
+        if stage in _ANALYZER_DATABASE_STAGES:
+            self._mark_stage_completed(stage)
+            # Save the database once, after the last of its stages is built, rather than copying it after each stage
+            if _ANALYZER_DATABASE_STAGES <= self._built_stages:
+                self._store_in_analysis_cache()
+
+    def _build_string_table(self) -> None:
+        self._crossref_helper = MachoStringTableHelper(self.binary)
+
+    def _build_imp_stubs(self) -> None:
+        self._imp_stubs = MachoImpStubsParser(self.binary, self.cs).imp_stubs
+
+    def _build_cfstring_map_stage(self) -> None:
+        self._cfstrings_to_stringrefs = self._build_cfstring_map()
+
+    def _build_cstring_map_stage(self) -> None:
+        self._cstrings_to_stringrefs = self._build_cstring_map()
+
+    @property
+    def crossref_helper(self) -> MachoStringTableHelper:
+        self._require_stage("string_table")
+        return cast(MachoStringTableHelper, self._crossref_helper)
+
+    @property
+    def imported_symbols(self) -> List[str]:
+        return self.crossref_helper.imported_symbols
+
+    @property
+    def imp_stubs(self) -> List[MachoImpStub]:
+        self._require_stage("imp_stubs")
+        return self._imp_stubs
+
+    @property
+    def _cfstring_to_stringref_map(self) -> Dict[str, VirtualMemoryPointer]:
+        self._require_stage("cfstring_map")
+        return self._cfstrings_to_stringrefs
+
+    @property
+    def _cstring_to_stringref_map(self) -> Dict[str, VirtualMemoryPointer]:
+        self._require_stage("cstring_map")
+        return self._cstrings_to_stringrefs
+
+    def _apply_sql_pragmas(self) -> None:
+        for pragma_name, value in self.SQL_PRAGMAS.items():
+            # PRAGMA statements can't use bound parameters, so make sure nothing unexpected is interpolated
+            if not pragma_name.isidentifier() or not (isinstance(value, int) or value.isidentifier()):
+                raise ValueError(f"Invalid SQLite PRAGMA: {pragma_name} = {value}")
+            self._db_handle.execute(f"PRAGMA {pragma_name} = {value}").close()
+
+    def _restore_from_analysis_cache(self) -> Set[str]:
+        """Populate the analyzer's database from ANALYSIS_CACHE, if it's enabled and has an entry for this binary.
+        Returns the analysis stages recorded in the restored database, or an empty set if nothing was restored.
+        """
+        if not self.ANALYSIS_CACHE:
+            return set()
+        if not self.ANALYSIS_CACHE.restore(self.ANALYSIS_CACHE.key_for_binary(self.binary), self._db_path):
+            return set()
+
+        try:
+            with closing(sqlite3.connect(self._db_path.as_posix())) as db_handle:
+                with closing(db_handle.execute("SELECT name FROM analyzer_stages")) as cursor:
+                    return {x[0] for x in cursor}
+        except sqlite3.DatabaseError:
+            logger.warning(f"Ignoring unreadable analysis cache entry for {self.binary.path.name}")
+            self._db_path.unlink()
+            return set()
+
+    def _store_in_analysis_cache(self) -> None:
+        """Save the analyzer's database to ANALYSIS_CACHE, if it's enabled and has stages that haven't been saved."""
+        if not self.ANALYSIS_CACHE:
+            return
+        built_database_stages = self._built_stages & _ANALYZER_DATABASE_STAGES
+        if built_database_stages <= self._analysis_cached_stages:
+            return
+        self.ANALYSIS_CACHE.store(self.ANALYSIS_CACHE.key_for_binary(self.binary), self._db_handle)
+        self._analysis_cached_stages = built_database_stages
+
+    def _mark_stage_completed(self, stage_name: str) -> None:
+        """Record that an analysis stage's results are in the database, so a cached copy of it can skip the stage."""
+        with self._db_handle:
+            self._db_handle.execute("INSERT OR IGNORE INTO analyzer_stages VALUES (?)", (stage_name,)).close()
+
     @_requires_xrefs_computed
     def calls_to(self, address: VirtualMemoryPointer) -> List[CallerXRef]:
         """Return the list of code-locations within the binary which branch to the provided address."""
@@ -215,17 +476,74 @@ class MachoAnalyzer:
         Otherwise, a call-site will be yielded if one of the classes *or* one of the selectors are messaged
         at a call site.
         """
-        classes_int_list = ", ".join(f'"{x}"' for x in objc_class_names)
-        selectors_int_list = ", ".join(f'"{x}"' for x in objc_selectors)
+        # Load the names into the temporary predicates table rather than binding a parameter per name, as SQLite limits
+        # the number of parameters in a query
+        self._load_objc_msgSend_predicates(
+            [
+                *((class_name, None) for class_name in objc_class_names),
+                *((None, selector) for selector in objc_selectors),
+            ]
+        )
 
         # Do we require the class and selector being messaged to both be messaged at the same call site?
         query_predicate = "AND" if requires_class_and_sel_found else "OR"
         query = (
-            f"SELECT * from objc_msgSends"
-            f" WHERE class_name IN ({classes_int_list}) {query_predicate} selector IN ({selectors_int_list})"
+            "SELECT * from objc_msgSends WHERE"
+            " class_name IN (SELECT class_name FROM temp.objc_msgSend_predicates WHERE selector IS NULL)"
+            f" {query_predicate}"
+            " selector IN (SELECT selector FROM temp.objc_msgSend_predicates WHERE class_name IS NULL)"
         )
-        objc_calls_cursor = self._db_handle.execute(query)
-        return [ObjcMsgSendXref(x[0], x[1], x[2], x[3], x[4]) for x in objc_calls_cursor]
+        with closing(self._db_handle.execute(query)) as objc_calls_cursor:
+            return [ObjcMsgSendXref(x[0], x[1], x[2], x[3], x[4]) for x in objc_calls_cursor]
+
+    @_requires_xrefs_computed
+    def objc_calls_matching(
+        self, predicates: Iterable[ObjcMsgSendPredicate]
+    ) -> Dict[ObjcMsgSendPredicate, List[ObjcMsgSendXref]]:
+        """Return the code-locations in the binary which invoke _objc_msgSend, grouped by each predicate they match.
+        Every predicate is answered by a single query, so this is cheaper than calling objc_calls_to() per predicate.
+        Each provided predicate is a key of the returned Dict, mapped to an empty List if nothing matches it.
+        """
+        predicates_list = list(dict.fromkeys(predicates))
+        for predicate in predicates_list:
+            if predicate.class_name is None and predicate.selector is None:
+                raise ValueError(f"{predicate} must provide a class name or a selector")
+
+        # Join the call-sites against the predicates. Each kind of predicate is joined separately,
+        # so each join can use the index over the columns that it matches.
+        self._load_objc_msgSend_predicates([(x.class_name, x.selector) for x in predicates_list])
+        query = """
+            SELECT p.predicate_id, m.* FROM temp.objc_msgSend_predicates p
+                JOIN objc_msgSends m ON m.class_name = p.class_name AND m.selector = p.selector
+            UNION ALL
+            SELECT p.predicate_id, m.* FROM temp.objc_msgSend_predicates p
+                JOIN objc_msgSends m ON m.class_name = p.class_name
+                WHERE p.selector IS NULL
+            UNION ALL
+            SELECT p.predicate_id, m.* FROM temp.objc_msgSend_predicates p
+                JOIN objc_msgSends m ON m.selector = p.selector
+                WHERE p.class_name IS NULL
+        """
+        predicates_to_calls: Dict[ObjcMsgSendPredicate, List[ObjcMsgSendXref]] = {x: [] for x in predicates_list}
+        with closing(self._db_handle.execute(query)) as objc_calls_cursor:
+            for x in objc_calls_cursor:
+                predicates_to_calls[predicates_list[x[0]]].append(ObjcMsgSendXref(x[1], x[2], x[3], x[4], x[5]))
+        return predicates_to_calls
+
+    def _load_objc_msgSend_predicates(self, predicates: List[Tuple[Optional[str], Optional[str]]]) -> None:
+        """Replace the contents of the temporary objc_msgSend_predicates table with (class name, selector) pairs.
+        Each predicate's ID is its index.
+        """
+        with self._db_handle:
+            self._db_handle.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS objc_msgSend_predicates("
+                "predicate_id INT PRIMARY KEY, class_name TEXT, selector TEXT)"
+            ).close()
+            self._db_handle.execute("DELETE FROM temp.objc_msgSend_predicates").close()
+            self._db_handle.executemany(
+                "INSERT INTO temp.objc_msgSend_predicates VALUES (?, ?, ?)",
+                ((idx, class_name, selector) for idx, (class_name, selector) in enumerate(predicates)),
+            ).close()
 
     def _compute_function_basic_blocks(
         self, entry_point: VirtualMemoryPointer, end_address: VirtualMemoryPointer
@@ -243,13 +561,16 @@ class MachoAnalyzer:
                 sys.exit(1)
             raise
 
-        bytecode = self.binary.get_content_from_virtual_address(
-            virtual_address=entry_point, size=end_address - entry_point
+        # The extension never releases buffers passed to it, which would prevent the binary's mapping from being
+        # closed. Pass it a copy of the function's bytes instead.
+        bytecode = bytes(
+            self.binary.get_content_from_virtual_address(virtual_address=entry_point, size=end_address - entry_point)
         )
         basic_block_starts = compute_function_basic_blocks_fast(bytecode, entry_point)
         # Convert basic-block starts to [start, end] pairs
         return pairwise(x for x in basic_block_starts)
 
+    @_requires_stages("function_boundaries")
     def get_basic_block_boundaries(
         self, entry_point: VirtualMemoryPointer
     ) -> List[Tuple[VirtualMemoryPointer, VirtualMemoryPointer]]:
@@ -260,14 +581,8 @@ class MachoAnalyzer:
         with closing(cursor):
             return [(VirtualMemoryPointer(x[0]), VirtualMemoryPointer(x[1])) for x in cursor]
 
-    def _build_function_boundaries_index(self) -> None:
-        """Iterate all the entry points listed in the binary metadata and compute the end-of-function address for each.
-        The end-of-function address for each entry point is then stored in a DB table.
-
-        To compute function boundaries, each function's basic blocks are determined. The end-address is then the
-        final address in the final basic block.
-        """
-        cursor = self._db_handle.cursor()
+    def _function_ranges(self) -> List[Tuple[VirtualMemoryPointer, VirtualMemoryPointer]]:
+        """Pair each entry point in the binary with the address at which the next function begins."""
         sorted_entry_points = sorted(self.get_functions())
 
         # Computing a function boundaries uses the next entry point address as a hint. For the last entry point in the
@@ -281,23 +596,84 @@ class MachoAnalyzer:
             assert section is not None and section.end_address >= last_entry
             sorted_entry_points.append(VirtualMemoryPointer(section.end_address))
 
-        for entry_point, end_address in pairwise(sorted_entry_points):
-            # The end address of the function is the last instruction in the last basic block
-            basic_blocks = [x for x in self._compute_function_basic_blocks(entry_point, end_address)]
+        return list(pairwise(sorted_entry_points))
+
+    def _compute_basic_blocks_in_parallel(
+        self,
+        function_ranges: List[Tuple[VirtualMemoryPointer, VirtualMemoryPointer]],
+        backing_file_region: Tuple[pathlib.Path, int, int],
+    ) -> List[Tuple[int, List[Tuple[int, int]]]]:
+        """Compute the basic blocks of each function in a pool of FUNCTION_BOUNDARY_WORKERS processes.
+        Each worker maps the binary's file itself, so only entry points and offsets are sent between processes.
+        """
+        path, region_offset, region_size = backing_file_region
+        functions = [
+            (
+                int(entry_point),
+                int(self.binary.file_offset_for_virtual_address(entry_point)),
+                int(end_address - entry_point),
+            )
+            for entry_point, end_address in function_ranges
+        ]
+        # Hand out several chunks per worker so that a chunk of unusually large functions doesn't hold up the pool
+        chunk_size = max(
+            self.FUNCTION_BOUNDARY_MIN_CHUNK_SIZE, math.ceil(len(functions) / (self.FUNCTION_BOUNDARY_WORKERS * 4))
+        )
+
+        results = []
+        with ProcessPoolExecutor(max_workers=self.FUNCTION_BOUNDARY_WORKERS) as executor:
+            futures = [
+                executor.submit(
+                    _compute_basic_blocks_in_file_region, path.as_posix(), region_offset, region_size, chunk
+                )
+                for chunk in chunked(functions, chunk_size)
+            ]
+            for future in futures:
+                results.extend(future.result())
+        return results
+
+    def _build_function_boundaries_index(self) -> None:
+        """Iterate all the entry points listed in the binary metadata and compute the end-of-function address for each.
+        The end-of-function address for each entry point is then stored in a DB table.
+
+        To compute function boundaries, each function's basic blocks are determined. The end-address is then the
+        final address in the final basic block.
+        """
+        function_ranges = self._function_ranges()
+
+        basic_blocks_by_function: Iterable[Tuple[int, List[Tuple[int, int]]]]
+        backing_file_region = self.binary.get_backing_file_region()
+        if (
+            self.FUNCTION_BOUNDARY_WORKERS > 1
+            and len(function_ranges) > self.FUNCTION_BOUNDARY_MIN_CHUNK_SIZE
+            and backing_file_region
+            # Reads from the encrypted range must raise BinaryEncryptedError, which only the serial path does
+            and not self.binary.is_encrypted()
+        ):
+            basic_blocks_by_function = self._compute_basic_blocks_in_parallel(function_ranges, backing_file_region)
+        else:
+            basic_blocks_by_function = (
+                (entry_point, list(self._compute_function_basic_blocks(entry_point, end_address)))
+                for entry_point, end_address in function_ranges
+            )
+
+        function_boundary_rows: List[Tuple[int, int]] = []
+        basic_block_rows: List[Tuple[int, int, int]] = []
+        for entry_point, basic_blocks in basic_blocks_by_function:
             # If we found a function with no code, just skip it
             # This can happen in the assembly unit tests, where we insert a jump to a dummy __text label
             if len(basic_blocks) == 0:
                 continue
-            end_address = VirtualMemoryPointer(max((bb_end for _, bb_end in basic_blocks)))
-            cursor.execute(
-                "INSERT INTO function_boundaries (entry_point, end_address) VALUES (?, ?)", (entry_point, end_address)
-            )
-            cursor.executemany(
-                "INSERT INTO basic_blocks VALUES (?, ?, ?)", [(entry_point, t[0], t[1]) for t in basic_blocks]
-            )
+            # The end address of the function is the last instruction in the last basic block
+            function_boundary_rows.append((entry_point, max(bb_end for _, bb_end in basic_blocks)))
+            basic_block_rows.extend((entry_point, bb_start, bb_end) for bb_start, bb_end in basic_blocks)
 
+        # Insert everything in a single transaction
         with self._db_handle:
-            cursor.close()
+            self._db_handle.executemany(
+                "INSERT INTO function_boundaries (entry_point, end_address) VALUES (?, ?)", function_boundary_rows
+            ).close()
+            self._db_handle.executemany("INSERT INTO basic_blocks VALUES (?, ?, ?)", basic_block_rows).close()
 
     @cached_property
     def _objc_msgSend_addr(self) -> Optional[VirtualMemoryPointer]:
@@ -355,7 +731,7 @@ class MachoAnalyzer:
         """
         from strongarm_dataflow.dataflow import build_xref_database_fast
 
-        if self._has_computed_xrefs:
+        if "xrefs" in self._built_stages:
             logger.error("Already computed xrefs, why was _build_xref_database called again?")
             return
 
@@ -384,7 +760,10 @@ class MachoAnalyzer:
             self._get_objc_selector_stubs(),
         )
 
-        self._has_computed_xrefs = True
+        cursor = self._db_handle.executescript(ANALYZER_SQL_XREF_INDEXES)
+        with self._db_handle:
+            cursor.close()
+
         end_time = time.time()
         logger.debug(f"Finding xrefs took {end_time - start_time} seconds")
 
@@ -393,12 +772,20 @@ class MachoAnalyzer:
         """Delete cached MachoAnalyzer's
         This can be used when you are finished analyzing a binary set and don't want to retain the cached data in memory
         """
-        for binary, analyzer in cls._ANALYZER_CACHE.items():
-            logger.debug(f"Deleting db {analyzer._db_path}...")
-            analyzer._db_handle.close()
-            shutil.rmtree(analyzer._db_tempdir.as_posix())
+        cls._ANALYZER_CACHE.clear()
 
+    @classmethod
+    def set_cache(cls, cache: MachoAnalyzerCache) -> None:
+        """Replace the cache used by get_analyzer(), for example to bound its size.
+        Analyzers in the previous cache are closed.
+        """
         cls._ANALYZER_CACHE.clear()
+        MachoAnalyzer._ANALYZER_CACHE = cache
+
+    @classmethod
+    def get_cache(cls) -> MachoAnalyzerCache:
+        """The cache used by get_analyzer(). Its hits, misses and evictions counters describe how it's performing."""
+        return cls._ANALYZER_CACHE
 
     @property
     def objc_helper(self) -> ObjcRuntimeDataParser:
@@ -409,20 +796,31 @@ class MachoAnalyzer:
     @classmethod
     def get_analyzer(cls, binary: MachoBinary) -> "MachoAnalyzer":
         """Get a cached analyzer for a given MachoBinary."""
-        if binary in cls._ANALYZER_CACHE:
+        analyzer = cls._ANALYZER_CACHE.get(binary)
+        if analyzer:
             # There exists a MachoAnalyzer for this binary - use it instead of making a new one
-            return cls._ANALYZER_CACHE[binary]
+            return analyzer
         return MachoAnalyzer(binary)
 
     def method_info_for_entry_point(self, entry_point: VirtualMemoryPointer) -> Optional["ObjcMethodInfo"]:
         # TODO(PT): This should return any symbol name, not just Obj-C methods
         from strongarm.objc.objc_analyzer import ObjcMethodInfo
 
-        for objc_cls in self.objc_classes():
-            for sel in objc_cls.selectors:
-                if sel.implementation == entry_point:
-                    return ObjcMethodInfo(objc_cls, sel, sel.implementation)
-        return None
+        method = self.objc_helper.method_for_imp(entry_point)
+        if not method:
+            return None
+        objc_cls, sel = method
+        return ObjcMethodInfo(objc_cls, sel, sel.implementation)
+
+    def method_info_for_signature(self, class_name: str, selector_name: str) -> Optional["ObjcMethodInfo"]:
+        """Return the method -[class_name selector_name], or None if the binary doesn't implement it."""
+        from strongarm.objc.objc_analyzer import ObjcMethodInfo
+
+        method = self.objc_helper.method_for_signature(class_name, selector_name)
+        if not method:
+            return None
+        objc_cls, sel = method
+        return ObjcMethodInfo(objc_cls, sel, sel.implementation)
 
     def objc_classes(self) -> List[ObjcClass]:
         """Return the List of classes and categories implemented within the binary."""
@@ -489,17 +887,35 @@ class MachoAnalyzer:
         """
         return {x.name: addr for addr, x in self.dyld_bound_symbols.items()}
 
-    @property
+    @cached_property
     def exported_symbol_pointers_to_names(self) -> Dict[VirtualMemoryPointer, str]:
         """Return a Dict of pointers to exported symbol definitions to their symbol names.
+        Also includes the symbols defined in the binary's export trie, which remain available in stripped binaries.
         Inverse of MachoAnalyzer.exported_symbol_names_to_pointers()
         """
-        return self.crossref_helper.exported_symbols
+        pointers_to_names = dict(self.crossref_helper.exported_symbols)
+        export_trie = self.binary.export_trie
+        if export_trie:
+            symbol_table_names = set(pointers_to_names.values())
+            for exported_symbol in export_trie:
+                # Re-exported symbols are defined by another library
+                if exported_symbol.address is None:
+                    continue
+                # Absolute symbols are constants, rather than addresses within the binary
+                symbol_kind = exported_symbol.flags & ExportSymbolFlags.EXPORT_SYMBOL_FLAGS_KIND_MASK
+                if symbol_kind == ExportSymbolFlags.EXPORT_SYMBOL_FLAGS_KIND_ABSOLUTE:
+                    continue
+                # The symbol table may place a name at a different address than the trie does
+                # (such as a resolver's implementation, rather than its stub). Keep the symbol table's address
+                if exported_symbol.name in symbol_table_names:
+                    continue
+                pointers_to_names.setdefault(exported_symbol.address, exported_symbol.name)
+        return pointers_to_names
 
     @cached_property
     def exported_symbol_names_to_pointers(self) -> Dict[str, VirtualMemoryPointer]:
         """Return a Dict of exported symbol names to pointers to their definitions.
-        Inverse of MachoAnalyzer.exported_symbols_to_symbol_names()
+        Inverse of MachoAnalyzer.exported_symbol_pointers_to_names()
         """
         return {y: x for x, y in self.exported_symbol_pointers_to_names.items()}
 
@@ -590,12 +1006,14 @@ class MachoAnalyzer:
         """
         return self.binary.get_functions()
 
+    @_requires_stages("function_boundaries")
     def get_function_boundaries(self) -> Set[Tuple[VirtualMemoryPointer, VirtualMemoryPointer]]:
         cursor = self._db_handle.execute("SELECT entry_point, end_address FROM function_boundaries")
 
         with closing(cursor):
             return {(VirtualMemoryPointer(a), VirtualMemoryPointer(b)) for a, b in cursor}
 
+    @_requires_stages("function_boundaries")
     def get_function_end_address(self, entry_point: VirtualMemoryPointer) -> Optional[VirtualMemoryPointer]:
         cursor = self._db_handle.execute(
             "SELECT end_address FROM function_boundaries WHERE entry_point = ?", (entry_point,)
@@ -613,6 +1031,44 @@ class MachoAnalyzer:
     def class_for_class_pointer_map(self) -> Dict[VirtualMemoryPointer, ObjcClass]:
         return {VirtualMemoryPointer(x.raw_struct.binary_offset): x for x in self.objc_classes()}
 
+    @cached_property
+    def classref_index(self) -> ObjcClassrefIndex:
+        """Index the classrefs of the imported classes and the classes implemented within the binary."""
+        classrefs_to_class_names: Dict[VirtualMemoryPointer, str] = {}
+        class_names_to_classrefs: Dict[str, VirtualMemoryPointer] = {}
+
+        # Imported classes are bound to their classrefs by dyld
+        for addr, name in self.imported_symbols_to_symbol_names.items():
+            if self.binary.section_name_for_address(addr) == "__objc_classrefs":
+                classrefs_to_class_names[addr] = name
+                class_names_to_classrefs.setdefault(name, addr)
+
+        # The classrefs of local classes point to the classes' __objc_data structs
+        objc_data_to_class_names = {
+            addr: objc_class.name for addr, objc_class in self.class_for_class_pointer_map.items()
+        }
+        class_names_to_objc_data: Dict[str, VirtualMemoryPointer] = {}
+        for objc_class in self.objc_classes():
+            class_names_to_objc_data.setdefault(
+                objc_class.name, VirtualMemoryPointer(objc_class.raw_struct.binary_offset)
+            )
+
+        objc_data_to_classrefs: Dict[int, int] = {}
+        for addr, pointer in zip(*self.binary.read_pointer_section_arrays("__objc_classrefs")):
+            objc_data_to_classrefs.setdefault(pointer, addr)
+            name = objc_data_to_class_names.get(VirtualMemoryPointer(pointer))
+            if name is not None:
+                classrefs_to_class_names.setdefault(VirtualMemoryPointer(addr), name)
+
+        for name, objc_data in class_names_to_objc_data.items():
+            classref = objc_data_to_classrefs.get(objc_data)
+            if classref is not None:
+                class_names_to_classrefs.setdefault(name, VirtualMemoryPointer(classref))
+
+        return ObjcClassrefIndex(
+            classrefs_to_class_names, class_names_to_classrefs, objc_data_to_class_names, class_names_to_objc_data
+        )
+
     def class_name_for_class_pointer(self, classref: VirtualMemoryPointer) -> Optional[str]:
         """Given a classref, return the name of the class.
         This method will handle classes implemented within the binary and imported classes.
@@ -633,6 +1089,11 @@ class MachoAnalyzer:
             return local_class.name
 
         # Then, check if we were passed a classref pointer in __objc_classrefs
+        class_name = self.classref_index.classrefs_to_class_names.get(classref)
+        if class_name:
+            return class_name
+
+        # Finally, check if we were passed some other pointer to an __objc_data struct, such as a superclass reference
         try:
             dereferenced_classref = VirtualMemoryPointer(self.binary.read_rebased_pointer(classref))
         except InvalidAddressError:
@@ -648,29 +1109,14 @@ class MachoAnalyzer:
 
     def classref_for_class_name(self, class_name: str) -> Optional[VirtualMemoryPointer]:
         """Given a class name, try to find a classref for it."""
-        classrefs = [
-            addr
-            for addr, name in self.imported_symbols_to_symbol_names.items()
-            if name == class_name and self.binary.section_name_for_address(addr) == "__objc_classrefs"
-        ]
-        if len(classrefs):
-            return classrefs[0]
-
-        # TODO(PT): this is expensive! We should do one analysis step of __objc_classrefs and create a map.
-        # is it a local class?
-        class_locations = [x.raw_struct.binary_offset for x in self.objc_classes() if x.name == class_name]
-        if not len(class_locations):
-            # unknown class name
-            return None
-        class_location = VirtualMemoryPointer(class_locations[0])
-
-        classref_addr_to_pointer_map = self.binary.read_pointer_section("__objc_classrefs")
-        # If None is returned, it is an unknown class name
-        return first((k for k, v in classref_addr_to_pointer_map.items() if v == class_location), None)
+        return self.classref_index.class_names_to_classrefs.get(class_name)
 
     def selref_for_selector_name(self, selector_name: str) -> Optional[VirtualMemoryPointer]:
         return self.objc_helper.selref_for_selector_name(selector_name)
 
+    def selrefs_for_selector_name(self, selector_name: str) -> List[VirtualMemoryPointer]:
+        return self.objc_helper.selrefs_for_selector_name(selector_name)
+
     @_requires_xrefs_computed
     def strings(self) -> Set[str]:
         """Return a list containing every string in the binary."""
@@ -711,9 +1157,8 @@ class MachoAnalyzer:
         strings_content = self.binary.get_bytes(cstring_section.offset, cstring_section.size)
 
         string_to_stringrefs = {}
-        # split into characters (string table is packed and each entry is terminated by a null character)
-        string_table = list(strings_content)
-        transformed_strings = MachoStringTableHelper.transform_string_section(string_table)
+        # The section is packed like a string table: each entry is terminated by a null character
+        transformed_strings = MachoStringTableHelper.transform_string_section(strings_content)
         for idx, entry in transformed_strings.items():
             # Address is the base of __cstring plus the index of the entry
             stringref_address = VirtualMemoryPointer(strings_base + idx)
@@ -776,22 +1221,34 @@ class MachoAnalyzer:
             return self._stringref_for_cfstring(string)
         return self._stringref_for_cstring(string)
 
-    @functools.lru_cache(64)
+    @_requires_stages("callable_symbols")
     def callable_symbol_for_address(self, branch_destination: VirtualMemoryPointer) -> Optional[CallableSymbol]:
         """Retrieve information about a callable branch destination.
         It's the caller's responsibility to provide a valid branch destination with a symbol associated with it.
         """
+        # The most recent lookups are memoized on the analyzer, so the memo is released along with it
+        if branch_destination in self._callable_symbols_by_address:
+            self._callable_symbols_by_address.move_to_end(branch_destination)
+            return self._callable_symbols_by_address[branch_destination]
+
         c = self._db_handle.cursor()
         symbols = c.execute("SELECT * from named_callable_symbols WHERE address=?", (branch_destination,)).fetchall()
-        if not len(symbols):
-            return None
-        assert len(symbols) == 1, f"Found more than 1 symbol at {branch_destination}?"
-        symbol_data = symbols[0]
+        symbol: Optional[CallableSymbol] = None
+        if len(symbols):
+            assert len(symbols) == 1, f"Found more than 1 symbol at {branch_destination}?"
+            symbol_data = symbols[0]
+            symbol = CallableSymbol(
+                is_imported=bool(symbol_data[0]),
+                address=VirtualMemoryPointer(symbol_data[1]),
+                symbol_name=symbol_data[2],
+            )
 
-        return CallableSymbol(
-            is_imported=bool(symbol_data[0]), address=VirtualMemoryPointer(symbol_data[1]), symbol_name=symbol_data[2]
-        )
+        self._callable_symbols_by_address[branch_destination] = symbol
+        while len(self._callable_symbols_by_address) > self.MAX_CACHED_CALLABLE_SYMBOLS:
+            self._callable_symbols_by_address.popitem(last=False)
+        return symbol
 
+    @_requires_stages("callable_symbols")
     def callable_symbol_for_symbol_name(self, symbol_name: str) -> Optional[CallableSymbol]:
         """Retrieve information about a name within the imported or exported symbols tables.
         It's the caller's responsibility to provide a valid callable symbol name.
@@ -852,6 +1309,8 @@ class MachoAnalyzer:
         c.executemany("INSERT INTO named_callable_symbols VALUES (0, ?, ?)", callable_addr_and_sym_name)
 
         self._db_handle.commit()
+        c.executescript(ANALYZER_SQL_CALLABLE_SYMBOL_INDEXES)
+        c.close()
 
     def _strings_in_section(self, section_name: str, segment_name: str = "__TEXT") -> Set[str]:
         """Fetch the list of strings located inside the provided section."""
@@ -859,6 +1318,17 @@ class MachoAnalyzer:
         string_section = self.binary.section_with_name(section_name, segment_name)
         if string_section:
             strings_content = self.binary.get_bytes(string_section.offset, string_section.size)
-            transformed_strings = MachoStringTableHelper.transform_string_section(list(strings_content))
+            transformed_strings = MachoStringTableHelper.transform_string_section(strings_content)
             discovered_strings = set((x.full_string for x in transformed_strings.values()))
         return discovered_strings
+
+    # The method that builds each stage in ANALYZER_STAGE_DEPENDENCIES
+    _STAGE_BUILDERS: Dict[str, str] = {
+        "string_table": "_build_string_table",
+        "imp_stubs": "_build_imp_stubs",
+        "callable_symbols": "_build_callable_symbol_index",
+        "function_boundaries": "_build_function_boundaries_index",
+        "cfstring_map": "_build_cfstring_map_stage",
+        "cstring_map": "_build_cstring_map_stage",
+        "xrefs": "_build_xref_database",
+    }
@@ -0,0 +1,136 @@
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional, Union
+
+from strongarm.logger import strongarm_logger
+from strongarm.macho.macho_binary import MachoBinary
+
+if TYPE_CHECKING:
+    from strongarm.macho.macho_analyzer import MachoAnalyzer
+
+logger = strongarm_logger.getChild(__file__)
+
+
+class MachoAnalyzerCache:
+    """The in-memory set of MachoAnalyzers that MachoAnalyzer.get_analyzer() hands out, one per MachoBinary.
+
+    The cache can be bounded by a number of analyzers (max_entries), by the total size of their databases
+    (max_bytes), or both. The limits are checked whenever an analyzer is added. When they're exceeded, the
+    least-recently-used analyzers are evicted: their databases are closed and their temporary directories deleted,
+    so they must not be used afterwards.
+
+    By default, the cache keeps each analyzer (and its binary) alive until it's evicted or the cache is cleared.
+    With weak=True, the cache instead doesn't keep binaries alive. Note that an analyzer and its MachoBinary refer to
+    each other, so once the last outside reference to them is dropped, they're only freed (and the analyzer's database
+    deleted) by Python's cyclic garbage collector. Call gc.collect() to free them immediately.
+
+    Adding an analyzer for a binary that already has one replaces the cache entry. The replaced analyzer isn't closed,
+    as its creator may still be using it. Analyzers are only closed when they're evicted, removed or cleared.
+
+    The hits, misses and evictions counters record how lookups have been served since the cache was created.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None, weak: bool = False) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.weak = weak
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Keyed by id(binary), in least- to most-recently-used order.
+        # Each entry holds the binary (or a weak reference to it, if weak=True). The analyzer is attached to the binary.
+        self._entries: "OrderedDict[int, Union[MachoBinary, weakref.ReferenceType]]" = OrderedDict()
+
+    def __repr__(self) -> str:
+        return (
+            f"<MachoAnalyzerCache entries={len(self)} hits={self.hits} misses={self.misses} evictions={self.evictions}>"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, binary: MachoBinary) -> bool:
+        return self._binary_for_key(id(binary)) is binary
+
+    def _binary_for_key(self, key: int) -> Optional[MachoBinary]:
+        entry = self._entries.get(key)
+        if isinstance(entry, weakref.ReferenceType):
+            return entry()
+        return entry
+
+    def get(self, binary: MachoBinary) -> Optional["MachoAnalyzer"]:
+        """Return the cached analyzer for the binary, or None if there isn't one."""
+        if binary not in self:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(id(binary))
+        return binary._cached_analyzer
+
+    def put(self, binary: MachoBinary, analyzer: "MachoAnalyzer") -> None:
+        """Cache the analyzer for the binary, then evict analyzers as necessary to respect the cache's limits."""
+        key = id(binary)
+        binary._cached_analyzer = analyzer
+        if self.weak:
+            self._entries[key] = weakref.ref(binary, lambda ref: self._remove_dead_entry(key, ref))
+        else:
+            self._entries[key] = binary
+        self._entries.move_to_end(key)
+
+        self._evict_if_needed()
+
+    def _remove_dead_entry(self, key: int, ref: weakref.ReferenceType) -> None:
+        # The id of a collected binary can be reused by a newer one, so make sure the entry is still for the dead binary
+        if self._entries.get(key) is ref:
+            del self._entries[key]
+
+    def _total_size(self) -> int:
+        total_size = 0
+        for key in self._entries:
+            binary = self._binary_for_key(key)
+            if binary and binary._cached_analyzer:
+                total_size += binary._cached_analyzer.database_size()
+        return total_size
+
+    def _evict_if_needed(self) -> None:
+        # Never evict the most-recently-used analyzer, even if it alone exceeds the limits
+        while len(self._entries) > 1:
+            over_max_entries = self.max_entries is not None and len(self._entries) > self.max_entries
+            over_max_bytes = self.max_bytes is not None and self._total_size() > self.max_bytes
+            if not over_max_entries and not over_max_bytes:
+                break
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: int) -> None:
+        binary = self._binary_for_key(key)
+        del self._entries[key]
+        if not binary:
+            return
+
+        logger.debug(f"Evicting analyzer for {binary.path.name}")
+        self.evictions += 1
+        self._close_analyzer(binary)
+
+    @staticmethod
+    def _close_analyzer(binary: MachoBinary) -> None:
+        analyzer = binary._cached_analyzer
+        binary._cached_analyzer = None
+        if analyzer:
+            analyzer.close()
+
+    def remove(self, binary: MachoBinary) -> None:
+        """Close and forget the binary's analyzer, if it has one."""
+        if binary in self:
+            del self._entries[id(binary)]
+            self._close_analyzer(binary)
+
+    def clear(self) -> None:
+        """Close and forget every cached analyzer."""
+        for key in list(self._entries):
+            binary = self._binary_for_key(key)
+            del self._entries[key]
+            if binary:
+                self._close_analyzer(binary)
@@ -1,8 +1,16 @@
+import hashlib
 import math
+import mmap
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from ctypes import Structure, c_uint32, c_uint64, sizeof
 from distutils.version import LooseVersion
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Type, TypeVar
+from typing import TYPE_CHECKING, Any, Dict, Generic, Iterable, List, Optional, Set, Tuple, Type, TypeVar, Union
 
 from strongarm.logger import strongarm_logger
 from strongarm.macho.arch_independent_structs import (
@@ -21,7 +29,9 @@ from strongarm.macho.arch_independent_structs import (
     MachoSectionRawStruct,
     MachoSegmentCommandStruct,
     MachoSymtabCommandStruct,
+    StructReader,
 )
+from strongarm.macho.leb128 import read_uleb_deltas
 from strongarm.macho.macho_definitions import (
     CPU_TYPE,
     HEADER_FLAGS,
@@ -36,14 +46,21 @@ from strongarm.macho.macho_definitions import (
     StaticFilePointer,
     VirtualMemoryPointer,
 )
+from strongarm.macho.macho_export_trie import MachoExportTrie
 from strongarm.macho.macho_load_commands import MachoLoadCommands
+from strongarm.macho.macho_symbol_table import MachoSymbolTable
 
 if TYPE_CHECKING:
     from strongarm.macho.codesign import CodesignParser
+    from strongarm.macho.dyld_info_parser import DyldBoundSymbol
+    from strongarm.macho.macho_analyzer import MachoAnalyzer
 
 logger = strongarm_logger.getChild(__file__)
 
+_NULL_CHARACTER = re.compile(b"\x00")
+
 AIS = TypeVar("AIS", bound=ArchIndependentStructure)
+_RangeOwnerT = TypeVar("_RangeOwnerT")
 
 
 class BinaryEncryptedError(Exception):
@@ -136,6 +153,41 @@ class MachoSection:
         return f'<MachoSection {virtual_loc} "{self.name}" ("{self.segment_name}")>'
 
 
+class _AddressRangeIndex(Generic[_RangeOwnerT]):
+    """A bisect-searchable index over a set of [start, end) address ranges.
+    If ranges overlap, an address resolves to the range that was provided first, just like a linear scan would.
+    """
+
+    __slots__ = ("_starts", "_owners")
+
+    def __init__(self, ranges: Iterable[Tuple[int, int, _RangeOwnerT]]) -> None:
+        nonempty_ranges = [r for r in ranges if r[0] < r[1]]
+        # Split the address space at every range boundary. Each of the resulting intervals is owned by the first
+        # range that covers it
+        boundaries = sorted({boundary for start, end, _ in nonempty_ranges for boundary in (start, end)})
+        owners: List[Optional[_RangeOwnerT]] = [None] * len(boundaries)
+        for start, end, owner in nonempty_ranges:
+            for idx in range(bisect_left(boundaries, start), bisect_left(boundaries, end)):
+                if owners[idx] is None:
+                    owners[idx] = owner
+
+        # Coalesce neighbouring intervals with the same owner
+        self._starts: List[int] = []
+        self._owners: List[Optional[_RangeOwnerT]] = []
+        for boundary, interval_owner in zip(boundaries, owners):
+            if self._owners and self._owners[-1] is interval_owner:
+                continue
+            self._starts.append(boundary)
+            self._owners.append(interval_owner)
+
+    def lookup(self, address: int) -> Optional[_RangeOwnerT]:
+        """Return the owner of the range containing the address, or None if no range contains it."""
+        idx = bisect_right(self._starts, address) - 1
+        if idx < 0:
+            return None
+        return self._owners[idx]
+
+
 def _version_from_nibbles(value: int) -> LooseVersion:
     # X.Y.Z is encoded in nibbles xxxx.yy.zz
     patch = (value >> (8 * 0)) & 0xFF
@@ -144,18 +196,39 @@ def _version_from_nibbles(value: int) -> LooseVersion:
     return LooseVersion(f"{major}.{minor}.{patch}")
 
 
+def little_endian_array(typecode: str, data: Union[bytes, bytearray, memoryview]) -> "array[int]":
+    """Decode a buffer of little-endian integers into an array with the given type code."""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
 class MachoBinary:
     _MAG_64 = [MachArch.MH_MAGIC_64, MachArch.MH_CIGAM_64]
     _MAG_32 = [MachArch.MH_MAGIC, MachArch.MH_CIGAM]
     _MAG_BIG_ENDIAN = [MachArch.MH_CIGAM, MachArch.MH_CIGAM_64]
     SUPPORTED_MAG = _MAG_64 + _MAG_32
     BYTES_PER_INSTRUCTION = 4
-
-    def __init__(self, path: Path, binary_data: bytes, file_offset: Optional[StaticFilePointer] = None) -> None:
-        """Parse the bytes representing a Mach-O file."""
+    # The number of results of get_full_string_from_start_address() memoized per binary
+    MAX_CACHED_STRINGS = 4096
+
+    def __init__(
+        self,
+        path: Path,
+        binary_data: Union[bytes, bytearray, memoryview],
+        file_offset: Optional[StaticFilePointer] = None,
+    ) -> None:
+        """Parse the bytes representing a Mach-O file.
+        binary_data may be a read-only view into a memory-mapped file, in which case the slice is never copied.
+        """
         from .codesign.codesign_parser import CodesignParser
 
-        self._cached_binary = binary_data
+        self._cached_binary = memoryview(binary_data)
+        if not self._cached_binary.readonly:
+            # The views returned by get_bytes() must not alias a buffer that the caller can still modify
+            self._cached_binary = memoryview(bytes(self._cached_binary))
 
         self.path = path
         self.is_64bit: bool = False
@@ -174,6 +247,10 @@ class MachoBinary:
         # Segment and section commands from Mach-O header
         self.segments: List[MachoSegment] = []
         self.sections: List[MachoSection] = []
+        # Address lookup tables over the above, built once the load commands are parsed
+        self._segment_index: _AddressRangeIndex[MachoSegment] = _AddressRangeIndex([])
+        self._section_index: _AddressRangeIndex[MachoSection] = _AddressRangeIndex([])
+        self._highest_section: Optional[MachoSection] = None
 
         # Interesting Mach-O sections
         self.linked_dylibs: List[DynamicLibrary] = []
@@ -188,6 +265,7 @@ class MachoBinary:
         self._code_signature_cmd: Optional[MachoLinkeditDataCommandStruct] = None
         self._function_starts_cmd: Optional[MachoLinkeditDataCommandStruct] = None
         self._functions_list: Optional[Set[VirtualMemoryPointer]] = None
+        self._function_starts: Optional["array[int]"] = None
         self._build_version_cmd: Optional[MachoBuildVersionCommandStruct] = None
         self._build_tool_versions: Optional[List[MachoBuildToolVersionStruct]] = None
 
@@ -195,6 +273,13 @@ class MachoBinary:
         self.__minimum_deployment_target: Optional[LooseVersion] = None
         self.__sdk_deployment_target: Optional[LooseVersion] = None
         self.__build_tools: Dict[str, LooseVersion] = {}
+        self.__content_hash: Optional[str] = None
+        # The most recently read strings, keyed by (start address, whether it's a virtual address)
+        self._cached_strings: "OrderedDict[Tuple[int, bool], Optional[str]]" = OrderedDict()
+        # The StructReader for each structure type read from this binary
+        self._struct_readers: Dict[Type[ArchIndependentStructure], StructReader] = {}
+        # The MachoAnalyzer for this binary, owned by MachoAnalyzerCache
+        self._cached_analyzer: Optional["MachoAnalyzer"] = None
 
         # This kicks off the parse of the binary
         if not self.parse():
@@ -202,19 +287,14 @@ class MachoBinary:
 
         self.platform_word_type = c_uint64 if self.is_64bit else c_uint32
 
+        self._symbol_table: Optional[MachoSymbolTable] = None
+        self._export_trie: Optional[MachoExportTrie] = None
         self._symtab_contents: Optional[List[MachoNlistStruct]] = None
-        logger.debug(self, f"parsed symtab, len = {len(self.symtab_contents)}")
 
-        from .dyld_info_parser import DyldBoundSymbol, DyldInfoParser
-
-        self.dyld_bound_symbols: Dict[VirtualMemoryPointer, DyldBoundSymbol] = {}
-        self.dyld_rebased_pointers: Dict[VirtualMemoryPointer, VirtualMemoryPointer] = {}
-
-        if self._dyld_chained_fixups:
-            rebases, binds = DyldInfoParser.parse_chained_fixups(self)  # type: ignore
-            self.dyld_rebased_pointers, self.dyld_bound_symbols = rebases, binds
-        else:
-            self.dyld_bound_symbols = DyldInfoParser.parse_dyld_info(self)
+        # Parsed from the chained fixups or LC_DYLD_INFO the first time either is accessed
+        self._dyld_bound_symbols: Optional[Dict[VirtualMemoryPointer, "DyldBoundSymbol"]] = None
+        self._dyld_rebased_pointers: Optional[Dict[VirtualMemoryPointer, VirtualMemoryPointer]] = None
+        self._dyld_fixups_lock = threading.Lock()
 
     def __repr__(self) -> str:
         return f"<MachoBinary binary={self.path}>"
@@ -291,6 +371,15 @@ class MachoBinary:
 
         self._load_commands_end_addr = load_commands_off + self.header.sizeofcmds  # type: ignore
         self._parse_load_commands(load_commands_off, self.header.ncmds)  # type: ignore
+        self._build_address_indexes()
+
+    def _build_address_indexes(self) -> None:
+        """Build the lookup tables used to map virtual addresses to segments and sections."""
+        self._segment_index = _AddressRangeIndex((s.vmaddr, s.vm_end_address, s) for s in self.segments)
+        self._section_index = _AddressRangeIndex((s.address, s.end_address, s) for s in self.sections)
+        # Addresses outside of every section are translated based on the highest-addressed section.
+        # If several sections share the highest address, the first one declared is used
+        self._highest_section = max(self.sections, key=lambda s: s.address) if self.sections else None
 
     def _parse_header_flags(self) -> None:
         """Interpret binary's header bitset and populate self.header_flags."""
@@ -363,6 +452,8 @@ class MachoBinary:
 
             elif load_command.cmd == MachoLoadCommands.LC_BUILD_VERSION:
                 self._build_version_cmd = self.read_struct(offset, MachoBuildVersionCommandStruct)
+                # Backing layouts may depend on the deployment target, so resolve them again from now on
+                self._struct_readers.clear()
                 # Parse the build tool versions following this structure
                 build_tool_offset = offset + self._build_version_cmd.sizeof
                 self._build_tool_versions = []
@@ -373,6 +464,17 @@ class MachoBinary:
             # move to next load command in header
             offset += load_command.cmdsize
 
+    def struct_reader(self, struct_type: Type[ArchIndependentStructure]) -> StructReader:
+        """Return the StructReader for a structure type, with the backing layout this binary uses for it.
+        The layout is resolved once per structure type, and reused for every subsequent read.
+        """
+        reader = self._struct_readers.get(struct_type)
+        if reader is None:
+            backing_layout = struct_type.get_backing_data_layout(self.is_64bit, self.get_minimum_deployment_target())
+            reader = StructReader.for_layout(struct_type, backing_layout)
+            self._struct_readers[struct_type] = reader
+        return reader
+
     def read_struct(self, binary_offset: int, struct_type: Type[AIS], virtual: bool = False) -> AIS:
         """Given a binary offset, return the structure it describes.
 
@@ -383,9 +485,9 @@ class MachoBinary:
         Returns:
             ArchIndependentStructure loaded from the pointed address.
         """
-        backing_layout = struct_type.get_backing_data_layout(self.is_64bit, self.get_minimum_deployment_target())
-        data = self.get_contents_from_address(address=binary_offset, size=sizeof(backing_layout), is_virtual=virtual)
-        return struct_type(binary_offset, data, backing_layout)
+        reader = self.struct_reader(struct_type)
+        data = self.get_contents_from_address(address=binary_offset, size=reader.size, is_virtual=virtual)
+        return reader.read(binary_offset, data)
 
     def read_struct_with_rebased_pointers(
         self, binary_offset: int, struct_type: Type[AIS], virtual: bool = False
@@ -395,26 +497,28 @@ class MachoBinary:
         If so, the static data here may be a packed chained fixup pointer, rather than a pointer we can follow.
         In this case, update the pointer to contain the value to be rebased, so that the pointer can be followed.
         """
-        backing_layout = struct_type.get_backing_data_layout(self.is_64bit, self.get_minimum_deployment_target())
-        data = self.get_contents_from_address(address=binary_offset, size=sizeof(backing_layout), is_virtual=virtual)
-        s = struct_type(binary_offset, data, backing_layout)
+        reader = self.struct_reader(struct_type)
+        data = self.get_contents_from_address(address=binary_offset, size=reader.size, is_virtual=virtual)
+        s = reader.read(binary_offset, data)
 
-        # Check each c_uint64/c_ulong to see if we know about a rebase for it. If so, apply it
         base_virt_offset = binary_offset
         if not virtual:
             base_virt_offset += self.get_virtual_base()
-        for field_name, field_type, *_ in backing_layout._fields_:
-            field_offset = getattr(getattr(backing_layout, field_name), "offset")
-            field_address = base_virt_offset + field_offset
-            if field_type == c_uint64 and field_address in self.dyld_rebased_pointers:
-                logger.debug(
-                    f"Setting rebased pointer within {struct_type}+{field_offset} -> "
-                    f"{self.dyld_rebased_pointers[field_address]} at {field_address}"
-                )
-                setattr(s, field_name, self.dyld_rebased_pointers[field_address])
-
+        self.apply_rebased_pointers(s, reader, base_virt_offset)
         return s
 
+    def apply_rebased_pointers(self, struct: ArchIndependentStructure, reader: StructReader, address: int) -> None:
+        """Replace each uint64_t field of a structure read from the virtual address with its rebased value, if any."""
+        rebased_pointers = self.dyld_rebased_pointers
+        if not rebased_pointers:
+            return
+        # Plain int arithmetic is much cheaper than VirtualMemoryPointer's, and hashes to the same dictionary keys
+        address = int(address)
+        for field_name, field_offset in reader.pointer_fields:
+            pointer_value = rebased_pointers.get(address + field_offset)  # type: ignore
+            if pointer_value is not None:
+                setattr(struct, field_name, pointer_value)
+
     def section_name_for_address(self, virt_addr: VirtualMemoryPointer) -> Optional[str]:
         """Given an address in the virtual address space, return the name of the section which contains it."""
         section = self.section_for_address(virt_addr)
@@ -428,20 +532,16 @@ class MachoBinary:
         if virt_addr < self.get_virtual_base():
             return None
 
-        # if the address given is past the last declared section, translate based on the last section
-        # so, we need to keep track of the last seen section
-        max_section = next(iter(self.sections))
+        section = self._section_index.lookup(virt_addr)
+        if section:
+            return section
+        # no section explicitly contains this address
+        # guess by using the highest-addressed section
+        return self._highest_section
 
-        for idx, section in enumerate(self.sections):
-            # update highest section
-            if section.address > max_section.address:
-                max_section = section
-
-            if section.address <= virt_addr < section.end_address:
-                return section
-        # we looked through all sections and didn't find one explicitly containing this address
-        # guess by using the highest-addressed section we've seen
-        return max_section
+    def segment_for_address(self, virt_addr: VirtualMemoryPointer) -> Optional[MachoSegment]:
+        """Given an address in the virtual address space, return the segment which contains it, if any."""
+        return self._segment_index.lookup(virt_addr)
 
     def segment_for_index(self, segment_index: int) -> MachoSegment:
         if 0 <= segment_index < len(self.segments):
@@ -504,12 +604,31 @@ class MachoBinary:
 
         return self._virtual_base
 
+    def get_content_hash(self) -> str:
+        """Retrieve a SHA-256 hex digest of the bytes backing this Mach-O slice.
+        Binaries are immutable (write_bytes() and friends return a new binary), so the digest is computed once.
+        """
+        if not self.__content_hash:
+            self.__content_hash = hashlib.sha256(self._cached_binary).hexdigest()
+        return self.__content_hash
+
     def get_file_offset(self) -> StaticFilePointer:
         """Retrieve the offset within the file of this Mach-O slice."""
         return self.file_offset
 
-    def get_bytes(self, offset: StaticFilePointer, size: int, _translate_addr_to_file: bool = False) -> bytearray:
+    def get_backing_file_region(self) -> Optional[Tuple[Path, StaticFilePointer, int]]:
+        """Retrieve the (path, offset, size) of this slice within a file, if its bytes are mapped from that file.
+        Returns None when the slice's bytes are held in memory, such as for binaries produced by write_bytes().
+        Other processes can map this region to read the same bytes as this binary.
+        """
+        if not isinstance(self._cached_binary.obj, mmap.mmap):
+            return None
+        return self.path, self.file_offset, self.slice_filesize
+
+    def get_bytes(self, offset: StaticFilePointer, size: int, _translate_addr_to_file: bool = False) -> memoryview:
         """Retrieve bytes from Mach-O slice, taking into account that the slice could be at an offset within a FAT
+        The returned view does not copy the binary's data. Callers that need a mutable buffer should copy it
+        into a bytearray.
 
         Args:
             offset: index from beginning of slice to retrieve data from
@@ -519,7 +638,7 @@ class MachoBinary:
                 This option tells DYLD cache binaries to translate the offset into the global cache file.
 
         Returns:
-            string containing byte content of mach-o slice at an offset from the start of the slice
+            read-only view of the byte content of mach-o slice at an offset from the start of the slice
 
         """
         if offset > 0x100000000:
@@ -540,7 +659,7 @@ class MachoBinary:
                 f"Cannot read encrypted range [{hex(encryption_range_start)} - {hex(encryption_range_end)}]"
             )
 
-        return bytearray(self._cached_binary[offset : offset + size])
+        return self._cached_binary[offset : offset + size]
 
     def should_swap_bytes(self) -> bool:
         """Check whether self.slice_magic refers to a big-endian Mach-O binary
@@ -551,18 +670,77 @@ class MachoBinary:
         """
         return self.slice_magic in MachoBinary._MAG_BIG_ENDIAN
 
-    def get_raw_string_table(self) -> List[int]:
+    def get_raw_string_table(self) -> memoryview:
         """Read string table from binary, as described by LC_SYMTAB. Each strtab entry is terminated
         by a NULL character.
 
         Returns:
-            Raw, packed array of characters containing binary's string table data
+            Read-only view of the raw, packed characters containing binary's string table data
+
+        """
+        return self.get_bytes(self.symtab.stroff, self.symtab.strsize)
+
+    @property
+    def dyld_bound_symbols(self) -> Dict[VirtualMemoryPointer, "DyldBoundSymbol"]:
+        """Map of each address that dyld binds to an imported symbol, to the DyldBoundSymbol bound there."""
+        if self._dyld_bound_symbols is None:
+            self._parse_dyld_fixups()
+        return self._dyld_bound_symbols  # type: ignore
+
+    @property
+    def dyld_rebased_pointers(self) -> Dict[VirtualMemoryPointer, VirtualMemoryPointer]:
+        """Map of each address containing a pointer that dyld rebases, to the pointer assuming the stated virtual base.
+        Read from the chained fixups, or from the LC_DYLD_INFO rebase opcodes of binaries that don't use chained fixups.
+        """
+        if self._dyld_rebased_pointers is None:
+            self._parse_dyld_fixups()
+        return self._dyld_rebased_pointers  # type: ignore
+
+    def _parse_dyld_fixups(self) -> None:
+        """Parse the binary's chained fixups, or its LC_DYLD_INFO rebase and bind opcodes.
+        Several threads may access a binary's binds and rebases at once, so they're parsed under a lock.
+        """
+        from .dyld_info_parser import DyldInfoParser
+
+        with self._dyld_fixups_lock:
+            # Another thread may have parsed them while this one waited for the lock
+            if self._dyld_bound_symbols is not None:
+                return
+
+            if self._dyld_chained_fixups:
+                rebases, binds = DyldInfoParser.parse_chained_fixups(self)
+            else:
+                rebases = DyldInfoParser.parse_dyld_info_rebases(self)
+                binds = DyldInfoParser.parse_dyld_info(self)
+            # Publish the rebases first, as the binds are checked to see whether parsing has finished
+            self._dyld_rebased_pointers = rebases
+            self._dyld_bound_symbols = binds
 
+    @property
+    def symbol_table(self) -> MachoSymbolTable:
+        """The binary's symbol table, with each nlist field available as an array.
+        Prefer this to symtab_contents, which creates a MachoNlistStruct for every symbol.
         """
-        string_table_data = self.get_bytes(self.symtab.stroff, self.symtab.strsize)
-        # split into characters (string table is packed and each entry is terminated by a null character)
-        string_table = list(string_table_data)
-        return string_table
+        if self._symbol_table is None:
+            symtab_size = self.symtab.nsyms * MachoSymbolTable.entry_size_for(self.is_64bit)
+            self._symbol_table = MachoSymbolTable(self.get_bytes(self.symtab.symoff, symtab_size), self.is_64bit)
+            logger.debug(self, f"parsed symbol table, len = {len(self._symbol_table)}")
+        return self._symbol_table
+
+    @property
+    def export_trie(self) -> Optional[MachoExportTrie]:
+        """The binary's export trie, from LC_DYLD_EXPORTS_TRIE or the export info in LC_DYLD_INFO.
+        Unlike the symbol table, it's present in stripped binaries. None if the binary has no export trie.
+        """
+        if self._export_trie is None:
+            if self._dyld_export_trie:
+                trie_offset, trie_size = self._dyld_export_trie.dataoff, self._dyld_export_trie.datasize
+            elif self._dyld_info and self._dyld_info.export_size:
+                trie_offset, trie_size = self._dyld_info.export_off, self._dyld_info.export_size
+            else:
+                return None
+            self._export_trie = MachoExportTrie(self.get_bytes(trie_offset, trie_size), self.get_virtual_base())
+        return self._export_trie
 
     @property
     def symtab_contents(self) -> List[MachoNlistStruct]:
@@ -623,12 +801,12 @@ class MachoBinary:
         binary_address = (virtual_address - section_for_address.address) + section_for_address.offset
         return StaticFilePointer(binary_address)
 
-    def get_content_from_virtual_address(self, virtual_address: VirtualMemoryPointer, size: int) -> bytearray:
+    def get_content_from_virtual_address(self, virtual_address: VirtualMemoryPointer, size: int) -> memoryview:
         binary_address = self.file_offset_for_virtual_address(virtual_address)
         return self.get_bytes(binary_address, size)
 
-    def get_contents_from_address(self, address: int, size: int, is_virtual: bool = False) -> bytearray:
-        """Get a bytearray from a specified address, size and virtualness
+    def get_contents_from_address(self, address: int, size: int, is_virtual: bool = False) -> memoryview:
+        """Get a read-only view of the bytes at a specified address, size and virtualness
         TODO(FS): change all methods that use addresses as ints to the VirtualAddress/StaticAddress class pair to better
          express intent
         """
@@ -640,39 +818,41 @@ class MachoBinary:
     def get_full_string_from_start_address(self, start_address: int, virtual: bool = True) -> Optional[str]:
         """Return a string containing the bytes from start_address up to the next NULL character
         This method will return None if the specified address does not point to a UTF-8 encoded string
+        The most recently read MAX_CACHED_STRINGS results are memoized, as the same selector and class names are looked
+        up many times.
         """
-        max_len = 16
-        symbol_name_characters = []
-        found_null_terminator = False
+        key = (start_address, virtual)
+        try:
+            string = self._cached_strings[key]
+            self._cached_strings.move_to_end(key)
+            return string
+        except KeyError:
+            pass
 
-        while not found_null_terminator:
-            if virtual:
-                name_bytes = self.get_content_from_virtual_address(VirtualMemoryPointer(start_address), max_len)
-            else:
-                name_bytes = self.get_bytes(StaticFilePointer(start_address), max_len)
-            # search for null terminator in this content
-            for ch in name_bytes:
-                if ch == 0x00:
-                    found_null_terminator = True
-                    break
-                symbol_name_characters.append(ch)
-
-            # do we need to keep searching for the end of the symbol name?
-            if not found_null_terminator:
-                # since we read [start_address:start_address + max_len], trim that from search space
-                start_address += max_len
-                # double search space for next iteration
-                max_len *= 2
-            else:
-                # read full string!
-                try:
-                    symbol_name = bytearray(symbol_name_characters).decode()
-                    return symbol_name
-                except UnicodeDecodeError:
-                    # if decoding the string failed, we may have been passed an address which does not actually
-                    # point to a string
-                    return None
-        return None
+        if virtual:
+            string = self._read_c_string(self.file_offset_for_virtual_address(VirtualMemoryPointer(start_address)))
+        else:
+            string = self._read_c_string(StaticFilePointer(start_address))
+        self._cached_strings[key] = string
+        while len(self._cached_strings) > self.MAX_CACHED_STRINGS:
+            self._cached_strings.popitem(last=False)
+        return string
+
+    def _read_c_string(self, offset: StaticFilePointer) -> Optional[str]:
+        """Decode the NULL-terminated UTF-8 string at a file offset, or return None if there isn't one."""
+        terminator = _NULL_CHARACTER.search(self._cached_binary, offset) if offset >= 0 else None
+        string_end = terminator.start() if terminator else len(self._cached_binary)
+        # Validates the offset, and ensures the string isn't encrypted
+        string_bytes = self.get_bytes(offset, string_end - offset)
+        if not terminator:
+            # The string runs off the end of the binary
+            return None
+        try:
+            return str(string_bytes, "utf-8")
+        except UnicodeDecodeError:
+            # if decoding the string failed, we may have been passed an address which does not actually
+            # point to a string
+            return None
 
     def read_string_at_address(self, address: VirtualMemoryPointer) -> Optional[str]:
         """Read a string embedded in the binary at address
@@ -757,12 +937,24 @@ class MachoBinary:
         It is the caller's responsibility to only call this with a `section_name` which indicates a section which should
         only contain a pointer list.
 
-        The return value is two lists of pointers.
-        The first List contains the virtual addresses of each entry in the section.
-        The second List contains the pointer values contained at each of these addresses.
+        The return value maps the virtual address of each entry in the section to the pointer value contained at that
+        address. Pointers that dyld rebases hold their rebased value.
+        """
+        addresses, pointers = self.read_pointer_section_arrays(section_name)
+        return {
+            VirtualMemoryPointer(address): VirtualMemoryPointer(pointer)
+            for address, pointer in zip(addresses, pointers)
+        }
+
+    def read_pointer_section_arrays(self, section_name: str) -> Tuple["array[int]", "array[int]"]:
+        """Read all the pointers in a section, as a pair of arrays.
+
+        The first array contains the virtual address of each entry in the section.
+        The second array contains the pointer value contained at each of these addresses, with rebases applied.
+        The indexes of these two arrays are matched up; that is, addresses[0] is the virtual address of the first
+        pointer in the requested section, and pointers[0] is the pointer value contained at that address.
 
-        The indexes of these two lists are matched up; that is, list1[0] is the virtual address of the first pointer
-        in the requested section, and list2[0] is the pointer value contained at that address.
+        This is the same data as read_pointer_section(), without creating a pair of Python objects per pointer.
         """
         # PT: Assume a pointer-list-section will always be in __DATA or __DATA_CONST. True as far as I know.
         for segment in ["__DATA", "__DATA_CONST"]:
@@ -771,36 +963,38 @@ class MachoBinary:
                 break
         else:
             # Couldn't find the desired section
-            return {}
+            return array("Q"), array("Q")
 
-        address_to_pointer_map: Dict[VirtualMemoryPointer, VirtualMemoryPointer] = {}
-
-        section_base = section.address
+        word_size = sizeof(self.platform_word_type)
         section_data = self.get_bytes(section.offset, section.size)
+        pointer_count = len(section_data) // word_size
 
-        binary_word = self.platform_word_type
-        pointer_count = int(len(section_data) / sizeof(binary_word))
-        pointer_off = 0
-
-        for i in range(pointer_count):
-            # convert section offset of entry to absolute virtual address
-            ptr_location = VirtualMemoryPointer(section_base + pointer_off)
-
-            if ptr_location in self.dyld_rebased_pointers:
-                ptr_value = self.dyld_rebased_pointers[ptr_location]
-                logger.debug(f"Pointer is rebased: {ptr_location} -> {ptr_value}")
-            else:
-                data_end = pointer_off + sizeof(binary_word)
-                ptr_value = VirtualMemoryPointer(
-                    binary_word.from_buffer(bytearray(section_data[pointer_off:data_end])).value
-                )
-                logger.debug(f"Pointer was not in the rebase list: {ptr_location} -> {ptr_value}")
-
-            address_to_pointer_map[ptr_location] = VirtualMemoryPointer(ptr_value)
-
-            pointer_off += sizeof(binary_word)
-
-        return address_to_pointer_map
+        # Decode the whole section at once
+        pointer_typecode = "Q" if self.is_64bit else "I"
+        if array(pointer_typecode).itemsize != word_size:
+            raise RuntimeError(f"No array type code for {word_size}-byte pointers on this platform")
+        pointers = little_endian_array(pointer_typecode, section_data[: pointer_count * word_size])
+        if not self.is_64bit:
+            pointers = array("Q", pointers)
+
+        section_base = int(section.address)
+        section_end = section_base + pointer_count * word_size
+        addresses = array("Q", range(section_base, section_end, word_size))
+
+        # Overlay the rebased pointers. Visit whichever of the section's pointers and the binary's rebases is smaller
+        rebased_pointers = self.dyld_rebased_pointers
+        if len(rebased_pointers) < pointer_count:
+            for rebased_address, pointer_value in rebased_pointers.items():
+                offset = rebased_address - section_base
+                if 0 <= offset < section_end - section_base and offset % word_size == 0:
+                    pointers[offset // word_size] = pointer_value
+        elif rebased_pointers:
+            for index, address in enumerate(addresses):
+                pointer_value = rebased_pointers.get(address)  # type: ignore
+                if pointer_value is not None:
+                    pointers[index] = pointer_value
+
+        return addresses, pointers
 
     def read_word(self, address: int, virtual: bool = True, word_type: Any = None) -> int:
         """Attempt to read a word from the binary at a virtual address."""
@@ -815,14 +1009,14 @@ class MachoBinary:
         if not file_bytes:
             raise InvalidAddressError(f"Could not read word at address {hex(address)}")
 
-        return word_type.from_buffer(bytearray(file_bytes)).value
+        return word_type.from_buffer_copy(file_bytes).value
 
     def read_rebased_pointer(self, address: VirtualMemoryPointer) -> VirtualMemoryPointer:
         """Attempt to read a rebased pointer from the binary at a virtual address.
         The pointer is assumed to be the platform word size.
         """
         if address not in self.dyld_rebased_pointers:
-            # This may be a pre-iOS 15 binary for which we don't record rebases
+            # The address isn't rebased, or its rebase lies in an encrypted segment and was skipped
             return VirtualMemoryPointer(self.read_word(address, virtual=True, word_type=self.platform_word_type))
 
         return self.dyld_rebased_pointers[address]
@@ -1056,48 +1250,44 @@ class MachoBinary:
 
         Returns: A list of VirtualMemoryPointers corresponding to each function's entry point.
         """
-        # TODO(PT): move read_uleb somewhere else
-        from .dyld_info_parser import DyldInfoParser
-
-        if self._functions_list:
+        if self._functions_list is not None:
             return self._functions_list
 
-        # Cannot do anything without LC_FUNCTIONS_START
-        if not self._function_starts_cmd:
-            return set()
-
-        functions_list = set()
-
-        fs_start = self._function_starts_cmd.dataoff
-        fs_size = self._function_starts_cmd.datasize
-        fs_uleb = self.get_contents_from_address(fs_start, fs_size)
-
-        address = int(self.get_virtual_base())
-
-        idx = 0
-        while idx < fs_size:
-            address_delta, idx = DyldInfoParser.read_uleb(fs_uleb, idx)
+        self._functions_list = set(map(VirtualMemoryPointer, self.get_function_starts()))
+        return self._functions_list
 
-            address += address_delta
-            func_entry = VirtualMemoryPointer(address)
-            functions_list.add(func_entry)
+    def get_function_starts(self) -> "array[int]":
+        """Get the function entry points defined in LC_FUNCTION_STARTS, in ascending order.
+        This is the compact form of get_functions(), decoded from LC_FUNCTION_STARTS in one pass.
+        """
+        if self._function_starts is not None:
+            return self._function_starts
 
-        self._functions_list = functions_list
-        return self._functions_list
+        # Cannot do anything without LC_FUNCTIONS_START
+        if not self._function_starts_cmd:
+            self._function_starts = array("Q")
+        else:
+            function_starts_data = self.get_contents_from_address(
+                self._function_starts_cmd.dataoff, self._function_starts_cmd.datasize
+            )
+            self._function_starts = read_uleb_deltas(function_starts_data, int(self.get_virtual_base()))
+        return self._function_starts
 
     def get_constructor_functions(self) -> List[VirtualMemoryPointer]:
         """Get a list of the function entry points defined in __mod_init_func. This includes C constructors.
 
         Returns: A list of VirtualMemoryPointers corresponding to each function's entry point.
         """
-        return list(self.read_pointer_section("__mod_init_func").values())
+        _, pointers = self.read_pointer_section_arrays("__mod_init_func")
+        return [VirtualMemoryPointer(pointer) for pointer in pointers]
 
     def get_destructor_functions(self) -> List[VirtualMemoryPointer]:
         """Get a list of the function entry points defined in __mod_term_func. This includes C destructors.
 
         Returns: A list of VirtualMemoryPointers corresponding to each function's entry point.
         """
-        return list(self.read_pointer_section("__mod_term_func").values())
+        _, pointers = self.read_pointer_section_arrays("__mod_term_func")
+        return [VirtualMemoryPointer(pointer) for pointer in pointers]
 
     def dylib_id(self) -> Optional[str]:
         """If the binary contains an LC_ID_DYLIB load command, return the pathname which the binary represents."""
@@ -0,0 +1,161 @@
+from enum import IntEnum
+from typing import Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+from strongarm.macho.leb128 import read_uleb
+from strongarm.macho.macho_definitions import VirtualMemoryPointer
+
+
+class ExportSymbolFlags(IntEnum):
+    """Flags of a symbol in an export trie. Ref: <mach-o/loader.h>"""
+
+    EXPORT_SYMBOL_FLAGS_KIND_MASK = 0x03
+    EXPORT_SYMBOL_FLAGS_KIND_REGULAR = 0x00
+    EXPORT_SYMBOL_FLAGS_KIND_THREAD_LOCAL = 0x01
+    EXPORT_SYMBOL_FLAGS_KIND_ABSOLUTE = 0x02
+    EXPORT_SYMBOL_FLAGS_WEAK_DEFINITION = 0x04
+    EXPORT_SYMBOL_FLAGS_REEXPORT = 0x08
+    EXPORT_SYMBOL_FLAGS_STUB_AND_RESOLVER = 0x10
+
+
+class MachoExportedSymbol(NamedTuple):
+    """A symbol exported by a binary, as described by its export trie."""
+
+    name: str
+    flags: int
+    # The address of the symbol's definition. None for symbols re-exported from another library
+    address: Optional[VirtualMemoryPointer]
+    # For re-exported symbols, the library ordinal of the library that defines the symbol,
+    # and the symbol's name within that library
+    library_ordinal: Optional[int] = None
+    imported_name: Optional[str] = None
+    # For EXPORT_SYMBOL_FLAGS_STUB_AND_RESOLVER symbols, the address of the resolver function.
+    # The symbol's address is then the address of its stub.
+    resolver: Optional[VirtualMemoryPointer] = None
+
+
+class MachoExportTrie:
+    """The export trie of a binary (from LC_DYLD_EXPORTS_TRIE, or the export info in LC_DYLD_INFO).
+
+    The trie is decoded as it's walked, rather than up-front. Looking up a name only visits the nodes along the path to
+    that name, and enumerating the symbols below a prefix only visits that prefix's subtree.
+    Ref: https://opensource.apple.com/source/dyld/dyld-851.27/dyld3/MachOLoaded.cpp.auto.html (trieWalk)
+    """
+
+    def __init__(self, trie_data: Union[bytes, bytearray, memoryview], virtual_base: VirtualMemoryPointer) -> None:
+        self._data = bytes(trie_data)
+        self._virtual_base = int(virtual_base)
+
+    def __repr__(self) -> str:
+        return f"<MachoExportTrie {len(self._data)} bytes>"
+
+    def __iter__(self) -> Iterator[MachoExportedSymbol]:
+        return self.symbols_with_prefix("")
+
+    def lookup(self, name: str) -> Optional[MachoExportedSymbol]:
+        """Return the exported symbol with the provided name, or None if the binary doesn't export it."""
+        name_bytes = name.encode()
+        node_offset, node_name = self._find_node(name_bytes)
+        if node_offset is None or node_name != name_bytes:
+            return None
+
+        # Some linkers place the symbol in a child node with an empty edge label, rather than in the node itself
+        visited_nodes: Set[int] = set()
+        while node_offset is not None and node_offset not in visited_nodes:
+            visited_nodes.add(node_offset)
+            symbol = self._read_terminal(node_offset, name_bytes)
+            if symbol:
+                return symbol
+            node_offset = next((child for label, child in self._read_children(node_offset) if not label), None)
+        return None
+
+    def symbols_with_prefix(self, prefix: str) -> Iterator[MachoExportedSymbol]:
+        """Yield each exported symbol whose name begins with the provided prefix, in the trie's order."""
+        node_offset, node_name = self._find_node(prefix.encode())
+        if node_offset is None:
+            return
+
+        visited_nodes: Set[int] = set()
+        # Depth-first walk of the subtree below the prefix
+        nodes_to_visit = [(node_offset, node_name)]
+        while nodes_to_visit:
+            node_offset, node_name = nodes_to_visit.pop()
+            if node_offset in visited_nodes:
+                raise ValueError(f"Export trie contains a cycle at node {hex(node_offset)}")
+            visited_nodes.add(node_offset)
+
+            symbol = self._read_terminal(node_offset, node_name)
+            if symbol:
+                yield symbol
+            # Visit the children in order
+            nodes_to_visit.extend(
+                (child_offset, node_name + edge_label)
+                for edge_label, child_offset in reversed(self._read_children(node_offset))
+            )
+
+    def _find_node(self, prefix: bytes) -> Tuple[Optional[int], bytes]:
+        """Descend the trie to the node whose subtree holds every name beginning with prefix.
+        Returns the offset of the node and the full name that the node represents, which may extend past the prefix.
+        The offset is None if no exported name begins with the prefix.
+        """
+        node_offset = 0
+        node_name = b""
+        if not self._data:
+            return None, node_name
+
+        # Each descent consumes at least one byte of the prefix, so this can't loop forever
+        while len(node_name) < len(prefix):
+            remaining = prefix[len(node_name) :]
+            for edge_label, child_offset in self._read_children(node_offset):
+                if edge_label and (remaining.startswith(edge_label) or edge_label.startswith(remaining)):
+                    node_offset = child_offset
+                    node_name += edge_label
+                    break
+            else:
+                return None, node_name
+        return node_offset, node_name
+
+    def _read_terminal(self, node_offset: int, node_name: bytes) -> Optional[MachoExportedSymbol]:
+        """Read the symbol described by a node, or None if the node doesn't describe a symbol."""
+        data = self._data
+        terminal_size, offset = read_uleb(data, node_offset)
+        if not terminal_size:
+            return None
+
+        name = node_name.decode()
+        flags, offset = read_uleb(data, offset)
+        if flags & ExportSymbolFlags.EXPORT_SYMBOL_FLAGS_REEXPORT:
+            library_ordinal, offset = read_uleb(data, offset)
+            imported_name_end = data.index(b"\x00", offset)
+            # An empty name means the symbol has the same name in the other library
+            imported_name = data[offset:imported_name_end].decode() or name
+            return MachoExportedSymbol(name, flags, None, library_ordinal=library_ordinal, imported_name=imported_name)
+
+        symbol_offset, offset = read_uleb(data, offset)
+        # Absolute symbols aren't relative to the image base
+        kind = flags & ExportSymbolFlags.EXPORT_SYMBOL_FLAGS_KIND_MASK
+        base = 0 if kind == ExportSymbolFlags.EXPORT_SYMBOL_FLAGS_KIND_ABSOLUTE else self._virtual_base
+        resolver = None
+        if flags & ExportSymbolFlags.EXPORT_SYMBOL_FLAGS_STUB_AND_RESOLVER:
+            resolver_offset, offset = read_uleb(data, offset)
+            resolver = VirtualMemoryPointer(self._virtual_base + resolver_offset)
+        return MachoExportedSymbol(name, flags, VirtualMemoryPointer(base + symbol_offset), resolver=resolver)
+
+    def _read_children(self, node_offset: int) -> List[Tuple[bytes, int]]:
+        """Read the (edge label, child node offset) of each child of a node."""
+        data = self._data
+        terminal_size, offset = read_uleb(data, node_offset)
+        offset += terminal_size
+        if offset >= len(data):
+            raise ValueError(f"Export trie node {hex(node_offset)} runs past the end of the trie")
+
+        child_count = data[offset]
+        offset += 1
+        children = []
+        for _ in range(child_count):
+            edge_label_end = data.index(b"\x00", offset)
+            edge_label = data[offset:edge_label_end]
+            child_offset, offset = read_uleb(data, edge_label_end + 1)
+            if child_offset >= len(data):
+                raise ValueError(f"Export trie node {hex(node_offset)} has an invalid child")
+            children.append((edge_label, child_offset))
+        return children
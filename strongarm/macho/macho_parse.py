@@ -1,10 +1,15 @@
+import mmap
 from ctypes import c_uint32, sizeof
 from pathlib import Path
-from typing import List, Optional
+from types import TracebackType
+from typing import List, Optional, Type
 
+from strongarm.logger import strongarm_logger
 from strongarm.macho.macho_binary import MachoBinary
 from strongarm.macho.macho_definitions import MachArch, MachoFatArch, MachoFatHeader, StaticFilePointer, swap32
 
+logger = strongarm_logger.getChild(__file__)
+
 
 class ArchitectureNotSupportedError(Exception):
     pass
@@ -19,8 +24,20 @@ class MachoParser:
 
     SUPPORTED_MAG = _FAT_MAGIC + _SUPPORTED_SLICE_MAG
 
-    def __init__(self, path: Path) -> None:
+    def __init__(self, path: Path, use_mmap: bool = True) -> None:
+        """Parse the Mach-O or FAT archive at the provided path.
+
+        Args:
+            path: Path to the file to parse
+            use_mmap: Back the parsed slices with a read-only memory mapping of the file, rather than reading the
+                whole file into memory. Slices share the mapping, and reads from them are zero-copy views into it.
+                Call close() (or use the parser as a context manager) to release the mapping.
+        """
         self.path = path
+        self.use_mmap = use_mmap
+        self._mapping: Optional[mmap.mmap] = None
+        self._file_contents: Optional[memoryview] = None
+        self._closed = False
 
         self.header: Optional[MachoFatHeader] = None
         self.is_swapped: bool = False
@@ -28,6 +45,31 @@ class MachoParser:
 
         self.parse()
 
+    def __enter__(self) -> "MachoParser":
+        return self
+
+    def __exit__(
+        self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException], exc_tb: Optional[TracebackType]
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the file's contents. Reads from the parser are invalid after this call.
+        Views that were previously handed out (such as the data backing each parsed slice) keep the pages
+        mapped until they are released.
+        """
+        self._closed = True
+        if self._file_contents is not None:
+            self._file_contents.release()
+            self._file_contents = None
+        if self._mapping is not None:
+            try:
+                self._mapping.close()
+            except BufferError:
+                # Other views into the mapping are still alive. It'll be unmapped once the last of them is released
+                logger.debug(f"{self.path} is still referenced, deferring unmap")
+            self._mapping = None
+
     def get_arm64_slice(self) -> Optional[MachoBinary]:
         """Retrieve the parsed slice from the FAT built for ARM64."""
         arm64_slices = [x for x in self.slices if x.header.cputype == MachArch.MH_CPU_TYPE_ARM64]
@@ -174,7 +216,22 @@ class MachoParser:
         # everything we touch currently is little endian, so let's not worry about it for now
         return self.file_magic in MachoParser._BIG_ENDIAN_MAG
 
-    def get_bytes(self, offset: StaticFilePointer, size: int) -> bytes:
+    @property
+    def file_contents(self) -> memoryview:
+        """A read-only view of the entire file. The file is mapped (or read) once, on first access."""
+        if self._closed:
+            raise ValueError(f"I/O operation on closed MachoParser: {self.path}")
+        if self._file_contents is None:
+            with open(self.path, "rb") as binary_file:
+                # Zero-length files can't be mapped
+                if self.use_mmap and self.path.stat().st_size > 0:
+                    self._mapping = mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._file_contents = memoryview(self._mapping)
+                else:
+                    self._file_contents = memoryview(binary_file.read())
+        return self._file_contents
+
+    def get_bytes(self, offset: StaticFilePointer, size: int) -> memoryview:
         """Read a byte list from binary file of a given size, starting from a given offset
 
         Args:
@@ -182,9 +239,7 @@ class MachoParser:
             size: Maximum number of bytes to read
 
         Returns:
-            Byte list representing contents of file at provided address
+            Read-only view of the contents of file at provided address
 
         """
-        with open(self.path, "rb") as binary_file:
-            binary_file.seek(offset)
-            return binary_file.read(size)
+        return self.file_contents[offset : offset + size]
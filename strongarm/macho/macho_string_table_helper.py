@@ -1,4 +1,6 @@
-from typing import Dict, List, Optional
+import re
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Union
 
 from strongarm.macho.macho_binary import MachoBinary, VirtualMemoryPointer
 from strongarm.macho.macho_definitions import NLIST_NTYPE, NTYPE_VALUES
@@ -15,21 +17,90 @@ class MachoStringTableEntry:
         self.full_string = content
 
 
+def _decode_string_table_entry(raw_entry: bytes) -> str:
+    try:
+        return raw_entry.decode("utf-8")
+    except UnicodeDecodeError:
+        # get a string literal of the raw bytes. 0x0080 -> "b'\\x00\\x80'"
+        return str(raw_entry)
+
+
+class LazyStringTable(Mapping[int, MachoStringTableEntry]):
+    """A read-only map of string table entry start indexes to MachoStringTableEntry's, decoded on demand.
+
+    Unlike MachoStringTableHelper.transform_string_section(), which decodes every entry up front, this keeps only the
+    raw string table and decodes an entry when it's looked up. The most recently used max_cached_entries entries are
+    memoized. Iterating the map scans the whole table, so it's best suited to point lookups.
+    """
+
+    _NULL = re.compile(b"\x00")
+
+    def __init__(self, strtab: Union[bytes, bytearray, memoryview], max_cached_entries: int = 4096) -> None:
+        self._strtab = memoryview(strtab)
+        self.max_cached_entries = max_cached_entries
+        self._cached_entries: "OrderedDict[int, MachoStringTableEntry]" = OrderedDict()
+
+    def __getitem__(self, start_idx: int) -> MachoStringTableEntry:
+        entry = self._cached_entries.get(start_idx)
+        if entry:
+            self._cached_entries.move_to_end(start_idx)
+            return entry
+
+        # Only the index of an entry's first character is a key
+        if not 0 <= start_idx < len(self._strtab) or (start_idx > 0 and self._strtab[start_idx - 1] != 0x00):
+            raise KeyError(start_idx)
+        terminator = self._NULL.search(self._strtab, start_idx)
+        if not terminator:
+            # The trailing bytes after the final NULL aren't an entry
+            raise KeyError(start_idx)
+
+        raw_entry = bytes(self._strtab[start_idx : terminator.start()])
+        entry = MachoStringTableEntry(start_idx, len(raw_entry), _decode_string_table_entry(raw_entry))
+        self._cached_entries[start_idx] = entry
+        if len(self._cached_entries) > self.max_cached_entries:
+            self._cached_entries.popitem(last=False)
+        return entry
+
+    def __iter__(self) -> Iterator[int]:
+        start_idx = 0
+        for terminator in self._NULL.finditer(self._strtab):
+            yield start_idx
+            start_idx = terminator.end()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._NULL.finditer(self._strtab))
+
+
 class MachoStringTableHelper:
     """Class containing helper functions for processing different tables in a Mach-O."""
 
     # TODO(PT): generalize the preprocessing of a string table where we efficiently map string start addresses to
     # full strings, so we don't need to do an O(n) search for a (struct __objc_data).name or something
 
-    def __init__(self, binary: MachoBinary) -> None:
+    # Whether to decode string table entries on demand with a LazyStringTable, rather than all at once.
+    # This uses much less memory when only some of the table's strings are needed.
+    USE_LAZY_STRING_TABLE = False
+
+    def __init__(self, binary: MachoBinary, lazy: Optional[bool] = None) -> None:
+        """Parse the binary's symbol lists from its string table.
+        If lazy is provided, it overrides USE_LAZY_STRING_TABLE for this helper.
+        """
         self.binary = binary
-        self.string_table_entries = MachoStringTableHelper.transform_string_section(self.binary.get_raw_string_table())
+        self.string_table_entries: Mapping[int, MachoStringTableEntry]
+        if self.USE_LAZY_STRING_TABLE if lazy is None else lazy:
+            self.string_table_entries = LazyStringTable(self.binary.get_raw_string_table())
+        else:
+            self.string_table_entries = MachoStringTableHelper.transform_string_section(
+                self.binary.get_raw_string_table()
+            )
         self.imported_symbols: List[str] = []
         self.exported_symbols: Dict[VirtualMemoryPointer, str] = {}
         self.parse_sym_lists()
 
     @classmethod
-    def transform_string_section(cls, strtab: List[int]) -> Dict[int, MachoStringTableEntry]:
+    def transform_string_section(
+        cls, strtab: Union[bytes, bytearray, memoryview, List[int]]
+    ) -> Dict[int, MachoStringTableEntry]:
         """Create more efficient representation of string table data
 
         Often, tables in a Mach-O will reference data within the string table.
@@ -41,31 +112,34 @@ class MachoStringTableHelper:
         To avoid this, we preprocess the string table into the full strings it represents. To make these lookups easier,
         we create a map of start indexes to MachoStringTableEntry's
 
+        Args:
+            strtab: The packed string table. Prefer passing the table's bytes (or a view of them) directly, rather
+                than a list of ints.
+
         Returns:
             Map of string table entry start indexes to MachoStringTableEntry's
         """
+        strtab_bytes = bytes(strtab)
+        # Anything after the final NULL isn't a terminated string, so it isn't an entry
+        terminated_length = strtab_bytes.rfind(b"\x00") + 1
+
+        # The split produces an empty trailing element after the final NULL, so it's dropped
+        # Each entry is recorded with its length in bytes, so offsets stay correct for multi-byte characters
+        entries: List[Tuple[int, str]]
+        if strtab_bytes.isascii():
+            # Every character is a single byte, so the whole table can be decoded at once without changing offsets
+            decoded_entries = strtab_bytes[:terminated_length].decode("ascii").split("\x00")[:-1]
+            entries = [(len(entry), entry) for entry in decoded_entries]
+        else:
+            raw_entries = strtab_bytes[:terminated_length].split(b"\x00")[:-1]
+            entries = [(len(raw_entry), _decode_string_table_entry(raw_entry)) for raw_entry in raw_entries]
+
         string_table_entries = {}
         entry_start_idx = 0
-        for idx, ch in enumerate(strtab):
-            # end of current string?
-            if ch == 0x00:
-                length = idx - entry_start_idx
-
-                # read this string now that we know the start index and length
-                entry_end_idx = entry_start_idx + length
-                entry_byte_content = bytearray(strtab[entry_start_idx:entry_end_idx:])
-                try:
-                    entry_content = entry_byte_content.decode("utf-8")
-                except UnicodeDecodeError:
-                    # get a string literal of the raw bytes. 0x0080 -> "b'\\x00\\x80'"
-                    entry_content = str(bytes(entry_byte_content))
-
-                # record in list
-                ent = MachoStringTableEntry(entry_start_idx, length, entry_content)
-                string_table_entries[entry_start_idx] = ent
-
-                # move to starting index of next string
-                entry_start_idx = idx + 1
+        for length, entry_content in entries:
+            string_table_entries[entry_start_idx] = MachoStringTableEntry(entry_start_idx, length, entry_content)
+            # move to starting index of next string
+            entry_start_idx += length + 1
         return string_table_entries
 
     def string_table_entry_for_strtab_index(self, start_idx: int) -> Optional[MachoStringTableEntry]:
@@ -74,25 +148,22 @@ class MachoStringTableHelper:
         Returns:
             A MachoStringTableEntry if provided index was the starting character of a string table entry, None if not
         """
-        if start_idx in self.string_table_entries:
-            return self.string_table_entries[start_idx]
-        return None
+        return self.string_table_entries.get(start_idx)
 
     def parse_sym_lists(self) -> None:
         """Read imported and exported symbol names referenced by symtab from the string table."""
 
         self.imported_symbols = []
 
-        symtab = self.binary.symtab_contents
-        for idx, sym in enumerate(symtab):
-            strtab_idx = sym.n_un.n_strx
+        symbol_table = self.binary.symbol_table
+        for strtab_idx, n_type, n_value in zip(symbol_table.n_strx, symbol_table.n_type, symbol_table.n_value):
             string_table_entry = self.string_table_entry_for_strtab_index(strtab_idx)
             if not string_table_entry:
                 continue
             symbol_str = string_table_entry.full_string
 
-            is_shared_symbol = int(sym.n_type & NLIST_NTYPE.N_EXT)
-            symbol_type = sym.n_type & NLIST_NTYPE.N_TYPE
+            is_shared_symbol = int(n_type & NLIST_NTYPE.N_EXT)
+            symbol_type = n_type & NLIST_NTYPE.N_TYPE
 
             if symbol_type == NTYPE_VALUES.N_UNDF:
                 # symbols marked (imported, shared) are actually duplicated as exported symbols later in the symbol
@@ -103,7 +174,7 @@ class MachoStringTableHelper:
                     continue
                 self.imported_symbols.append(symbol_str)
             elif symbol_type == NTYPE_VALUES.N_SECT:
-                self.exported_symbols[sym.n_value] = symbol_str
+                self.exported_symbols[n_value] = symbol_str
 
     def get_symbol_name_for_address(self, address: VirtualMemoryPointer) -> Optional[str]:
         """For an address of a function entrypoint, return the function's symbol name."""
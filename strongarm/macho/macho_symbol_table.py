@@ -0,0 +1,43 @@
+import struct
+from array import array
+from typing import Union
+
+
+class MachoSymbolTable:
+    """A Mach-O symbol table (the nlist entries described by LC_SYMTAB), stored by column.
+
+    Each field of struct nlist is stored in its own array, indexed by symbol table index. Reading the table this way
+    takes a single pass over its bytes, and doesn't create a Python object per symbol.
+    n_strx is the string table index of the symbol's name, which is found at nlist.n_un.n_strx in MachoNlistStruct.
+    """
+
+    # Layouts of struct nlist and struct nlist_64, from <mach-o/nlist.h>
+    _NLIST_32 = struct.Struct("<IBBhI")
+    _NLIST_64 = struct.Struct("<IBBHQ")
+
+    def __init__(self, symtab_data: Union[bytes, bytearray, memoryview], is_64bit: bool) -> None:
+        nlist = self._NLIST_64 if is_64bit else self._NLIST_32
+        self.entry_size = nlist.size
+
+        # Ignore any trailing partial entry
+        usable_size = len(symtab_data) - (len(symtab_data) % nlist.size)
+        columns = list(zip(*nlist.iter_unpack(memoryview(symtab_data)[:usable_size])))
+        if not columns:
+            columns = [(), (), (), (), ()]
+
+        self.n_strx = array("I", columns[0])
+        self.n_type = array("B", columns[1])
+        self.n_sect = array("B", columns[2])
+        self.n_desc = array("H" if is_64bit else "h", columns[3])
+        self.n_value = array("Q", columns[4])
+
+    @classmethod
+    def entry_size_for(cls, is_64bit: bool) -> int:
+        """The size of each nlist entry in the symbol table of a 32- or 64-bit binary."""
+        return cls._NLIST_64.size if is_64bit else cls._NLIST_32.size
+
+    def __len__(self) -> int:
+        return len(self.n_strx)
+
+    def __repr__(self) -> str:
+        return f"<MachoSymbolTable {len(self)} symbols>"
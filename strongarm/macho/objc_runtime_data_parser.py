@@ -1,5 +1,7 @@
+import threading
 from ctypes import c_int8, c_uint32, c_uint64, sizeof
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
 
 from strongarm.logger import strongarm_logger
 from strongarm.macho.arch_independent_structs import (
@@ -19,6 +21,8 @@ from strongarm.macho.macho_definitions import VirtualMemoryPointer
 
 logger = strongarm_logger.getChild(__file__)
 
+_T = TypeVar("_T")
+
 
 class ObjcSelref:
     __slots__ = ["source_address", "destination_address", "selector_literal"]
@@ -72,7 +76,16 @@ class ObjcIvar:
 
 
 class ObjcClass:
-    __slots__ = ["raw_struct", "name", "selectors", "ivars", "protocols", "super_classref", "superclass_name"]
+    __slots__ = [
+        "raw_struct",
+        "name",
+        "_selectors",
+        "_ivars",
+        "_protocols",
+        "super_classref",
+        "superclass_name",
+        "_load_contents",
+    ]
 
     def __init__(
         self,
@@ -83,14 +96,47 @@ class ObjcClass:
         protocols: Optional[List["ObjcProtocol"]] = None,
         super_classref: Optional[VirtualMemoryPointer] = None,
         superclass_name: Optional[str] = None,
+        load_contents: Optional[Callable[["ObjcClass"], None]] = None,
     ) -> None:
         self.name = name
-        self.selectors = selectors
+        self._selectors = selectors
         self.raw_struct = raw_struct
-        self.ivars = ivars if ivars else []
-        self.protocols = protocols if protocols else []
+        self._ivars = ivars if ivars else []
+        self._protocols = protocols if protocols else []
         self.super_classref = super_classref
         self.superclass_name = superclass_name
+        # If provided, fills in the selectors, ivars and protocols the first time any of them is accessed
+        self._load_contents = load_contents
+
+    @property
+    def selectors(self) -> List[ObjcSelector]:
+        if self._load_contents:
+            self._load_contents(self)
+        return self._selectors
+
+    @selectors.setter
+    def selectors(self, selectors: List[ObjcSelector]) -> None:
+        self._selectors = selectors
+
+    @property
+    def ivars(self) -> List[ObjcIvar]:
+        if self._load_contents:
+            self._load_contents(self)
+        return self._ivars
+
+    @ivars.setter
+    def ivars(self, ivars: List[ObjcIvar]) -> None:
+        self._ivars = ivars
+
+    @property
+    def protocols(self) -> List["ObjcProtocol"]:
+        if self._load_contents:
+            self._load_contents(self)
+        return self._protocols
+
+    @protocols.setter
+    def protocols(self, protocols: List["ObjcProtocol"]) -> None:
+        self._protocols = protocols
 
     def __str__(self) -> str:
         return f"ObjcClass({self.name} : {self.superclass_name})"
@@ -107,7 +153,7 @@ class ObjcProtocol(ObjcClass):
 
 
 class ObjcCategory(ObjcClass):
-    __slots__ = ["raw_struct", "name", "base_class", "category_name", "selectors", "ivars", "protocols"]
+    __slots__ = ["base_class", "category_name"]
 
     def __init__(
         self,
@@ -117,6 +163,7 @@ class ObjcCategory(ObjcClass):
         selectors: List[ObjcSelector],
         ivars: Optional[List[ObjcIvar]] = None,
         protocols: Optional[List[ObjcProtocol]] = None,
+        load_contents: Optional[Callable[[ObjcClass], None]] = None,
     ) -> None:
         self.base_class = base_class
         self.category_name = category_name
@@ -124,7 +171,7 @@ class ObjcCategory(ObjcClass):
         # ObjcCategory.name includes the base class + the cat-name
         # That way, callers don't need to check the ObjcClass instance type to get the 'right' value
         full_name = f"{base_class} ({category_name})"
-        super().__init__(raw_struct, full_name, selectors, ivars, protocols)
+        super().__init__(raw_struct, full_name, selectors, ivars, protocols, load_contents=load_contents)
 
     def __str__(self) -> str:
         return f"ObjcCategory({self.base_class} ({self.category_name}))"
@@ -137,39 +184,134 @@ class ObjcCategory(ObjcClass):
 
 
 class ObjcRuntimeDataParser:
-    def __init__(self, binary: MachoBinary) -> None:
+    # Whether to read only the class and category lists and class names up front, and parse each class's method lists,
+    # ivars and protocols the first time that class is used. Queries over every selector still parse every class.
+    USE_LAZY_CLASS_PARSING = False
+
+    def __init__(self, binary: MachoBinary, lazy: Optional[bool] = None) -> None:
+        """Parse the binary's Objective-C runtime data.
+        If lazy is provided, it overrides USE_LAZY_CLASS_PARSING for this parser.
+        """
         self.binary = binary
+        self.lazy = self.USE_LAZY_CLASS_PARSING if lazy is None else lazy
         logger.debug(f"Parsing ObjC runtime info of {self.binary}...")
 
-        logger.debug("Step 1: Parsing selrefs...")
         self._selector_literal_ptr_to_selref_map: Dict[VirtualMemoryPointer, ObjcSelref] = {}
         self._selref_ptr_to_selref_map: Dict[VirtualMemoryPointer, ObjcSelref] = {}
         # Note this mapping is partially filled in now, but gets updated later in the parse
         self._selref_ptr_to_selector_map: Dict[VirtualMemoryPointer, ObjcSelector] = {}
-        # Populates the mappings above
-        self._parse_selrefs()
-
-        logger.debug("Step 2: Parsing classes, categories, and protocols...")
         self._classrefs_to_objc_classes: Dict[VirtualMemoryPointer, ObjcClass] = {}
-        # This populates self._classrefs_to_objc_classes
-        self.classes = self._parse_class_and_category_info()
-        self.protocols = self._parse_global_protocol_info()
-
-        logger.debug("Step 3: Resolving symbol name to source dylib map...")
-        self._sym_to_dylib_path = self._parse_linked_dylib_symbols()
+        self._protocols: Optional[List[ObjcProtocol]] = None
+        self._sym_to_dylib_path: Optional[Dict[str, str]] = None
+
+        # Lazy parsing state. Parsing a method list updates _selref_ptr_to_selector_map, and the result depends on the
+        # order that method lists are parsed in. So while a class is lazily parsed, the selectors read from its method
+        # lists are collected rather than applied. They're applied in the order of an eager parse once every class
+        # has been parsed. See self._resolve_selectors()
+        self._lazy_parse_lock = threading.RLock()
+        self._selrefs_parsed = False
+        self._selectors_resolved = False
+        self._deferred_selectors: Optional[List[ObjcSelector]] = None
+        self._deferred_selectors_by_source: Dict[object, List[ObjcSelector]] = {}
+
+        if self.lazy:
+            logger.debug("Indexing classes and categories...")
+            self.classes = self._parse_class_and_category_info(lazy=True)
+        else:
+            logger.debug("Step 1: Parsing selrefs...")
+            # Populates the mappings above
+            self._parse_selrefs()
+
+            logger.debug("Step 2: Parsing classes, categories, and protocols...")
+            # This populates self._classrefs_to_objc_classes
+            self.classes = self._parse_class_and_category_info()
+            self._protocols = self._parse_global_protocol_info()
+            self._selectors_resolved = True
+
+            logger.debug("Step 3: Resolving symbol name to source dylib map...")
+            self._sym_to_dylib_path = self._parse_linked_dylib_symbols()
+
+        # Lookup indexes over the parsed selrefs and classes. Built the first time they're needed
+        self._selector_names_to_selrefs: Optional[Dict[str, List[VirtualMemoryPointer]]] = None
+        self._class_names_to_classes: Optional[Dict[str, ObjcClass]] = None
+        self._class_indexes_built = False
+        self._selector_names_to_imps: Dict[str, List[VirtualMemoryPointer]] = {}
+        self._imps_to_methods: Dict[VirtualMemoryPointer, Tuple[ObjcClass, ObjcSelector]] = {}
+        self._signatures_to_methods: Dict[Tuple[str, str], Tuple[ObjcClass, ObjcSelector]] = {}
+
+    @property
+    def protocols(self) -> List[ObjcProtocol]:
+        """The protocols referenced by __objc_protolist."""
+        if self._protocols is None:
+            with self._lazy_parse_lock:
+                if self._protocols is None:
+                    self._protocols = self._parse_deferring_selectors(self, self._parse_global_protocol_info)
+        return self._protocols
+
+    def _parse_deferring_selectors(self, source: object, parse: Callable[[], _T]) -> _T:
+        """Run part of a lazy parse, collecting the selectors it reads from method lists under the provided source.
+        The caller must hold self._lazy_parse_lock.
+        """
+        self._parse_selrefs()
+        self._deferred_selectors = []
+        try:
+            result = parse()
+            self._deferred_selectors_by_source[source] = self._deferred_selectors
+        finally:
+            self._deferred_selectors = None
+        return result
+
+    def _load_class_contents(self, objc_class: ObjcClass) -> None:
+        """Parse the method lists, ivars and protocols of a class or category that was indexed by a lazy parse."""
+        with self._lazy_parse_lock:
+            if not objc_class._load_contents:
+                # Another thread parsed the class first
+                return
+
+            parsed_class: Optional[ObjcClass]
+            raw_struct = objc_class.raw_struct
+            if isinstance(raw_struct, ObjcCategoryRawStruct):
+                parse_category = partial(self._parse_objc_category_entry, raw_struct)
+                parsed_class = self._parse_deferring_selectors(objc_class, parse_category)
+            else:
+                assert isinstance(raw_struct, ObjcClassRawStruct)
+                parsed_class = self._parse_deferring_selectors(objc_class, partial(self._parse_objc_class, raw_struct))
+            # The lazy parse already found the class or its metaclass
+            assert parsed_class
+
+            objc_class.selectors = parsed_class.selectors
+            objc_class.ivars = parsed_class.ivars
+            objc_class.protocols = parsed_class.protocols
+            objc_class._load_contents = None
+
+    def _resolve_selectors(self) -> None:
+        """Ensure self._selref_ptr_to_selector_map holds the selectors of every method list, as after an eager parse.
+        Parses every class that hasn't been parsed yet.
+        """
+        if self._selectors_resolved:
+            return
+        with self._lazy_parse_lock:
+            # If another thread resolved the selectors first, every class is parsed and there's nothing left to apply
+            for objc_class in self.classes:
+                # Accessing the selectors parses the class
+                objc_class.selectors
+            self.protocols
+
+            # Apply the selectors in the order an eager parse would: classes and categories, then protocols
+            for source in [*self.classes, self]:
+                self._record_selectors(self._deferred_selectors_by_source.pop(source, []))
+            self._selectors_resolved = True
 
     def _parse_linked_dylib_symbols(self) -> Dict[str, str]:
         syms_to_dylib_path = {}
 
         symtab = self.binary.symtab
-        symtab_contents = self.binary.symtab_contents
+        symbol_table = self.binary.symbol_table
         dysymtab = self.binary.dysymtab
         visited_addresses = set()
         for undef_sym_idx in range(dysymtab.nundefsym):
             symtab_idx = dysymtab.iundefsym + undef_sym_idx
-            sym = symtab_contents[symtab_idx]
-
-            strtab_idx = sym.n_un.n_strx
+            strtab_idx = symbol_table.n_strx[symtab_idx]
             string_file_address = symtab.stroff + strtab_idx
 
             # Some binaries contain a symtab such that all the calculated string address are the same. This check
@@ -184,13 +326,15 @@ class ObjcRuntimeDataParser:
                 logger.error(f"Could not get symbol name at address {hex(string_file_address)}")
                 continue
 
-            library_ordinal = self._library_ordinal_from_n_desc(sym.n_desc)
+            library_ordinal = self._library_ordinal_from_n_desc(symbol_table.n_desc[symtab_idx])
             source_name = self.binary.dylib_name_for_library_ordinal(library_ordinal)
 
             syms_to_dylib_path[symbol_name] = source_name
         return syms_to_dylib_path
 
     def path_for_external_symbol(self, symbol: str) -> Optional[str]:
+        if self._sym_to_dylib_path is None:
+            self._sym_to_dylib_path = self._parse_linked_dylib_symbols()
         if symbol in self._sym_to_dylib_path:
             return self._sym_to_dylib_path[symbol]
         return None
@@ -210,7 +354,12 @@ class ObjcRuntimeDataParser:
         will have their `implementation` field filled, because at this point in the parse we do not yet know the
         implementations of each selector. ObjcSelectors which we later find an implementation for are
         updated in self.read_selectors_from_methlist_ptr().
+        Does nothing if the selrefs have already been parsed.
         """
+        if self._selrefs_parsed:
+            return
+        self._selrefs_parsed = True
+
         selref_pointers = self.binary.read_pointer_section("__objc_selrefs")
         for selref_ptr, selector_literal_ptr in selref_pointers.items():
             # Read selector string literal from selref pointer
@@ -230,6 +379,7 @@ class ObjcRuntimeDataParser:
             self._selref_ptr_to_selector_map[selref_ptr] = ObjcSelector(selector_string, wrapped_selref, None)
 
     def selector_for_selref(self, selref_addr: VirtualMemoryPointer) -> Optional[ObjcSelector]:
+        self._resolve_selectors()
         # This map contains selectors implemented in the binary
         selector = self._selref_ptr_to_selector_map.get(selref_addr)
         if selector is not None:
@@ -246,6 +396,7 @@ class ObjcRuntimeDataParser:
             return None
 
     def selector_for_selector_literal(self, literal_addr: VirtualMemoryPointer) -> Optional[ObjcSelector]:
+        self._resolve_selectors()
         selector_literal = self._selector_literal_ptr_to_selref_map.get(literal_addr)
         if selector_literal is not None:
             return self.selector_for_selref(selector_literal.source_address)
@@ -253,56 +404,89 @@ class ObjcRuntimeDataParser:
             return None
 
     def selrefs_to_selectors(self) -> Dict[VirtualMemoryPointer, ObjcSelector]:
+        self._resolve_selectors()
         return self._selref_ptr_to_selector_map
 
     def selref_for_selector_name(self, selector_name: str) -> Optional[VirtualMemoryPointer]:
-        return next(
-            (selref for selref, selector in self._selref_ptr_to_selector_map.items() if selector.name == selector_name),
-            None,
-        )
+        selrefs = self.selrefs_for_selector_name(selector_name)
+        return selrefs[0] if selrefs else None
+
+    def selrefs_for_selector_name(self, selector_name: str) -> List[VirtualMemoryPointer]:
+        """Return every selref that refers to a selector with the provided name, in the order of __objc_selrefs."""
+        if self._selector_names_to_selrefs is None:
+            # Parsing method lists only fills in the implementations of selrefs, so every selref's name is known
+            with self._lazy_parse_lock:
+                self._parse_selrefs()
+            selector_names_to_selrefs: Dict[str, List[VirtualMemoryPointer]] = {}
+            for selref, selector in self._selref_ptr_to_selector_map.items():
+                selector_names_to_selrefs.setdefault(selector.name, []).append(selref)
+            self._selector_names_to_selrefs = selector_names_to_selrefs
+        return list(self._selector_names_to_selrefs.get(selector_name, []))
 
     def get_method_imp_addresses(self, selector: str) -> List[VirtualMemoryPointer]:
         """Given a selector, return a list of virtual addresses corresponding to the start of each IMP for that SEL."""
-        return [
-            objc_sel.implementation
-            for objc_class in self.classes
-            for objc_sel in objc_class.selectors
-            if objc_sel.name == selector and objc_sel.implementation
-        ]
+        self._build_class_indexes()
+        return list(self._selector_names_to_imps.get(selector, []))
+
+    def objc_class_for_name(self, class_name: str) -> Optional[ObjcClass]:
+        """Return the class or category with the provided name, or None if the binary doesn't implement it.
+        Categories are named `BaseClass (CategoryName)`.
+        """
+        if self._class_names_to_classes is None:
+            class_names_to_classes: Dict[str, ObjcClass] = {}
+            for objc_class in self.classes:
+                class_names_to_classes.setdefault(objc_class.name, objc_class)
+            self._class_names_to_classes = class_names_to_classes
+        return self._class_names_to_classes.get(class_name)
+
+    def method_for_imp(self, imp: VirtualMemoryPointer) -> Optional[Tuple[ObjcClass, ObjcSelector]]:
+        """Return the class and selector of the method implemented at the provided address."""
+        self._build_class_indexes()
+        return self._imps_to_methods.get(imp)
+
+    def method_for_signature(self, class_name: str, selector_name: str) -> Optional[Tuple[ObjcClass, ObjcSelector]]:
+        """Return the class and selector of -[class_name selector_name], or None if the binary doesn't implement it."""
+        self._build_class_indexes()
+        return self._signatures_to_methods.get((class_name, selector_name))
+
+    def _build_class_indexes(self) -> None:
+        """Index the methods of every parsed class by selector name, IMP and signature.
+        Where several entries share a key, the first in self.classes wins, matching a linear scan of self.classes.
+        Does nothing if the indexes have already been built.
+        """
+        if self._class_indexes_built:
+            return
+
+        imps_to_methods: Dict[VirtualMemoryPointer, Tuple[ObjcClass, ObjcSelector]] = {}
+        signatures_to_methods: Dict[Tuple[str, str], Tuple[ObjcClass, ObjcSelector]] = {}
+        selector_names_to_imps: Dict[str, List[VirtualMemoryPointer]] = {}
+        for objc_class in self.classes:
+            for selector in objc_class.selectors:
+                signatures_to_methods.setdefault((objc_class.name, selector.name), (objc_class, selector))
+                if selector.implementation is not None:
+                    imps_to_methods.setdefault(selector.implementation, (objc_class, selector))
+                if selector.implementation:
+                    selector_names_to_imps.setdefault(selector.name, []).append(selector.implementation)
+
+        self._imps_to_methods = imps_to_methods
+        self._signatures_to_methods = signatures_to_methods
+        self._selector_names_to_imps = selector_names_to_imps
+        self._class_indexes_built = True
 
     def objc_class_for_classlist_pointer(self, classlist_ptr: VirtualMemoryPointer) -> Optional[ObjcClass]:
         return self._classrefs_to_objc_classes.get(classlist_ptr)
 
-    def _parse_objc_classes(self) -> List[ObjcClass]:
-        """Read Objective-C class data in __objc_classlist, __objc_data to get classes and selectors in binary."""
+    def _parse_objc_classes(self, lazy: bool = False) -> List[ObjcClass]:
+        """Read Objective-C class data in __objc_classlist, __objc_data to get classes and selectors in binary.
+        If lazy is set, only the name of each class is read. See self._parse_objc_class()
+        """
         logger.debug("Cross-referencing __objc_classlist, __objc_class, and __objc_data entries...")
         parsed_objc_classes = []
         classlist_pointers = self._get_classlist_pointers()
         for ptr in classlist_pointers:
             objc_class = self._get_objc_class_from_classlist_pointer(ptr)
             if objc_class:
-                parsed_class = None
-                # parse the instance method list
-                objc_data_struct = self._get_objc_data_from_objc_class(objc_class)
-                if objc_data_struct:
-                    # the class's associated struct __objc_data contains the method list
-                    parsed_class = self._parse_objc_data_entry(objc_class, objc_data_struct)
-
-                # parse the metaclass if it exists
-                # the class stores instance methods and the metaclass's method list contains class methods
-                # the metaclass has the same name as the actual class
-                metaclass = self._get_objc_class_from_classlist_pointer(VirtualMemoryPointer(objc_class.metaclass))
-                if metaclass:
-                    objc_data_struct = self._get_objc_data_from_objc_class(metaclass)
-                    if objc_data_struct:
-                        parsed_metaclass = self._parse_objc_data_entry(objc_class, objc_data_struct)
-                        if parsed_class:
-                            # add in selectors from the metaclass to the real class
-                            parsed_class.selectors += parsed_metaclass.selectors
-                        else:
-                            # no base class found, set the base class to the metaclass
-                            parsed_class = parsed_metaclass
-
+                parsed_class = self._parse_objc_class(objc_class, lazy=lazy)
                 # sanity check
                 # ensure we either found a class or metaclass
                 if not parsed_class:
@@ -312,22 +496,53 @@ class ObjcRuntimeDataParser:
 
         return parsed_objc_classes
 
-    def _parse_objc_categories(self) -> List[ObjcCategory]:
+    def _parse_objc_class(self, objc_class: ObjcClassRawStruct, lazy: bool = False) -> Optional[ObjcClass]:
+        """Parse a class and its metaclass, or return None if neither has valid data.
+        If lazy is set, only the class's name is read. Its method lists, ivars and protocols are parsed when first used.
+        """
+        parsed_class = None
+        # parse the instance method list
+        objc_data_struct = self._get_objc_data_from_objc_class(objc_class)
+        if objc_data_struct:
+            # the class's associated struct __objc_data contains the method list
+            parsed_class = self._parse_objc_data_entry(objc_class, objc_data_struct, lazy=lazy)
+            if lazy:
+                return parsed_class
+
+        # parse the metaclass if it exists
+        # the class stores instance methods and the metaclass's method list contains class methods
+        # the metaclass has the same name as the actual class
+        metaclass = self._get_objc_class_from_classlist_pointer(VirtualMemoryPointer(objc_class.metaclass))
+        if metaclass:
+            objc_data_struct = self._get_objc_data_from_objc_class(metaclass)
+            if objc_data_struct:
+                parsed_metaclass = self._parse_objc_data_entry(objc_class, objc_data_struct, lazy=lazy)
+                if parsed_class:
+                    # add in selectors from the metaclass to the real class
+                    parsed_class.selectors += parsed_metaclass.selectors
+                else:
+                    # no base class found, set the base class to the metaclass
+                    parsed_class = parsed_metaclass
+        return parsed_class
+
+    def _parse_objc_categories(self, lazy: bool = False) -> List[ObjcCategory]:
         logger.debug("Cross referencing __objc_catlist, __objc_category, and __objc_data entries...")
         parsed_categories = []
         category_pointers = self._get_catlist_pointers()
         for ptr in category_pointers:
             objc_category_struct = self._get_objc_category_from_catlist_pointer(ptr)
             if objc_category_struct:
-                parsed_category = self._parse_objc_category_entry(objc_category_struct)
+                parsed_category = self._parse_objc_category_entry(objc_category_struct, lazy=lazy)
                 parsed_categories.append(parsed_category)
         return parsed_categories
 
-    def _parse_class_and_category_info(self) -> List[ObjcClass]:
-        """Parse classes and categories referenced by __objc_classlist and __objc_catlist."""
+    def _parse_class_and_category_info(self, lazy: bool = False) -> List[ObjcClass]:
+        """Parse classes and categories referenced by __objc_classlist and __objc_catlist.
+        If lazy is set, only their names are read.
+        """
         classes: List[ObjcClass] = []
-        classes += self._parse_objc_classes()
-        classes += self._parse_objc_categories()
+        classes += self._parse_objc_classes(lazy=lazy)
+        classes += self._parse_objc_categories(lazy=lazy)
         # Link superclasses of classes and base-classes of categories
         self._add_superclass_or_base_class_name_to_classes(classes)
         return classes
@@ -429,7 +644,19 @@ class ObjcRuntimeDataParser:
             selector = ObjcSelector(symbol_name, selref, VirtualMemoryPointer(method_ent.implementation))
             selectors.append(selector)
 
-            # save this selector in the selref pointer -> selector map
+            method_entry_off += method_ent.sizeof
+
+        if self._deferred_selectors is not None:
+            # Lazy parse. See self._resolve_selectors()
+            self._deferred_selectors.extend(selectors)
+        else:
+            self._record_selectors(selectors)
+        return selectors
+
+    def _record_selectors(self, selectors: List[ObjcSelector]) -> None:
+        """Save selectors read from a method list in the selref pointer -> selector map."""
+        for selector in selectors:
+            selref = selector.selref
             if selref:
                 # if this selector is already in the map, check if we now know the implementation address
                 # we could have parsed the selector literal/selref pair in _parse_selrefs() but not have known the
@@ -445,9 +672,6 @@ class ObjcRuntimeDataParser:
                         most_specific_selector = previously_parsed_selector
                 self._selref_ptr_to_selector_map[selref.source_address] = most_specific_selector
 
-            method_entry_off += method_ent.sizeof
-        return selectors
-
     def _parse_objc_protocol_entry(self, objc_protocol_struct: ObjcProtocolRawStruct) -> ObjcProtocol:
         symbol_name = self.binary.get_full_string_from_start_address(objc_protocol_struct.name)
         if not symbol_name:
@@ -465,7 +689,9 @@ class ObjcRuntimeDataParser:
 
         return ObjcProtocol(objc_protocol_struct, symbol_name, selectors)
 
-    def _parse_objc_category_entry(self, objc_category_struct: ObjcCategoryRawStruct) -> ObjcCategory:
+    def _parse_objc_category_entry(
+        self, objc_category_struct: ObjcCategoryRawStruct, lazy: bool = False
+    ) -> ObjcCategory:
         # TODO(PT): Add in the methods of the base class to the ObjcCategory
         symbol_name = self.binary.get_full_string_from_start_address(objc_category_struct.name)
         if not symbol_name:
@@ -478,6 +704,10 @@ class ObjcRuntimeDataParser:
         placeholder_class_name = (
             f"<Base class of {symbol_name} category @ {objc_category_struct.binary_offset} will be populated later>"
         )
+        if lazy:
+            return ObjcCategory(
+                objc_category_struct, placeholder_class_name, symbol_name, [], load_contents=self._load_class_contents
+            )
 
         # if the class implements no methods, the pointer to method list will be the null pointer
         # TODO(PT): we could add some flag to keep track of whether a given sel is an instance or class method
@@ -493,11 +723,19 @@ class ObjcRuntimeDataParser:
         return ObjcCategory(objc_category_struct, placeholder_class_name, symbol_name, selectors, protocols=protocols)
 
     def _parse_objc_data_entry(
-        self, objc_class_struct: ObjcClassRawStruct, objc_data_struct: ObjcDataRawStruct
+        self, objc_class_struct: ObjcClassRawStruct, objc_data_struct: ObjcDataRawStruct, lazy: bool = False
     ) -> ObjcClass:
         symbol_name = self.binary.get_full_string_from_start_address(objc_data_struct.name)
         if not symbol_name:
             raise ValueError(f"Could not get symbol name for {hex(objc_data_struct.name)}")
+        if lazy:
+            return ObjcClass(
+                objc_class_struct,
+                symbol_name,
+                [],
+                super_classref=objc_class_struct.superclass,
+                load_contents=self._load_class_contents,
+            )
 
         selectors: List[ObjcSelector] = []
         protocols: List[ObjcProtocol] = []
@@ -540,15 +778,18 @@ class ObjcRuntimeDataParser:
 
     def _get_catlist_pointers(self) -> List[VirtualMemoryPointer]:
         """Read pointers in __objc_catlist into list."""
-        return list(self.binary.read_pointer_section("__objc_catlist").values())
+        _, pointers = self.binary.read_pointer_section_arrays("__objc_catlist")
+        return [VirtualMemoryPointer(pointer) for pointer in pointers]
 
     def _get_protolist_pointers(self) -> List[VirtualMemoryPointer]:
         """Read pointers in __objc_protolist into list."""
-        return list(self.binary.read_pointer_section("__objc_protolist").values())
+        _, pointers = self.binary.read_pointer_section_arrays("__objc_protolist")
+        return [VirtualMemoryPointer(pointer) for pointer in pointers]
 
     def _get_classlist_pointers(self) -> List[VirtualMemoryPointer]:
         """Read pointers in __objc_classlist into list."""
-        return list(self.binary.read_pointer_section("__objc_classlist").values())
+        _, pointers = self.binary.read_pointer_section_arrays("__objc_classlist")
+        return [VirtualMemoryPointer(pointer) for pointer in pointers]
 
     def _get_objc_category_from_catlist_pointer(
         self, category_struct_pointer: VirtualMemoryPointer
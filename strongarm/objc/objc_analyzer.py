@@ -1,8 +1,8 @@
-import functools
 import shlex
+from collections import OrderedDict
 from itertools import starmap
 from subprocess import check_output
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from capstone import CsInsn
 from strongarm_dataflow.dataflow import get_register_contents_at_instruction_fast
@@ -91,6 +91,9 @@ class ObjcFunctionAnalyzer:
     As Objective-C is a strict superset of C, ObjcFunctionAnalyzer can also be used on pure C functions.
     """
 
+    # Number of get_register_contents_at_instruction() results each function analyzer memoizes
+    MAX_CACHED_REGISTER_CONTENTS = 100
+
     def __init__(
         self, binary: MachoBinary, instructions: List[CsInsn], method_info: Optional[ObjcMethodInfo] = None
     ) -> None:
@@ -112,6 +115,8 @@ class ObjcFunctionAnalyzer:
         self.method_info = method_info
 
         self._call_targets: Optional[List[ObjcBranchInstruction]] = None
+        # Recent get_register_contents_at_instruction() results
+        self._register_contents_cache: "OrderedDict[Tuple[str, ObjcInstruction], RegisterContents]" = OrderedDict()
 
         # Find basic-block-boundaries upfront
         self.basic_blocks = self._find_basic_blocks()
@@ -234,14 +239,10 @@ class ObjcFunctionAnalyzer:
         from strongarm.macho.macho_analyzer import MachoAnalyzer
 
         analyzer = MachoAnalyzer.get_analyzer(binary)
-        for objc_cls in analyzer.objc_classes():
-            if objc_cls.name == class_name:
-                for sel in objc_cls.selectors:
-                    if sel.name == sel_name:
-                        # XXX(PT): where are the method info's normally stored? Can we grab it from there?
-                        method_info = ObjcMethodInfo(objc_cls, sel, sel.implementation)
-                        return ObjcFunctionAnalyzer.get_function_analyzer_for_method(binary, method_info)
-        raise RuntimeError(f"No found function analyzer for -[{class_name} {sel_name}]")
+        method_info = analyzer.method_info_for_signature(class_name, sel_name)
+        if not method_info:
+            raise RuntimeError(f"No found function analyzer for -[{class_name} {sel_name}]")
+        return ObjcFunctionAnalyzer.get_function_analyzer_for_method(binary, method_info)
 
     @property
     def call_targets(self) -> List[ObjcBranchInstruction]:
@@ -327,8 +328,12 @@ class ObjcFunctionAnalyzer:
             raise RuntimeError(f"could not determine selref ptr, origates in function arg (type {contents.type.name})")
         return VirtualMemoryPointer(contents.value)
 
-    @functools.lru_cache(maxsize=100)
     def get_register_contents_at_instruction(self, register: str, instruction: ObjcInstruction) -> RegisterContents:
+        cache_key = (register, instruction)
+        if cache_key in self._register_contents_cache:
+            self._register_contents_cache.move_to_end(cache_key)
+            return self._register_contents_cache[cache_key]
+
         # If basic-block analysis has been done, reduce the dataflow analysis space to the instruction's basic-block
         # Otherwise, use the entire source function as the search space
         for bb in self.basic_blocks:
@@ -344,12 +349,17 @@ class ObjcFunctionAnalyzer:
 
         # To try and save a bit of work, don't include bytecode past the end of this basic block,
         # as we only need the bytecode up to the provided instruction
-        function_bytecode = self.binary.get_content_from_virtual_address(
-            self.start_address, dataflow_space_end - self.start_address
+        # The extension never releases buffers passed to it, so pass a copy rather than a view into the binary's mapping
+        function_bytecode = bytes(
+            self.binary.get_content_from_virtual_address(self.start_address, dataflow_space_end - self.start_address)
         )
-        return get_register_contents_at_instruction_fast(
+        contents = get_register_contents_at_instruction_fast(
             register, self.start_address, function_bytecode, dataflow_space_start, instruction.address
         )
+        self._register_contents_cache[cache_key] = contents
+        while len(self._register_contents_cache) > self.MAX_CACHED_REGISTER_CONTENTS:
+            self._register_contents_cache.popitem(last=False)
+        return contents
 
     def _find_basic_blocks(self) -> List["BasicBlock"]:
         """Locate the basic-block-boundaries within the source function.
@@ -0,0 +1,168 @@
+import inspect
+import pathlib
+import pickle
+import random
+from ctypes import sizeof
+from typing import Any, Set, Tuple, Type
+
+import pytest
+
+from strongarm.macho import MachoParser, VirtualMemoryPointer, arch_independent_structs
+from strongarm.macho.arch_independent_structs import (
+    ArchIndependentStructure,
+    MachoDyldChainedPtr64Bind,
+    ObjcClassRawStruct,
+    ObjcIvarStruct,
+    ObjcMethodStruct,
+    StructReader,
+)
+from strongarm.macho.codesign import codesign_definitions
+from strongarm.macho.macho_definitions import (
+    MachoDyldChainedPtr64BindRaw,
+    ObjcClassRaw64,
+    ObjcIvar64,
+    ObjcMethodRelativeData,
+)
+
+
+def _all_structure_layouts() -> Set[Tuple[Type[ArchIndependentStructure], Any]]:
+    layouts = {(ObjcMethodStruct, ObjcMethodRelativeData)}
+    for module in (arch_independent_structs, codesign_definitions):
+        for _, struct_type in inspect.getmembers(module, inspect.isclass):
+            if issubclass(struct_type, ArchIndependentStructure) and struct_type is not ArchIndependentStructure:
+                for layout in (struct_type._32_BIT_STRUCT, struct_type._64_BIT_STRUCT):
+                    if layout:
+                        layouts.add((struct_type, layout))
+    return layouts
+
+
+class TestArchIndependentStructure:
+    @pytest.mark.parametrize(
+        "struct_type, layout", sorted(_all_structure_layouts(), key=lambda pair: (pair[0].__name__, pair[1].__name__))
+    )
+    def test_fields_match_ctypes(self, struct_type: Type[ArchIndependentStructure], layout: Any) -> None:
+        rng = random.Random(layout.__name__)
+        for _ in range(32):
+            # Given some arbitrary structure data
+            data = bytes(rng.getrandbits(8) for _ in range(sizeof(layout)))
+
+            # If I read it as a structure
+            struct = struct_type(0x1000, data, layout)
+
+            # Then the structure is an instance of the requested type, without a per-instance __dict__
+            assert isinstance(struct, struct_type)
+            assert type(struct).__name__ == struct_type.__name__
+            assert not hasattr(struct, "__dict__")
+            assert struct.sizeof == sizeof(layout)
+            assert struct.binary_offset == 0x1000
+
+            # And each field has the same value ctypes reads
+            ctypes_struct = layout.from_buffer_copy(data)
+            for field_name, *_ in layout._fields_:
+                expected = getattr(ctypes_struct, field_name)
+                if isinstance(expected, (int, bytes)):
+                    assert getattr(struct, field_name) == expected
+                else:
+                    # Nested structures and unions are ctypes objects
+                    assert bytes(getattr(struct, field_name)) == bytes(expected)
+
+    def test_fields_are_writable(self) -> None:
+        # Given a chained fixup bind pointer
+        data = (0x8000000000000000 | (0x12 << 24) | 0x7).to_bytes(8, "little")
+
+        # If I assign a field
+        struct = MachoDyldChainedPtr64Bind(0, data, MachoDyldChainedPtr64BindRaw)
+        struct.ordinal = 0x99
+
+        # Then the assigned value is kept, and the other fields are unaffected
+        assert struct.bind == 1
+        assert struct.addend == 0x12
+        assert struct.ordinal == 0x99
+
+        # And fields can be reassigned after decoding
+        struct.addend = 0
+        assert struct.addend == 0
+
+    def test_short_buffer(self) -> None:
+        # Given data that's too short for the structure
+        # Then the structure can't be read
+        with pytest.raises(ValueError):
+            MachoDyldChainedPtr64Bind(0, b"\x00" * 4, MachoDyldChainedPtr64BindRaw)
+
+    def test_unknown_attribute(self) -> None:
+        # Given a structure
+        struct = MachoDyldChainedPtr64Bind(0, b"\x00" * 8, MachoDyldChainedPtr64BindRaw)
+        # Then accessing an attribute that isn't a field raises AttributeError
+        with pytest.raises(AttributeError):
+            struct.not_a_field
+
+    def test_subclass_slots(self) -> None:
+        # Given a structure type that declares its own slot, alongside its layout
+        class TaggedIvarStruct(ArchIndependentStructure):
+            __slots__ = ("tag",)
+            _64_BIT_STRUCT = ObjcIvar64
+
+        # Then it has a slot for each field of its layout, as well as its own
+        assert set(TaggedIvarStruct.__slots__) == {"tag", *(field[0] for field in ObjcIvar64._fields_)}
+        struct = TaggedIvarStruct(0, bytes(range(sizeof(ObjcIvar64))), ObjcIvar64)
+        struct.tag = "tagged"
+        assert struct.tag == "tagged"
+        assert struct.offset_ptr == ObjcIvar64.from_buffer_copy(bytes(range(sizeof(ObjcIvar64)))).offset_ptr
+        assert not hasattr(struct, "__dict__")
+
+    def test_pickle_round_trip(self) -> None:
+        # Given structures read from a binary
+        binary = MachoParser(TestStructReader.CHAINED_FIXUPS_PATH).get_arm64_slice()
+        assert binary
+        for struct in [binary.header, binary.segments[0].cmd, binary.sections[0].cmd]:
+            # If I pickle and unpickle the structure
+            unpickled = pickle.loads(pickle.dumps(struct))
+
+            # Then the copy has the same type, fields and location
+            assert type(unpickled) is type(struct)
+            assert repr(unpickled) == repr(struct)
+            assert unpickled.sizeof == struct.sizeof
+            assert unpickled.binary_offset == struct.binary_offset
+
+
+class TestStructReader:
+    CHAINED_FIXUPS_PATH = pathlib.Path(__file__).parent / "bin" / "iOS15_chained_fixup_pointers"
+
+    def test_pointer_fields(self) -> None:
+        # Given a layout made up of uint64_t and uint32_t fields
+        reader = StructReader.for_layout(ObjcIvarStruct, ObjcIvar64)
+        # Then only the uint64_t fields may hold rebased pointers
+        assert reader.pointer_fields == (("offset_ptr", 0), ("name", 8), ("type", 16))
+        assert reader.size == 32
+        assert reader.layout is ObjcIvar64
+
+    def test_readers_resolved_once_per_binary(self) -> None:
+        # Given a 64-bit binary
+        binary = MachoParser(self.CHAINED_FIXUPS_PATH).get_arm64_slice()
+        assert binary
+
+        # If I request the reader for a structure type more than once
+        reader = binary.struct_reader(ObjcClassRawStruct)
+        # Then the same reader is returned, using the 64-bit layout
+        assert binary.struct_reader(ObjcClassRawStruct) is reader
+        assert reader.layout is ObjcClassRaw64
+
+    def test_read_struct_with_rebased_pointers(self) -> None:
+        # Given a binary that uses chained fixup pointers
+        binary = MachoParser(self.CHAINED_FIXUPS_PATH).get_arm64_slice()
+        assert binary
+        classlist = binary.section_with_name("__objc_classlist", "__DATA_CONST")
+        assert classlist
+
+        for class_ptr in binary.read_pointer_section("__objc_classlist").values():
+            # If I read a class structure with its rebased pointers applied
+            objc_class = binary.read_struct_with_rebased_pointers(class_ptr, ObjcClassRawStruct, virtual=True)
+            raw_class = binary.read_struct(class_ptr, ObjcClassRawStruct, virtual=True)
+
+            # Then each field holds the rebased pointer where there is one, and the raw value otherwise
+            for field_name, field_offset in binary.struct_reader(ObjcClassRawStruct).pointer_fields:
+                field_address = VirtualMemoryPointer(class_ptr + field_offset)
+                expected = binary.dyld_rebased_pointers.get(field_address, getattr(raw_class, field_name))
+                assert getattr(objc_class, field_name) == expected
+            # And the class's data pointer was rebased
+            assert objc_class.data != raw_class.data
@@ -1,6 +1,12 @@
 import pathlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
-from strongarm.macho import VirtualMemoryPointer
+import pytest
+
+from strongarm.macho import StaticFilePointer, VirtualMemoryPointer
+from strongarm.macho.dyld_info_parser import BindOpcode, ChainedFixupTables, DyldInfoParser, RebaseOpcode
 from strongarm.macho.macho_analyzer import MachoAnalyzer
 from strongarm.macho.macho_parse import MachoParser
 
@@ -8,6 +14,9 @@ from strongarm.macho.macho_parse import MachoParser
 class TestDyldInfoParser:
     BINARY1_PATH = pathlib.Path(__file__).parent / "bin" / "StrongarmTarget"
     BINARY2_PATH = pathlib.Path(__file__).parent / "bin" / "TestBinary4"
+    CHAINED_FIXUPS_PATH = pathlib.Path(__file__).parent / "bin" / "iOS15_chained_fixup_pointers"
+    DYLD_INFO_PATH = pathlib.Path(__file__).parent / "bin" / "TestBinary1"
+    ENCRYPTED_PATH = pathlib.Path(__file__).parent / "bin" / "EncryptedBinary"
 
     def test_identify_imported_symbols_1(self) -> None:
         parser = MachoParser(TestDyldInfoParser.BINARY1_PATH)
@@ -91,3 +100,220 @@ class TestDyldInfoParser:
         )
         # This API should return the classref, not the bound class in the category definition
         assert analyzer.classref_for_class_name("_OBJC_CLASS_$_UIAlertView") == VirtualMemoryPointer(0x10026AE40)
+
+    def test_read_chained_fixup_tables(self) -> None:
+        # Given a binary that uses chained fixup pointers
+        binary = MachoParser(TestDyldInfoParser.CHAINED_FIXUPS_PATH).get_arm64_slice()
+        assert binary
+
+        # If I read its chained fixups as tables
+        fixups = DyldInfoParser.read_chained_fixup_tables(binary)
+
+        # Then each rebase and bind matches the pointer stored in the binary
+        assert len(fixups.rebase_addresses) == len(fixups.rebase_targets) == len(binary.dyld_rebased_pointers) == 458
+        for address, target in zip(fixups.rebase_addresses, fixups.rebase_targets):
+            assert binary.dyld_rebased_pointers[VirtualMemoryPointer(address)] == target
+            # DYLD_CHAINED_PTR_64_OFFSET targets are offsets from the virtual base
+            raw_pointer = binary.read_word(VirtualMemoryPointer(address))
+            assert target == binary.get_virtual_base() + (raw_pointer & 0xFFFFFFFFF)
+
+        assert len(fixups.bind_addresses) == len(fixups.bind_ordinals) == len(binary.dyld_bound_symbols)
+        for address, ordinal in zip(fixups.bind_addresses, fixups.bind_ordinals):
+            assert binary.dyld_bound_symbols[VirtualMemoryPointer(address)].name == fixups.imports[ordinal].name
+        assert binary.dyld_bound_symbols[VirtualMemoryPointer(0x100008000)].name == "_NSLog"
+
+    def test_chain_starts_in_page_with_multiple_starts(self) -> None:
+        # Given a segment of 3 pages, where the second page has no chains and the third has several
+        # The third page start is an index into the overflow entries after the page starts
+        # The last chain start in the page is marked with DYLD_CHAINED_PTR_START_LAST
+        page_starts = array("H", [0x10, 0xFFFF, 0x8000 | 3, 0x0, 0x40, 0x8000 | 0x100])
+
+        # If I find the chains in the segment
+        chain_starts = DyldInfoParser._chain_starts_in_segment(page_starts, 3)
+
+        # Then each chain in each page is found
+        assert chain_starts == [(0, 0x10), (2, 0x0), (2, 0x40), (2, 0x100)]
+
+    def test_walk_fixup_chain(self) -> None:
+        # Given a chain of a rebase, a bind and a rebase, each pointing to the next fixup
+        def rebase(target: int, next_stride: int) -> bytes:
+            return (target | (next_stride << 51)).to_bytes(8, "little")
+
+        def bind(ordinal: int, next_stride: int) -> bytes:
+            return ((1 << 63) | ordinal | (next_stride << 51)).to_bytes(8, "little")
+
+        segment_data = b"\x00" * 8 + rebase(0x4000, 2) + bind(3, 4) + b"\x00" * 8 + rebase(0x8000, 0)
+
+        # If I walk the chain
+        fixups = ChainedFixupTables(imports=[])
+        DyldInfoParser._walk_fixup_chain(fixups, memoryview(segment_data), 8, 0x100008000, 0x100000000)
+
+        # Then the chain's fixups are stored in the tables
+        assert fixups.rebase_addresses == array("Q", [0x100008008, 0x100008020])
+        assert fixups.rebase_targets == array("Q", [0x100004000, 0x100008000])
+        assert fixups.bind_addresses == array("Q", [0x100008010])
+        assert fixups.bind_ordinals == array("I", [3])
+
+    def test_parallel_chained_fixups_match_serial(self, monkeypatch: Any) -> None:
+        # Given the chained fixups of a binary, walked in-process
+        serial_binary = MachoParser(TestDyldInfoParser.CHAINED_FIXUPS_PATH).get_arm64_slice()
+        assert serial_binary
+        serial_fixups = DyldInfoParser.read_chained_fixup_tables(serial_binary)
+
+        # If I parse the same binary, walking each chain in a pool of worker processes
+        monkeypatch.setattr(DyldInfoParser, "CHAINED_FIXUP_WORKERS", 2)
+        monkeypatch.setattr(DyldInfoParser, "CHAINED_FIXUP_MIN_CHUNK_SIZE", 1)
+        parallel_walks = []
+        walk_in_parallel = DyldInfoParser._walk_fixup_chains_in_parallel
+        monkeypatch.setattr(
+            DyldInfoParser,
+            "_walk_fixup_chains_in_parallel",
+            lambda *args: parallel_walks.append(args) or walk_in_parallel(*args),
+        )
+        binary = MachoParser(TestDyldInfoParser.CHAINED_FIXUPS_PATH).get_arm64_slice()
+        assert binary
+        assert binary.dyld_rebased_pointers
+
+        # Then the chains were walked by the workers
+        assert len(parallel_walks) == 1
+        # And the same fixups are found, in the same order
+        parallel_fixups = DyldInfoParser.read_chained_fixup_tables(binary)
+        assert parallel_fixups.rebase_addresses == serial_fixups.rebase_addresses
+        assert parallel_fixups.rebase_targets == serial_fixups.rebase_targets
+        assert parallel_fixups.bind_addresses == serial_fixups.bind_addresses
+        assert parallel_fixups.bind_ordinals == serial_fixups.bind_ordinals
+        assert binary.dyld_rebased_pointers == serial_binary.dyld_rebased_pointers
+
+    def test_fixups_parsed_lazily(self, monkeypatch: Any) -> None:
+        # Given a binary that uses chained fixup pointers
+        parses = []
+        parse_chained_fixups = DyldInfoParser.parse_chained_fixups
+        monkeypatch.setattr(
+            DyldInfoParser, "parse_chained_fixups", lambda binary: parses.append(binary) or parse_chained_fixups(binary)
+        )
+        binary = MachoParser(TestDyldInfoParser.CHAINED_FIXUPS_PATH).get_arm64_slice()
+        assert binary
+
+        # When the binary is parsed, its fixups are not
+        assert binary.linked_dylibs
+        assert parses == []
+
+        # If its binds and rebases are accessed from several threads at once
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: (binary.dyld_bound_symbols, binary.dyld_rebased_pointers), range(32)))
+
+        # Then the fixups are parsed once, and every thread sees the same tables
+        assert parses == [binary]
+        assert all(
+            binds is binary.dyld_bound_symbols and rebases is binary.dyld_rebased_pointers for binds, rebases in results
+        )
+        assert len(binary.dyld_rebased_pointers) == 458
+
+    def test_bind_segment_resolved_when_bound(self, monkeypatch: Any) -> None:
+        # Given a binary whose bind opcodes select an invalid segment, and later a valid one
+        binary = MachoParser(TestDyldInfoParser.DYLD_INFO_PATH).get_arm64_slice()
+        assert binary
+        data_segment = binary.segment_with_name("__DATA")
+        assert data_segment
+        invalid_segment_then_bind = (
+            bytes(
+                [
+                    BindOpcode.BIND_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB | 0xF,
+                    0,
+                    BindOpcode.BIND_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB | binary.segments.index(data_segment),
+                    8,
+                    BindOpcode.BIND_OPCODE_SET_SYMBOL_TRAILING_FLAGS_IMM,
+                ]
+            )
+            + b"_foo\x00"
+            + bytes([BindOpcode.BIND_OPCODE_DO_BIND, BindOpcode.BIND_OPCODE_DONE])
+        )
+        monkeypatch.setattr(binary, "get_bytes", lambda offset, size, **kwargs: invalid_segment_then_bind)
+
+        # Then the invalid segment is ignored, as nothing is bound within it
+        binds = DyldInfoParser._parse_dyld_bytestream(binary, binary.dyld_info.bind_off, binary.dyld_info.bind_size)
+        assert list(binds) == [VirtualMemoryPointer(data_segment.vmaddr + 8)]
+        assert binds[VirtualMemoryPointer(data_segment.vmaddr + 8)].name == "_foo"
+
+        # And binding within an invalid segment is an error
+        bind_in_invalid_segment = invalid_segment_then_bind[:2] + invalid_segment_then_bind[4:]
+        monkeypatch.setattr(binary, "get_bytes", lambda offset, size, **kwargs: bind_in_invalid_segment)
+        with pytest.raises(ValueError):
+            DyldInfoParser._parse_dyld_bytestream(binary, binary.dyld_info.bind_off, binary.dyld_info.bind_size)
+
+    def test_read_rebase_table(self) -> None:
+        # Given a binary that describes its rebases with LC_DYLD_INFO opcodes
+        binary = MachoParser(TestDyldInfoParser.DYLD_INFO_PATH).get_arm64_slice()
+        assert binary
+        assert not binary._dyld_chained_fixups
+
+        # If I read its rebase table
+        addresses, targets = DyldInfoParser.read_rebase_table(binary)
+
+        # Then each rebase target is the pointer stored at the rebased address
+        assert len(addresses) == len(targets) == 19296
+        for address, target in zip(addresses, targets):
+            assert binary.read_word(VirtualMemoryPointer(address)) == target
+        # And the rebases are available from the binary
+        assert binary.dyld_rebased_pointers == dict(
+            zip(map(VirtualMemoryPointer, addresses), map(VirtualMemoryPointer, targets))
+        )
+        # And every entry of a pointer-list section is rebased
+        selref_addresses, _ = binary.read_pointer_section_arrays("__objc_selrefs")
+        assert selref_addresses
+        assert set(selref_addresses) <= set(addresses)
+
+    def test_read_rebase_table_tolerates_malformed_opcodes(self, monkeypatch: Any) -> None:
+        # Given a binary whose rebase opcodes include an unknown opcode, an invalid segment and a run past its segment
+        binary = MachoParser(TestDyldInfoParser.DYLD_INFO_PATH).get_arm64_slice()
+        assert binary
+        data_segment = binary.segment_with_name("__DATA")
+        assert data_segment
+        data_segment_index = binary.segments.index(data_segment)
+        # ULEB128 encoding of the offset of the last pointer in __DATA
+        assert data_segment.size - 8 == 0x3FFF8
+        last_pointer_offset = b"\xf8\xff\x0f"
+        rebase_stream = (
+            bytes([RebaseOpcode.REBASE_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB | data_segment_index, 0])
+            + bytes([RebaseOpcode.REBASE_OPCODE_DO_REBASE_IMM_TIMES | 1])
+            + b"\x90"
+            + bytes([RebaseOpcode.REBASE_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB | 0xF, 0])
+            + bytes([RebaseOpcode.REBASE_OPCODE_DO_REBASE_IMM_TIMES | 2])
+            + bytes([RebaseOpcode.REBASE_OPCODE_SET_SEGMENT_AND_OFFSET_ULEB | data_segment_index])
+            + last_pointer_offset
+            + bytes([RebaseOpcode.REBASE_OPCODE_DO_REBASE_IMM_TIMES | 3, RebaseOpcode.REBASE_OPCODE_DONE])
+        )
+        get_bytes = binary.get_bytes
+        monkeypatch.setattr(
+            binary,
+            "get_bytes",
+            lambda offset, size, **kwargs: rebase_stream
+            if offset == binary.dyld_info.rebase_off
+            else get_bytes(offset, size, **kwargs),
+        )
+
+        # If I read its rebases
+        rebases = binary.dyld_rebased_pointers
+
+        # Then the malformed opcodes are skipped, and the valid rebases are still read from the segment's data
+        def pointer_in_file(segment_offset: int) -> int:
+            return int.from_bytes(
+                binary.get_bytes(StaticFilePointer(data_segment.offset + segment_offset), 8), "little"
+            )
+
+        assert rebases == {
+            VirtualMemoryPointer(data_segment.vmaddr): pointer_in_file(0),
+            VirtualMemoryPointer(data_segment.vmaddr + data_segment.size - 8): pointer_in_file(data_segment.size - 8),
+        }
+
+    def test_read_rebase_table_skips_encrypted_rebases(self) -> None:
+        # Given an encrypted binary, which has rebases within its encrypted __TEXT
+        for binary in MachoParser(TestDyldInfoParser.ENCRYPTED_PATH).slices:
+            # If I read its rebase table
+            addresses, targets = DyldInfoParser.read_rebase_table(binary)
+
+            # Then only the pointers that can be read are included
+            assert addresses
+            for address, target in zip(addresses, targets):
+                assert not binary.is_range_encrypted(binary.file_offset_for_virtual_address(address), 8)
+                assert binary.read_word(VirtualMemoryPointer(address)) == target
@@ -1,11 +1,15 @@
-"""These tests cannot run in CI as they require a dyld_shared_cache image, which is > 1GB
+"""Most of these tests cannot run in CI as they require a dyld_shared_cache image, which is > 1GB
 """
 import os
+from ctypes import sizeof
 from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Iterator
 
 import pytest
 
-from strongarm.macho import DyldSharedCacheParser, MachoAnalyzer, VirtualMemoryPointer
+from strongarm.macho import DyldSharedCacheParser, MachoAnalyzer, StaticFilePointer, VirtualMemoryPointer
+from strongarm.macho.macho_definitions import DyldSharedCacheHeader, DyldSharedCacheImageInfo, DyldSharedFileMapping
 
 # XXX(PT): This test suite expects to run on a mounted IPSW of iOS 12.1.1 iPad 6 WiFi
 _FIRMWARE_ROOT = Path("/") / "Volumes" / "PeaceC16C50.J71bJ72bJ71sJ72sJ71tJ72tOS"
@@ -15,8 +19,9 @@ _DSC_PATH = _FIRMWARE_ROOT / "System" / "Library" / "Caches" / "com.apple.dyld"
 @pytest.mark.skipif("CI" in os.environ or not _DSC_PATH.exists(), reason="Cannot run dyld_shared_cache tests in CI")
 class TestDyldSharedCache:
     @pytest.fixture
-    def dyld_shared_cache(self) -> DyldSharedCacheParser:
-        return DyldSharedCacheParser(_DSC_PATH)
+    def dyld_shared_cache(self) -> Iterator[DyldSharedCacheParser]:
+        with DyldSharedCacheParser(_DSC_PATH) as dyld_shared_cache:
+            yield dyld_shared_cache
 
     def test_parses_dsc_maps(self, dyld_shared_cache: DyldSharedCacheParser) -> None:
         # Ensure the structures at the start of the DSC were parsed exactly as expected
@@ -77,3 +82,63 @@ class TestDyldSharedCache:
             "_mach_init_routine": 0x1B7C574B0,
         }
         assert analyzer.exported_symbol_names_to_pointers == expected_exports
+
+
+class TestDyldSharedCacheMapping:
+    @staticmethod
+    def _write_minimal_cache(path: Path) -> None:
+        """Write a cache file containing just a header, the 3 expected mappings, and one image."""
+        header = DyldSharedCacheHeader()
+        header.magic = b"dyld_v1   arm64"
+        header.mappingOffset = sizeof(DyldSharedCacheHeader)
+        header.mappingCount = 3
+        header.imagesOffset = header.mappingOffset + (3 * sizeof(DyldSharedFileMapping))
+        header.imagesCount = 1
+
+        mappings = []
+        for idx, prot in enumerate([0x5, 0x3, 0x1]):
+            mapping = DyldSharedFileMapping()
+            mapping.address = 0x180000000 + (idx * 0x1000)
+            mapping.size = 0x1000
+            mapping.file_offset = idx * 0x1000
+            mapping.max_prot = mapping.init_prot = prot
+            mappings.append(mapping)
+
+        image_path = b"/usr/lib/libFake.dylib\0"
+        image = DyldSharedCacheImageInfo()
+        image.address = 0x180000000
+        image.pathFileOffset = header.imagesOffset + sizeof(DyldSharedCacheImageInfo)
+
+        data = bytearray(b"".join(bytes(s) for s in [header, *mappings, image]) + image_path)
+        data += bytearray(0x3000 - len(data))
+        path.write_bytes(data)
+
+    def test_reads_are_served_from_mapping(self) -> None:
+        with TemporaryDirectory() as tempdir:
+            cache_path = Path(tempdir) / "dyld_shared_cache_arm64"
+            self._write_minimal_cache(cache_path)
+
+            # Given I parse a dyld_shared_cache
+            with DyldSharedCacheParser(cache_path) as dyld_shared_cache:
+                # Then its structures are parsed from the mapping
+                assert dyld_shared_cache.file_magic == 0x646C7964
+                assert len(dyld_shared_cache.segment_mappings) == 3
+                assert dyld_shared_cache.embedded_binary_info == {
+                    Path("/usr/lib/libFake.dylib"): (
+                        VirtualMemoryPointer(0x180000000),
+                        VirtualMemoryPointer(0x180001000),
+                    )
+                }
+                # And reads are read-only views into the mapping
+                data = dyld_shared_cache.get_bytes(StaticFilePointer(0), 15)
+                assert isinstance(data, memoryview)
+                assert data.readonly
+                assert data == b"dyld_v1   arm64"
+
+            # And once the parser is closed, it can no longer be read from
+            with pytest.raises(ValueError):
+                dyld_shared_cache.get_bytes(StaticFilePointer(0), 4)
+            # And views handed out before closing stay valid
+            assert data == b"dyld_v1   arm64"
+            # And closing again is harmless
+            dyld_shared_cache.close()
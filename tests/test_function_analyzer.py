@@ -1,3 +1,4 @@
+import gc
 import pathlib
 from unittest import mock
 
@@ -75,6 +76,30 @@ class TestFunctionAnalyzer:
         assert contents.type == RegisterContentsType.IMMEDIATE
         assert contents.value == 0x1000090C0
 
+    def test_register_contents_are_memoized(self) -> None:
+        from strongarm.objc import objc_analyzer
+
+        instructions = [ObjcInstruction(self.function_analyzer.get_instruction_at_index(i)) for i in range(3)]
+        with mock.patch.object(self.function_analyzer, "MAX_CACHED_REGISTER_CONTENTS", 2), mock.patch.object(
+            objc_analyzer,
+            "get_register_contents_at_instruction_fast",
+            wraps=objc_analyzer.get_register_contents_at_instruction_fast,
+        ) as dataflow:
+            # Given I've queried a register's contents at an instruction
+            contents = self.function_analyzer.get_register_contents_at_instruction("x1", instructions[0])
+            # If I query the same register at the same instruction again
+            # Then the memoized contents are returned, without running dataflow analysis again
+            assert self.function_analyzer.get_register_contents_at_instruction("x1", instructions[0]) is contents
+            assert dataflow.call_count == 1
+
+            # And only the most recent MAX_CACHED_REGISTER_CONTENTS results are kept
+            for instruction in instructions:
+                self.function_analyzer.get_register_contents_at_instruction("x1", instruction)
+            assert len(self.function_analyzer._register_contents_cache) == 2
+            assert dataflow.call_count == 3
+            self.function_analyzer.get_register_contents_at_instruction("x1", instructions[0])
+            assert dataflow.call_count == 4
+
     def test_get_register_contents_at_instruction_same_reg(self) -> None:
         """Test cases for dataflow where a single register has an immediate, then has a 'data link' from the same reg.
         SCAN-577
@@ -277,3 +302,28 @@ class TestFunctionAnalyzer:
         ):
             # Then the code location is reported as the original symbol name
             assert self.function_analyzer.get_symbol_name() == "__ZappBrannigan"
+
+    def test_function_analysis_does_not_pin_mapping(self) -> None:
+        # Given a binary backed by a memory-mapped file
+        parser = MachoParser(TestFunctionAnalyzer.FAT_PATH)
+        mapping = parser._mapping
+        assert mapping
+        binary = parser.slices[0]
+
+        # If I compute a function's basic blocks and dataflow, which pass its bytecode to the dataflow extension
+        analyzer = MachoAnalyzer.get_analyzer(binary)
+        function_analyzer = ObjcFunctionAnalyzer.get_function_analyzer(
+            binary, VirtualMemoryPointer(TestFunctionAnalyzer.URL_SESSION_DELEGATE_IMP_ADDR)
+        )
+        assert function_analyzer.basic_blocks
+        function_analyzer.get_register_contents_at_instruction("x0", function_analyzer.instructions[-1])
+
+        # And I close the parser and drop every reference to the binary and its analysis
+        parser.close()
+        MachoAnalyzer.clear_cache()
+        del parser, binary, analyzer, function_analyzer
+        gc.collect()
+
+        # Then no views into the mapping are left behind, so it can be unmapped
+        mapping.close()
+        assert mapping.closed
@@ -0,0 +1,37 @@
+from strongarm.macho.leb128 import read_sleb, read_uleb, read_uleb_deltas
+
+
+class TestLeb128:
+    def test_read_uleb(self) -> None:
+        # Given ULEB128 values of several lengths, followed by another byte
+        # Then each value and the offset of the following byte are returned
+        assert read_uleb(b"\x00\xff", 0) == (0, 1)
+        assert read_uleb(b"\x7f\xff", 0) == (127, 1)
+        assert read_uleb(b"\x80\x01\xff", 0) == (128, 2)
+        assert read_uleb(b"\xff\xe5\x80\x01\xff", 1) == (0x4000 | 0x65, 4)
+        # And values wider than 64 bits aren't truncated, or treated as signed
+        assert read_uleb(b"\xff" * 9 + b"\x01", 0) == ((1 << 64) - 1, 10)
+
+    def test_read_sleb(self) -> None:
+        # Given SLEB128 values of both signs
+        # Then the sign bit of the final byte selects negative values
+        assert read_sleb(b"\x00", 0) == (0, 1)
+        assert read_sleb(b"\x3f", 0) == (63, 1)
+        assert read_sleb(b"\x40", 0) == (-64, 1)
+        assert read_sleb(b"\x7f", 0) == (-1, 1)
+        assert read_sleb(b"\xc0\x00", 0) == (64, 2)
+        assert read_sleb(b"\x80\x7f", 0) == (-128, 2)
+        assert read_sleb(b"\xff\xe5\x80\x7f", 1) == (-(0x4000 - 0x65), 4)
+
+    def test_read_uleb_deltas(self) -> None:
+        # Given a run of ULEB128 deltas, ended by a zero delta and padding
+        data = b"\x80\x01\x04\x90\x80\x01\x00\x00\x00"
+
+        # If I decode the run
+        totals = read_uleb_deltas(data, 0x1000)
+
+        # Then each delta is added to the running total, stopping at the terminator
+        assert list(totals) == [0x1080, 0x1084, 0x1084 + 0x4010]
+        # And an empty run has no totals
+        assert list(read_uleb_deltas(b"", 0x1000)) == []
+        assert list(read_uleb_deltas(b"\x00\x04", 0x1000)) == []
@@ -1,5 +1,8 @@
 import pathlib
+from array import array
+from ctypes import c_uint32
 from tempfile import TemporaryDirectory
+from typing import Any, List
 
 import pytest
 
@@ -10,6 +13,7 @@ from strongarm.macho import (
     MachoBinary,
     MachoParser,
     MachoSegmentCommand64,
+    MachoSymbolTable,
     NoEmptySpaceForLoadCommandError,
     StaticFilePointer,
     VirtualMemoryPointer,
@@ -102,6 +106,37 @@ class TestMachoBinary:
         assert text_const.address == 0x1A0D0
         assert data_const.address == 0x1C458
 
+    def test_section_for_address(self) -> None:
+        # Given a binary with these sections
+        text = self.binary.section_with_name("__text", "__TEXT")
+        cstring = self.binary.section_with_name("__cstring", "__TEXT")
+        assert text and cstring
+        highest_section = max(self.binary.sections, key=lambda s: s.address)
+        # Then addresses within each section resolve to it
+        for section in self.binary.sections:
+            if section.size:
+                assert self.binary.section_for_address(VirtualMemoryPointer(section.address)) == section
+                assert self.binary.section_for_address(VirtualMemoryPointer(section.end_address - 1)) == section
+        assert self.binary.section_name_for_address(VirtualMemoryPointer(cstring.address + 4)) == "__cstring"
+        # And addresses past the last section resolve to the highest-addressed section
+        assert self.binary.section_for_address(VirtualMemoryPointer(highest_section.end_address + 0x1000)) == (
+            highest_section
+        )
+        # And addresses before the virtual base don't resolve to any section
+        assert self.binary.section_for_address(VirtualMemoryPointer(0x1000)) is None
+
+    def test_segment_for_address(self) -> None:
+        text_segment = self.binary.segment_with_name("__TEXT")
+        data_segment = self.binary.segment_with_name("__DATA")
+        assert text_segment and data_segment
+        assert self.binary.segment_for_address(VirtualMemoryPointer(text_segment.vmaddr)) == text_segment
+        assert self.binary.segment_for_address(VirtualMemoryPointer(data_segment.vm_end_address - 1)) == data_segment
+        assert self.binary.segment_for_address(VirtualMemoryPointer(0x1000)) == self.binary.segment_with_name(
+            "__PAGEZERO"
+        )
+        last_segment = max(self.binary.segments, key=lambda s: s.vm_end_address)
+        assert self.binary.segment_for_address(VirtualMemoryPointer(last_segment.vm_end_address)) is None
+
     def test_header_flags(self) -> None:
         # this binary is known to have masks 1, 4, 128, 2097152
         assert HEADER_FLAGS.NOUNDEFS in self.binary.header_flags
@@ -118,6 +153,33 @@ class TestMachoBinary:
         symtabs = self.binary.symtab_contents
         assert len(symtabs) == 32
 
+    def test_symbol_table_columns(self) -> None:
+        # Given the binary's columnar symbol table
+        symbol_table = self.binary.symbol_table
+        # Then it contains every symbol
+        assert len(symbol_table) == 32
+        # And each column matches the corresponding field of the nlist structs
+        for idx, nlist in enumerate(self.binary.symtab_contents):
+            assert symbol_table.n_strx[idx] == nlist.n_un.n_strx
+            assert symbol_table.n_type[idx] == nlist.n_type
+            assert symbol_table.n_sect[idx] == nlist.n_sect
+            assert symbol_table.n_desc[idx] == nlist.n_desc
+            assert symbol_table.n_value[idx] == nlist.n_value
+
+    def test_symbol_table_columns_32bit(self) -> None:
+        # Given a 32-bit nlist with a negative n_desc, followed by a partial entry
+        nlist = MachoSymbolTable._NLIST_32.pack(0x10, 0x0F, 1, -2, 0x4000)
+        symbol_table = MachoSymbolTable(nlist + b"\x00" * 4, is_64bit=False)
+        # Then the entry is parsed, and the partial entry is ignored
+        assert len(symbol_table) == 1
+        assert (
+            symbol_table.n_strx[0],
+            symbol_table.n_type[0],
+            symbol_table.n_sect[0],
+            symbol_table.n_desc[0],
+            symbol_table.n_value[0],
+        ) == (0x10, 0x0F, 1, -2, 0x4000)
+
     def test_read_encrypted_info(self) -> None:
         encrypted_binary = MachoParser(TestMachoBinary.ENCRYPTED_PATH).get_armv7_slice()
         assert encrypted_binary
@@ -127,6 +189,37 @@ class TestMachoBinary:
         # read from unencrypted section should not raise
         encrypted_binary.get_bytes(StaticFilePointer(0x3000), 0x500)
 
+    def test_read_bytes_from_memory_mapped_file(self) -> None:
+        # Given a binary backed by a memory-mapped file
+        # If I read some bytes from it
+        header_bytes = self.binary.get_bytes(StaticFilePointer(0), 32)
+        # Then I get a read-only view into the mapping, rather than a copy
+        assert isinstance(header_bytes, memoryview)
+        assert header_bytes.readonly
+        # And the data matches that of a binary which was read fully into memory
+        in_memory_binary = MachoParser(self.THIN_PATH, use_mmap=False).get_arm64_slice()
+        assert in_memory_binary
+        assert header_bytes == in_memory_binary.get_bytes(StaticFilePointer(0), 32)
+        # And virtual reads are also served without copying
+        virt = VirtualMemoryPointer(0x100006DB8)
+        assert self.binary.get_content_from_virtual_address(virt, 12).readonly
+        assert self.binary.read_word(virt, word_type=c_uint32) == in_memory_binary.read_word(virt, word_type=c_uint32)
+
+    def test_close_parser(self) -> None:
+        # Given I parse a binary backed by a memory-mapped file
+        with MachoParser(self.THIN_PATH) as parser:
+            binary = parser.get_arm64_slice()
+            assert binary
+            header_bytes = binary.get_bytes(StaticFilePointer(0), 4)
+
+        # Then once the parser is closed, it can no longer be read from
+        with pytest.raises(ValueError):
+            parser.get_bytes(StaticFilePointer(0), 4)
+        # And views handed out before closing stay valid
+        assert header_bytes == b"\xcf\xfa\xed\xfe"
+        # And closing again is harmless
+        parser.close()
+
     def test_read_string_table(self) -> None:
         # Given the binary's string table contains exactly these bytes:
         correct_strings = (
@@ -176,6 +269,23 @@ class TestMachoBinary:
         # Then I get the correct data
         assert sorted(locations_entries.items()) == sorted(correct_locations_entries.items())
 
+    def test_read_pointer_section_arrays(self) -> None:
+        # Given a binary whose pointer sections contain chained fixup pointers
+        binary = MachoParser(pathlib.Path(__file__).parent / "bin" / "iOS15_chained_fixup_pointers").get_arm64_slice()
+        assert binary
+
+        # If I read the __objc_selrefs pointer section as a pair of arrays
+        addresses, pointers = binary.read_pointer_section_arrays("__objc_selrefs")
+
+        # Then each address is paired with its rebased pointer
+        assert len(addresses) == len(pointers) == 15
+        assert list(pointers) == [binary.dyld_rebased_pointers[address] for address in addresses]
+        # And the arrays hold the same data as the mapping
+        assert dict(zip(addresses, pointers)) == binary.read_pointer_section("__objc_selrefs")
+
+        # And a missing section is empty
+        assert binary.read_pointer_section_arrays("__objc_fake") == (array("Q"), array("Q"))
+
     def test_function_starts_command(self) -> None:
         # Given a binary that contains functions
         binary_with_functions = MachoParser(TestMachoBinary.CLASSLIST_DATA_CONST).get_arm64_slice()
@@ -191,6 +301,23 @@ class TestMachoBinary:
         assert function_starts.sizeof == 0x10
         assert function_starts.binary_offset == 0xB38
 
+    def test_get_function_starts(self) -> None:
+        # Given a binary that contains functions
+        binary_with_functions = MachoParser(TestMachoBinary.CLASSLIST_DATA_CONST).get_arm64_slice()
+        assert binary_with_functions
+
+        # If I read the function starts
+        function_starts = binary_with_functions.get_function_starts()
+
+        # Then every entry point is decoded in ascending order, and the terminator and padding are ignored
+        assert len(function_starts) == 15
+        assert function_starts[0] == 0x100005CDC
+        assert function_starts[1] == 0x100005FD8
+        assert function_starts[-1] == 0x1000064D8
+        assert list(function_starts) == sorted(function_starts)
+        # And they're the same entry points as get_functions() provides
+        assert binary_with_functions.get_functions() == set(function_starts)
+
     def test_write_bytes_thin_physical(self) -> None:
         # Given a thin binary with file_type == 0x2
         binary = MachoParser(pathlib.Path(TestMachoBinary.CLASSLIST_DATA_CONST)).get_arm64_slice()
@@ -376,6 +503,41 @@ class TestMachoBinary:
         assert binary
         assert binary.dylib_id() == expected_dylib_id
 
+    def test_get_full_string_from_start_address(self) -> None:
+        # Given the address of a selector literal
+        address = VirtualMemoryPointer(0x100006DB8)
+        # When I read the string at the address
+        string = self.binary.get_full_string_from_start_address(address)
+        # Then the string is read up to its NULL terminator
+        assert string == "application:openURL:sourceApplication:annotation:"
+        # And the same string can be read from its file offset
+        file_offset = self.binary.file_offset_for_virtual_address(address)
+        assert self.binary.get_full_string_from_start_address(file_offset, virtual=False) == string
+
+        # And reading from the end of the binary doesn't find a string
+        assert self.binary.get_full_string_from_start_address(self.binary.slice_filesize, virtual=False) is None
+
+    def test_strings_are_memoized(self, monkeypatch: Any) -> None:
+        # Given a binary that memoizes up to 2 strings
+        monkeypatch.setattr(self.binary, "MAX_CACHED_STRINGS", 2)
+        reads: List[int] = []
+        read_c_string = self.binary._read_c_string
+        monkeypatch.setattr(self.binary, "_read_c_string", lambda offset: reads.append(offset) or read_c_string(offset))
+        address = VirtualMemoryPointer(0x100006DB8)
+
+        # When I read the same string twice
+        string = self.binary.get_full_string_from_start_address(address)
+        assert self.binary.get_full_string_from_start_address(address) == string
+        # Then the binary is only searched once
+        assert len(reads) == 1
+
+        # And once more strings than the limit are read, the least recently used string is evicted
+        self.binary.get_full_string_from_start_address(address + 1)
+        self.binary.get_full_string_from_start_address(address + 2)
+        assert len(self.binary._cached_strings) == 2
+        self.binary.get_full_string_from_start_address(address)
+        assert len(reads) == 4
+
     def test_read_string_xcode_14(self) -> None:
         # Given a binary with a CFString, compiled with Xcode 14
         with binary_containing_code(
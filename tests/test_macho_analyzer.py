@@ -1,12 +1,21 @@
+import gc
 import pathlib
+import sqlite3
 from contextlib import contextmanager
 from textwrap import dedent
-from typing import Generator, List, Tuple
+from typing import Any, Generator, List, Tuple
 
 import pytest
 
-from strongarm.macho import MachoBinary, ObjcCategory
-from strongarm.macho.macho_analyzer import CallerXRef, MachoAnalyzer, ObjcMsgSendXref, VirtualMemoryPointer
+from strongarm.macho import MachoAnalysisCache, MachoAnalyzerCache, MachoBinary, ObjcCategory
+from strongarm.macho.macho_analyzer import (
+    ANALYZER_STAGE_DEPENDENCIES,
+    CallerXRef,
+    MachoAnalyzer,
+    ObjcMsgSendPredicate,
+    ObjcMsgSendXref,
+    VirtualMemoryPointer,
+)
 from strongarm.macho.macho_parse import MachoParser
 from strongarm.objc import ObjcFunctionAnalyzer
 from tests.utils import binary_containing_code, binary_with_name
@@ -286,6 +295,108 @@ class TestMachoAnalyzer:
         assert caller_func.method_info.objc_class.name == "DTLabel"
         assert caller_func.method_info.objc_sel.name == "logLabel"
 
+    def test_method_info_for_signature(self) -> None:
+        # When I look up a method by its class and selector
+        method_info = self.analyzer.method_info_for_signature("DTLabel", "logLabel")
+        # Then I get the method implemented at its IMP
+        assert method_info
+        assert method_info.imp_addr == VirtualMemoryPointer(0x100006308)
+        entry_point_method_info = self.analyzer.method_info_for_entry_point(VirtualMemoryPointer(0x100006308))
+        assert entry_point_method_info
+        assert entry_point_method_info.objc_sel is method_info.objc_sel
+
+        # And methods that aren't implemented aren't found
+        assert self.analyzer.method_info_for_signature("DTLabel", "viewDidLoad") is None
+        assert self.analyzer.method_info_for_signature("FakeClass", "logLabel") is None
+
+    def test_classref_index(self) -> None:
+        # Given a binary with classrefs to imported and local classes
+        classref_index = self.analyzer.classref_index
+
+        # Then each classref maps to the name of its class, and back
+        expected_classrefs_to_class_names = {
+            VirtualMemoryPointer(0x1000090F0): "_OBJC_CLASS_$_UIFont",
+            VirtualMemoryPointer(0x1000090F8): "_OBJC_CLASS_$_NSURLCredential",
+            VirtualMemoryPointer(0x100009100): "AppDelegate",
+        }
+        assert classref_index.classrefs_to_class_names == expected_classrefs_to_class_names
+        for classref, class_name in expected_classrefs_to_class_names.items():
+            assert self.analyzer.classref_for_class_name(class_name) == classref
+            assert self.analyzer.class_name_for_class_pointer(classref) == class_name
+
+        # And local classes map to their __objc_data structs, whether or not they have a classref
+        assert classref_index.class_names_to_objc_data["AppDelegate"] == VirtualMemoryPointer(0x100009238)
+        assert classref_index.objc_data_to_class_names[VirtualMemoryPointer(0x100009120)] == "DTLabel"
+        assert self.analyzer.classref_for_class_name("DTLabel") is None
+        assert self.analyzer.classref_for_class_name("FakeClass") is None
+
+    def test_objc_calls_matching(self) -> None:
+        # Given a binary that messages classes and selectors
+        font_call = ObjcMsgSendXref(
+            destination_addr=VirtualMemoryPointer(0x1000067A8),
+            caller_addr=VirtualMemoryPointer(0x1000062C0),
+            caller_func_start_address=VirtualMemoryPointer(0x100006284),
+            class_name="_OBJC_CLASS_$_UIFont",
+            selector="systemFontOfSize:",
+        )
+        font_class = ObjcMsgSendPredicate(class_name="_OBJC_CLASS_$_UIFont")
+        font_method = ObjcMsgSendPredicate(class_name="_OBJC_CLASS_$_UIFont", selector="systemFontOfSize:")
+        font_method_on_other_class = ObjcMsgSendPredicate(class_name="AppDelegate", selector="systemFontOfSize:")
+        alloc = ObjcMsgSendPredicate(selector="alloc")
+        quoted = ObjcMsgSendPredicate(class_name='"_OBJC_CLASS_$_UIFont"', selector="selector")
+
+        # When I query many predicates at once
+        predicates_to_calls = self.analyzer.objc_calls_matching(
+            [font_class, font_method, font_method_on_other_class, alloc, quoted, font_class]
+        )
+
+        # Then the call-sites are grouped by each predicate they match
+        assert predicates_to_calls == {
+            font_class: [font_call],
+            font_method: [font_call],
+            font_method_on_other_class: [],
+            alloc: self.analyzer.objc_calls_to([], ["alloc"], False),
+            quoted: [],
+        }
+        assert len(predicates_to_calls[alloc]) == 3
+
+        # And names are matched literally, rather than as SQL
+        assert self.analyzer.objc_calls_to(['"_OBJC_CLASS_$_UIFont"'], ["selector"], False) == []
+        assert self.analyzer.objc_calls_to(["_OBJC_CLASS_$_UIFont"], ["systemFontOfSize:"], True) == [font_call]
+
+        # And objc_calls_to() accepts more names than SQLite allows parameters in a query (250,000 in recent builds)
+        many_class_names = [f"_OBJC_CLASS_$_Fake{i}" for i in range(300_000)] + ["_OBJC_CLASS_$_UIFont"]
+        assert self.analyzer.objc_calls_to(many_class_names, ["systemFontOfSize:"], True) == [font_call]
+
+        # And a predicate must provide a class or a selector
+        with pytest.raises(ValueError):
+            self.analyzer.objc_calls_matching([ObjcMsgSendPredicate()])
+
+    def test_xref_queries_use_indexes(self) -> None:
+        # Given the analyzer has computed XRefs
+        self.analyzer.calls_to(VirtualMemoryPointer(0x100006748))
+        # When I look at how the lookup queries are planned
+        queries = [
+            "SELECT * from function_calls WHERE destination_address=1",
+            "SELECT * from objc_msgSends WHERE class_name='NSObject' AND selector='new'",
+            "SELECT * from objc_msgSends WHERE selector='new'",
+            "SELECT * from string_xrefs WHERE string_literal='test'",
+            "SELECT * from string_xrefs WHERE accessor_func_start_address=1",
+            "SELECT * from basic_blocks WHERE entry_point=1",
+            "SELECT * from named_callable_symbols WHERE address=1",
+            "SELECT * from named_callable_symbols WHERE symbol_name='_objc_msgSend'",
+        ]
+        for query in queries:
+            plan = " ".join(row[-1] for row in self.analyzer._db_handle.execute(f"EXPLAIN QUERY PLAN {query}"))
+            # Then each query is served by an index rather than a table scan
+            assert "USING" in plan and "INDEX" in plan, f"{query} is not indexed: {plan}"
+
+    def test_applies_sql_pragmas(self) -> None:
+        # The analyzer's database is configured with the class-level PRAGMAs
+        assert self.analyzer._db_handle.execute("PRAGMA journal_mode").fetchone()[0] == "memory"
+        assert self.analyzer._db_handle.execute("PRAGMA synchronous").fetchone()[0] == 0
+        assert self.analyzer._db_handle.execute("PRAGMA cache_size").fetchone()[0] == -65536
+
     def test_find_symbols_by_address(self) -> None:
         # Given I provide a locally-defined callable symbol (__mh_execute_header)
         # If I ask for the information about this symbol
@@ -313,6 +424,26 @@ class TestMachoAnalyzer:
         # Then no named symbol is returned
         assert symbol is None
 
+    def test_symbols_by_address_are_memoized(self, monkeypatch: Any) -> None:
+        monkeypatch.setattr(self.analyzer, "MAX_CACHED_CALLABLE_SYMBOLS", 2)
+        self.analyzer._callable_symbols_by_address.clear()
+        addresses = [
+            VirtualMemoryPointer(0x100000000),
+            VirtualMemoryPointer(0x1000067A8),
+            VirtualMemoryPointer(0x100006270),
+        ]
+
+        # Given I've looked up the symbol at an address
+        symbol = self.analyzer.callable_symbol_for_address(addresses[0])
+        # If I look up the same address again
+        # Then the memoized symbol is returned
+        assert self.analyzer.callable_symbol_for_address(addresses[0]) is symbol
+
+        # And only the most recent MAX_CACHED_CALLABLE_SYMBOLS lookups are kept
+        for address in addresses:
+            self.analyzer.callable_symbol_for_address(address)
+        assert list(self.analyzer._callable_symbols_by_address.keys()) == addresses[1:]
+
     def test_find_symbols_by_name(self) -> None:
         # Given I provide a locally-defined callable symbol (__mh_execute_header)
         # If I ask for the information about this symbol
@@ -1296,3 +1427,269 @@ class TestMachoAnalyzerDynStaticChecks:
                 selector="initForWritingWithMutableData:",
             )
         ]
+
+
+class TestMachoAnalysisCache:
+    FAT_PATH = pathlib.Path(__file__).parent / "bin" / "StrongarmTarget"
+
+    @pytest.fixture
+    def analysis_cache(self, tmp_path: pathlib.Path, monkeypatch: Any) -> Generator[MachoAnalysisCache, None, None]:
+        analysis_cache = MachoAnalysisCache(tmp_path / "analysis_cache")
+        monkeypatch.setattr(MachoAnalyzer, "ANALYSIS_CACHE", analysis_cache)
+        yield analysis_cache
+        MachoAnalyzer.clear_cache()
+
+    def _parse_binary(self) -> MachoBinary:
+        # Parse the binary from scratch each time, so nothing is shared between analyzers but the on-disk cache
+        return MachoParser(self.FAT_PATH).slices[0]
+
+    def test_reuses_cached_analysis(self, analysis_cache: MachoAnalysisCache, monkeypatch: Any) -> None:
+        # Given I analyze a binary with the analysis cache enabled
+        first_analyzer = MachoAnalyzer(self._parse_binary())
+        first_analyzer_calls = first_analyzer.calls_to(VirtualMemoryPointer(0x1000067A8))
+        assert len(list(analysis_cache.directory.glob("*.db"))) == 1
+
+        # If I analyze another copy of the same binary
+        def fail(*args: Any) -> None:
+            raise AssertionError("Expected the analysis to be restored from the cache")
+
+        monkeypatch.setattr(MachoAnalyzer, "_build_function_boundaries_index", fail)
+        monkeypatch.setattr(MachoAnalyzer, "_build_xref_database", fail)
+        second_analyzer = MachoAnalyzer(self._parse_binary())
+
+        # Then the function boundaries and XRefs are read from the cache instead of being recomputed
+        assert second_analyzer.get_function_boundaries() == first_analyzer.get_function_boundaries()
+        assert second_analyzer.calls_to(VirtualMemoryPointer(0x1000067A8)) == first_analyzer_calls
+
+    def test_stores_database_once(self, analysis_cache: MachoAnalysisCache, monkeypatch: Any) -> None:
+        stored_keys: List[str] = []
+        store = analysis_cache.store
+
+        def counting_store(key: str, db_handle: sqlite3.Connection) -> None:
+            stored_keys.append(key)
+            store(key, db_handle)
+
+        monkeypatch.setattr(analysis_cache, "store", counting_store)
+
+        # Given I build every analysis stage with the analysis cache enabled
+        analyzer = MachoAnalyzer(self._parse_binary())
+        analyzer.warm()
+        # Then the database is saved once, after its last stage is built
+        assert len(stored_keys) == 1
+        # And closing the analyzer doesn't save it again
+        analyzer.close()
+        assert len(stored_keys) == 1
+
+        # And when an analyzer that built only some of the stages is closed, its analysis is saved
+        MachoAnalyzer.clear_cache()
+        for entry in analysis_cache.directory.glob("*.db"):
+            entry.unlink()
+        partial_analyzer = MachoAnalyzer(self._parse_binary())
+        partial_analyzer.warm(["function_boundaries"])
+        assert len(stored_keys) == 1
+        partial_analyzer.close()
+        assert len(stored_keys) == 2
+
+    def test_removes_entries_from_other_versions(self, tmp_path: pathlib.Path) -> None:
+        # Given a cache directory containing an entry written by another version of strongarm
+        cache_dir = tmp_path / "analysis_cache"
+        cache_dir.mkdir()
+        stale_entry = cache_dir / "0123abcd-1.0.0-1.db"
+        stale_entry.write_bytes(b"stale")
+        current_entry = cache_dir / f"0123abcd-{MachoAnalysisCache(cache_dir).version_tag}.db"
+        current_entry.write_bytes(b"current")
+
+        # If I open the cache
+        MachoAnalysisCache(cache_dir)
+
+        # Then only the entry written by this version is kept
+        assert not stale_entry.exists()
+        assert current_entry.exists()
+
+    def test_evicts_least_recently_used_entries(self, tmp_path: pathlib.Path) -> None:
+        # Given a cache that only has room for one database
+        analysis_cache = MachoAnalysisCache(tmp_path / "analysis_cache", max_size_bytes=1)
+        db_handle = sqlite3.connect(":memory:")
+        db_handle.execute("CREATE TABLE t(x INT)")
+
+        # If I store two entries
+        analysis_cache.store("first", db_handle)
+        analysis_cache.store("second", db_handle)
+
+        # Then the older entry is evicted
+        assert [x.name for x in analysis_cache.directory.glob("*.db")] == ["second.db"]
+        # And restoring the evicted entry misses
+        assert not analysis_cache.restore("first", tmp_path / "restored.db")
+        assert analysis_cache.restore("second", tmp_path / "restored.db")
+
+
+class TestParallelFunctionBoundaries:
+    FAT_PATH = pathlib.Path(__file__).parent / "bin" / "StrongarmTarget"
+
+    def test_parallel_computation_matches_serial(self, monkeypatch: Any) -> None:
+        # Given an analyzer that computes function boundaries in-process
+        serial_analyzer = MachoAnalyzer(MachoParser(self.FAT_PATH).slices[0])
+
+        # If I analyze the same binary using a pool of worker processes
+        monkeypatch.setattr(MachoAnalyzer, "FUNCTION_BOUNDARY_WORKERS", 2)
+        monkeypatch.setattr(MachoAnalyzer, "FUNCTION_BOUNDARY_MIN_CHUNK_SIZE", 2)
+        binary = MachoParser(self.FAT_PATH).slices[0]
+        # The binary is mapped from its file, which lets the workers read it
+        assert binary.get_backing_file_region() is not None
+        parallel_analyzer = MachoAnalyzer(binary)
+
+        # Then the same function boundaries and basic blocks are found
+        assert parallel_analyzer.get_function_boundaries() == serial_analyzer.get_function_boundaries()
+        for entry_point, _ in serial_analyzer.get_function_boundaries():
+            assert parallel_analyzer.get_basic_block_boundaries(
+                entry_point
+            ) == serial_analyzer.get_basic_block_boundaries(entry_point)
+
+        MachoAnalyzer.clear_cache()
+
+
+class TestMachoAnalyzerCache:
+    BINARY_PATH = pathlib.Path(__file__).parent / "bin" / "Xcode14_objc_stubs"
+
+    @pytest.fixture(autouse=True)
+    def restore_default_cache(self) -> Generator[None, None, None]:
+        default_cache = MachoAnalyzer.get_cache()
+        yield
+        MachoAnalyzer.set_cache(default_cache)
+
+    def _parse_binary(self) -> MachoBinary:
+        return MachoParser(self.BINARY_PATH).slices[0]
+
+    def test_counts_hits_and_misses(self) -> None:
+        # Given an empty analyzer cache
+        MachoAnalyzer.set_cache(MachoAnalyzerCache())
+        binary = self._parse_binary()
+
+        # If I request the analyzer for a binary twice
+        first_analyzer = MachoAnalyzer.get_analyzer(binary)
+        second_analyzer = MachoAnalyzer.get_analyzer(binary)
+
+        # Then the analyzer is only created once
+        assert first_analyzer is second_analyzer
+        # And the lookups are counted
+        cache = MachoAnalyzer.get_cache()
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 0)
+
+    def test_replacing_cached_analyzer_keeps_it_open(self) -> None:
+        # Given a binary with a cached analyzer
+        binary = self._parse_binary()
+        first_analyzer = MachoAnalyzer.get_analyzer(binary)
+
+        # If I construct another analyzer for the binary directly
+        second_analyzer = MachoAnalyzer(binary)
+
+        # Then the new analyzer replaces the cache entry
+        assert MachoAnalyzer.get_analyzer(binary) is second_analyzer
+        # And the replaced analyzer's database is still usable
+        assert first_analyzer._db_tempdir.exists()
+        assert first_analyzer.get_function_boundaries()
+
+    def test_evicts_least_recently_used_analyzer(self) -> None:
+        # Given a cache that holds at most two analyzers
+        MachoAnalyzer.set_cache(MachoAnalyzerCache(max_entries=2))
+        binaries = [self._parse_binary() for _ in range(3)]
+        analyzers = [MachoAnalyzer.get_analyzer(binary) for binary in binaries[:2]]
+        # And the first analyzer was used more recently than the second
+        MachoAnalyzer.get_analyzer(binaries[0])
+
+        # If I create a third analyzer
+        MachoAnalyzer.get_analyzer(binaries[2])
+
+        # Then the least-recently-used analyzer is evicted
+        cache = MachoAnalyzer.get_cache()
+        assert cache.evictions == 1
+        assert binaries[0] in cache
+        assert binaries[1] not in cache
+        assert binaries[2] in cache
+        # And its database is deleted
+        assert not analyzers[1]._db_tempdir.exists()
+        assert analyzers[0]._db_tempdir.exists()
+
+    def test_evicts_by_database_size(self) -> None:
+        # Given a cache whose size limit is smaller than any analyzer's database
+        MachoAnalyzer.set_cache(MachoAnalyzerCache(max_bytes=1))
+        first_binary, second_binary = self._parse_binary(), self._parse_binary()
+        MachoAnalyzer.get_analyzer(first_binary)
+
+        # If I create another analyzer
+        MachoAnalyzer.get_analyzer(second_binary)
+
+        # Then only the most recently created analyzer is kept
+        cache = MachoAnalyzer.get_cache()
+        assert first_binary not in cache
+        assert second_binary in cache
+        assert cache.evictions == 1
+
+    def test_weak_cache_frees_analyzer_with_binary(self) -> None:
+        # Given a cache that holds analyzers weakly
+        MachoAnalyzer.set_cache(MachoAnalyzerCache(weak=True))
+        binary = self._parse_binary()
+        analyzer = MachoAnalyzer.get_analyzer(binary)
+        db_tempdir = analyzer._db_tempdir
+        assert MachoAnalyzer.get_analyzer(binary) is analyzer
+        assert len(MachoAnalyzer.get_cache()) == 1
+
+        # If I drop the last references to the binary and its analyzer
+        del binary
+        del analyzer
+        # (The binary and analyzer refer to each other, so they're freed by the cyclic garbage collector)
+        gc.collect()
+
+        # Then the analyzer is removed from the cache
+        assert len(MachoAnalyzer.get_cache()) == 0
+        # And its database is deleted
+        assert not db_tempdir.exists()
+
+
+class TestMachoAnalyzerStages:
+    FAT_PATH = pathlib.Path(__file__).parent / "bin" / "StrongarmTarget"
+
+    def setup_method(self) -> None:
+        # Parse a fresh binary so that its analyzer hasn't built any stages yet
+        self.analyzer = MachoAnalyzer.get_analyzer(MachoParser(self.FAT_PATH).slices[0])
+
+    def teardown_method(self) -> None:
+        MachoAnalyzer.clear_cache()
+
+    def test_metadata_queries_skip_disassembly(self, monkeypatch: Any) -> None:
+        # Given an analyzer which fails if it disassembles the binary
+        def fail(*args: Any) -> None:
+            raise AssertionError("Expected the binary not to be disassembled")
+
+        monkeypatch.setattr(MachoAnalyzer, "_build_function_boundaries_index", fail)
+        monkeypatch.setattr(MachoAnalyzer, "_build_imp_stubs", fail)
+
+        # If I query metadata which doesn't depend on disassembly
+        # Then the queries succeed without the disassembly stages being built
+        assert self.analyzer.exported_symbol_pointers_to_names
+        assert self.analyzer.objc_classes()
+        assert "function_boundaries" not in self.analyzer._built_stages
+
+    def test_warm_builds_dependencies(self) -> None:
+        # If I warm the analyzer's XRefs
+        self.analyzer.warm(stages=["xrefs"])
+
+        # Then the XRefs and the stages they depend on are built
+        assert self.analyzer._built_stages == {
+            "string_table",
+            "imp_stubs",
+            "callable_symbols",
+            "function_boundaries",
+            "xrefs",
+        }
+        # And the string maps are left for later
+        assert "cfstring_map" not in self.analyzer._built_stages
+
+        # If I warm every stage
+        self.analyzer.warm()
+        # Then all of them are built
+        assert self.analyzer._built_stages == set(ANALYZER_STAGE_DEPENDENCIES)
+
+    def test_warm_rejects_unknown_stages(self) -> None:
+        with pytest.raises(ValueError, match="Unknown MachoAnalyzer stages: not_a_stage"):
+            self.analyzer.warm(stages=["not_a_stage"])
@@ -0,0 +1,163 @@
+import pathlib
+from typing import Any, List, Tuple
+
+from strongarm.macho import MachoAnalyzer, MachoParser, VirtualMemoryPointer
+from strongarm.macho.macho_export_trie import ExportSymbolFlags, MachoExportTrie
+
+
+def _trie_node(terminal: bytes, children: List[Tuple[bytes, int]]) -> bytes:
+    # Every size and offset in these tests fits in a single-byte ULEB
+    edges = b"".join(edge_label + b"\x00" + bytes([child_offset]) for edge_label, child_offset in children)
+    return bytes([len(terminal)]) + terminal + bytes([len(children)]) + edges
+
+
+def _build_trie() -> bytes:
+    """Build a trie exporting _abs (absolute), _reexported (re-exported from another library) and _stub (resolver)."""
+    leaves = [
+        # EXPORT_SYMBOL_FLAGS_KIND_ABSOLUTE, value 0x1234
+        (b"abs", _trie_node(b"\x02\xb4\x24", [])),
+        # EXPORT_SYMBOL_FLAGS_REEXPORT, library ordinal 2, named _other in that library
+        (b"reexported", _trie_node(b"\x08\x02_other\x00", [])),
+        # EXPORT_SYMBOL_FLAGS_STUB_AND_RESOLVER, stub at +0x100, resolver at +0x200
+        (b"stub", _trie_node(b"\x10\x80\x02\x80\x04", [])),
+    ]
+    root = _trie_node(b"", [(b"_", 0)])
+    underscore_node_size = len(_trie_node(b"", [(edge_label, 0) for edge_label, _ in leaves]))
+
+    leaf_offset = len(root) + underscore_node_size
+    underscore_children = []
+    for edge_label, leaf in leaves:
+        underscore_children.append((edge_label, leaf_offset))
+        leaf_offset += len(leaf)
+
+    root = _trie_node(b"", [(b"_", len(root))])
+    return root + _trie_node(b"", underscore_children) + b"".join(leaf for _, leaf in leaves)
+
+
+class TestMachoExportTrie:
+    # Built by an older linker, which sometimes places a symbol below an empty edge label
+    ENCRYPTED_PATH = pathlib.Path(__file__).parent / "bin" / "EncryptedBinary"
+    OBJC_STUBS_PATH = pathlib.Path(__file__).parent / "bin" / "Xcode14_objc_stubs"
+
+    def test_symbol_kinds(self) -> None:
+        # Given an export trie containing each kind of symbol
+        trie = MachoExportTrie(_build_trie(), VirtualMemoryPointer(0x100000000))
+
+        # Then absolute symbols aren't relative to the virtual base
+        absolute = trie.lookup("_abs")
+        assert absolute
+        assert absolute.flags == ExportSymbolFlags.EXPORT_SYMBOL_FLAGS_KIND_ABSOLUTE
+        assert absolute.address == VirtualMemoryPointer(0x1234)
+
+        # And re-exported symbols have no address, but name the library and symbol that they come from
+        reexported = trie.lookup("_reexported")
+        assert reexported
+        assert reexported.address is None
+        assert reexported.library_ordinal == 2
+        assert reexported.imported_name == "_other"
+
+        # And symbols with a resolver provide both the stub and resolver addresses
+        stub = trie.lookup("_stub")
+        assert stub
+        assert stub.address == VirtualMemoryPointer(0x100000100)
+        assert stub.resolver == VirtualMemoryPointer(0x100000200)
+
+        # And names that aren't exported, including the prefixes of exported names, aren't found
+        assert trie.lookup("_") is None
+        assert trie.lookup("_ab") is None
+        assert trie.lookup("_abss") is None
+        assert trie.lookup("_missing") is None
+
+        # And every symbol is enumerated in the trie's order
+        assert [symbol.name for symbol in trie] == ["_abs", "_reexported", "_stub"]
+
+    def test_empty_trie(self) -> None:
+        trie = MachoExportTrie(b"", VirtualMemoryPointer(0x100000000))
+        assert list(trie) == []
+        assert trie.lookup("_main") is None
+
+    def test_enumerate_and_lookup(self) -> None:
+        # Given a binary whose export trie places some symbols below empty edge labels
+        binary = MachoParser(self.ENCRYPTED_PATH).get_arm64_slice()
+        assert binary and binary.export_trie
+        trie = binary.export_trie
+
+        # If I enumerate the symbols in the export trie
+        exported_symbols = list(trie)
+
+        # Then every symbol is found, with the addresses reported by `llvm-objdump --macho --exports-trie`
+        assert len(exported_symbols) == 203
+        exported_names_to_addresses = {symbol.name: symbol.address for symbol in exported_symbols}
+        assert exported_names_to_addresses["_RxTestVersionNumber"] == VirtualMemoryPointer(0x1A4C0)
+        swift_error_name = "__T06RxTest8RecordedV5errorACy0A5Swift5EventOyqd__GGSi_s5Error_pqd__mtAHRszlFZ"
+        assert exported_names_to_addresses[swift_error_name] == VirtualMemoryPointer(0x15420)
+        assert exported_names_to_addresses[swift_error_name + "fA1_"] == VirtualMemoryPointer(0x4DDC)
+
+        # And each symbol can be looked up by name
+        for symbol in exported_symbols:
+            assert trie.lookup(symbol.name) == symbol
+
+    def test_symbols_with_prefix(self) -> None:
+        # Given a binary with an export trie
+        binary = MachoParser(self.OBJC_STUBS_PATH).get_arm64_slice()
+        assert binary and binary.export_trie
+
+        # If I enumerate the symbols with a prefix
+        # Then only the subtree below the prefix is returned, even when the prefix ends within an edge label
+        assert [symbol.name for symbol in binary.export_trie.symbols_with_prefix("_OBJC_")] == [
+            "_OBJC_CLASS_$_SourceClass",
+            "_OBJC_METACLASS_$_SourceClass",
+        ]
+        assert [symbol.name for symbol in binary.export_trie.symbols_with_prefix("_OBJC_META")] == [
+            "_OBJC_METACLASS_$_SourceClass"
+        ]
+        assert list(binary.export_trie.symbols_with_prefix("_NS")) == []
+
+    def test_analyzer_exported_symbols_include_export_trie(self) -> None:
+        # Given a binary with an export trie
+        binary = MachoParser(self.OBJC_STUBS_PATH).get_arm64_slice()
+        assert binary and binary.export_trie
+        analyzer = MachoAnalyzer.get_analyzer(binary)
+
+        # Then each symbol in the export trie is reported as an exported symbol
+        for symbol in binary.export_trie:
+            assert analyzer.exported_symbol_names_to_pointers[symbol.name] == symbol.address
+
+    def test_analyzer_exported_symbols_without_symbol_table(self, monkeypatch: Any) -> None:
+        # Given a binary with an export trie, whose symbol table defines no symbols (as in a stripped binary)
+        binary = MachoParser(self.OBJC_STUBS_PATH).get_arm64_slice()
+        assert binary and binary.export_trie
+        analyzer = MachoAnalyzer.get_analyzer(binary)
+        monkeypatch.setattr(analyzer.crossref_helper, "exported_symbols", {})
+
+        # Then each symbol in the export trie can be looked up by name and by address
+        for symbol in binary.export_trie:
+            assert analyzer.exported_symbol_names_to_pointers[symbol.name] == symbol.address
+            assert analyzer.exported_symbol_name_for_address(symbol.address) == symbol.name
+        # And the two directions agree
+        assert analyzer.exported_symbol_names_to_pointers == {
+            name: address for address, name in analyzer.exported_symbol_pointers_to_names.items()
+        }
+
+    def test_analyzer_exported_symbols_skip_absolute_and_duplicate_names(self, monkeypatch: Any) -> None:
+        # Given a binary whose export trie contains an absolute symbol, and a resolver symbol at its stub address
+        binary = MachoParser(self.OBJC_STUBS_PATH).get_arm64_slice()
+        assert binary
+        virtual_base = binary.get_virtual_base()
+        monkeypatch.setattr(binary, "_export_trie", MachoExportTrie(_build_trie(), virtual_base))
+        # And whose symbol table places the resolver symbol at its implementation
+        analyzer = MachoAnalyzer.get_analyzer(binary)
+        resolver_implementation = VirtualMemoryPointer(virtual_base + 0x300)
+        monkeypatch.setattr(analyzer.crossref_helper, "exported_symbols", {resolver_implementation: "_stub"})
+
+        # Then the absolute symbol isn't reported, as it isn't an address within the binary
+        assert "_abs" not in analyzer.exported_symbol_names_to_pointers
+        assert VirtualMemoryPointer(0x1234) not in analyzer.exported_symbol_pointers_to_names
+        # And the resolver symbol is only reported at the address the symbol table gives it
+        assert analyzer.exported_symbol_names_to_pointers["_stub"] == resolver_implementation
+        assert VirtualMemoryPointer(virtual_base + 0x100) not in analyzer.exported_symbol_pointers_to_names
+        # And it's a single callable symbol
+        callable_symbol = analyzer.callable_symbol_for_symbol_name("_stub")
+        assert callable_symbol
+        assert callable_symbol.address == resolver_implementation
+        assert analyzer.callable_symbol_for_symbol_name("_abs") is None
@@ -1,6 +1,6 @@
 import pathlib
 
-from strongarm.macho import MachoStringTableHelper, VirtualMemoryPointer
+from strongarm.macho import LazyStringTable, MachoStringTableHelper, VirtualMemoryPointer
 from strongarm.macho.macho_parse import MachoParser
 
 
@@ -65,3 +65,66 @@ class TestMachoStringParser:
         symbol_name = self.string_helper.get_symbol_name_for_address(address)
         # The name is the expected value
         assert symbol_name == "__mh_execute_header"
+
+    def test_transform_string_section(self) -> None:
+        # Given a packed string table containing an empty entry, a non-ASCII entry, invalid UTF-8,
+        # and trailing bytes that aren't NULL-terminated
+        strtab = b"\x00_main\x00caf\xc3\xa9\x00\xff\xfe\x00unterminated"
+
+        # If I transform it, from its bytes or from a view of them
+        for data in (strtab, memoryview(strtab)):
+            entries = MachoStringTableHelper.transform_string_section(data)
+
+            # Then each NULL-terminated entry is keyed by its start offset
+            assert {idx: (e.start_idx, e.length, e.full_string) for idx, e in entries.items()} == {
+                0: (0, 0, ""),
+                1: (1, 5, "_main"),
+                7: (7, 5, "café"),
+                13: (13, 2, "b'\\xff\\xfe'"),
+            }
+
+    def test_raw_string_table_is_view(self) -> None:
+        # The raw string table is returned without copying it out of the binary
+        strtab = self.binary.get_raw_string_table()
+        assert isinstance(strtab, memoryview)
+        entries = MachoStringTableHelper.transform_string_section(strtab)
+        assert {k: v.full_string for k, v in entries.items()} == {
+            k: v.full_string for k, v in self.string_helper.string_table_entries.items()
+        }
+
+    def test_lazy_string_table(self) -> None:
+        # Given a string helper that decodes its string table on demand
+        lazy_helper = MachoStringTableHelper(self.binary, lazy=True)
+        assert isinstance(lazy_helper.string_table_entries, LazyStringTable)
+
+        # Then it finds the same symbols as the helper which decodes everything up front
+        assert lazy_helper.imported_symbols == self.string_helper.imported_symbols
+        assert lazy_helper.exported_symbols == self.string_helper.exported_symbols
+        # And it has the same entries
+        assert list(lazy_helper.string_table_entries) == list(self.string_helper.string_table_entries)
+        for start_idx, entry in self.string_helper.string_table_entries.items():
+            lazy_entry = lazy_helper.string_table_entry_for_strtab_index(start_idx)
+            assert lazy_entry
+            assert (lazy_entry.start_idx, lazy_entry.length, lazy_entry.full_string) == (
+                entry.start_idx,
+                entry.length,
+                entry.full_string,
+            )
+
+    def test_lazy_string_table_lookups(self) -> None:
+        # Given a lazy string table which memoizes at most 2 entries
+        string_table = LazyStringTable(b"\x00_main\x00_start\x00_exit\x00unterminated", max_cached_entries=2)
+        assert len(string_table) == 4
+
+        # When I look up the start of an entry
+        # Then it's decoded
+        assert string_table[1].full_string == "_main"
+        assert string_table[7].full_string == "_start"
+        assert string_table[14].full_string == "_exit"
+        # And only the most recently used entries are kept
+        assert list(string_table._cached_entries) == [7, 14]
+
+        # When I look up an index which isn't the start of a NULL-terminated entry
+        # Then there's no entry
+        for idx in (2, 20, 100, -1):
+            assert string_table.get(idx) is None
@@ -1,6 +1,6 @@
 import pathlib
 from distutils.version import LooseVersion
-from typing import List
+from typing import Iterable, List, Optional, Tuple
 from unittest.mock import MagicMock
 
 from strongarm.macho import MachoParser, ObjcCategory, ObjcMethodStruct, ObjcRuntimeDataParser, ObjcSelector
@@ -111,6 +111,81 @@ class TestObjcRuntimeDataParser:
         assert selector.name == "allowsAnyHTTPSCertificateForHost:"
         assert selector.implementation == 0x100005028
 
+    def test_lookup_indexes(self) -> None:
+        # Given a binary with many classes implementing the same selectors
+        binary = MachoParser(TestObjcRuntimeDataParser.CATEGORY_PATH).slices[0]
+        objc_parser = ObjcRuntimeDataParser(binary)
+
+        # Then every IMP of a selector is found, in the order of the class list
+        imps = objc_parser.get_method_imp_addresses("Parse:scannedText:")
+        assert len(imps) == 48
+        assert imps[:3] == [0x1000309F8, 0x10003193C, 0x100031E18]
+        assert objc_parser.get_method_imp_addresses("fakeSelector") == []
+
+        # And selector names map to their selrefs
+        assert objc_parser.selrefs_for_selector_name("Parse:scannedText:") == [0x100112AF0]
+        assert objc_parser.selref_for_selector_name("Parse:scannedText:") == 0x100112AF0
+        assert objc_parser.selref_for_selector_name("fakeSelector") is None
+
+        # And classes and categories can be looked up by name
+        category = objc_parser.objc_class_for_name("_OBJC_CLASS_$_NSURLRequest (DataController)")
+        assert isinstance(category, ObjcCategory)
+        assert objc_parser.objc_class_for_name("V04_Generic") in objc_parser.classes
+        assert objc_parser.objc_class_for_name("FakeClass") is None
+
+        # And a method can be found from its IMP, or from its class and selector names
+        method = objc_parser.method_for_imp(VirtualMemoryPointer(0x100005028))
+        assert method
+        assert method[0] is category
+        assert method[1].name == "allowsAnyHTTPSCertificateForHost:"
+        assert objc_parser.method_for_signature(category.name, "allowsAnyHTTPSCertificateForHost:") == method
+        parse_method = objc_parser.method_for_signature("V04_Generic", "Parse:scannedText:")
+        assert parse_method
+        assert parse_method[1].implementation == 0x1000309F8
+        assert objc_parser.method_for_imp(VirtualMemoryPointer(0x100005029)) is None
+        assert objc_parser.method_for_signature(category.name, "fakeSelector") is None
+
+    def test_lazy_class_parsing(self) -> None:
+        # Given a binary with many classes and categories, parsed lazily
+        binary = MachoParser(TestObjcRuntimeDataParser.CATEGORY_PATH).slices[0]
+        eager_parser = ObjcRuntimeDataParser(binary, lazy=False)
+        lazy_parser = ObjcRuntimeDataParser(binary, lazy=True)
+        lazy_parser.read_selectors_from_methlist_ptr = MagicMock(  # type: ignore
+            wraps=lazy_parser.read_selectors_from_methlist_ptr
+        )
+
+        # Then the classes are listed without reading any method lists
+        assert [c.name for c in lazy_parser.classes] == [c.name for c in eager_parser.classes]
+        objc_class = lazy_parser.objc_class_for_name("V04_Generic")
+        assert objc_class
+        lazy_parser.read_selectors_from_methlist_ptr.assert_not_called()
+
+        # If I read a class's methods
+        selector_names = [sel.name for sel in objc_class.selectors]
+        # Then only that class's method lists are read, once
+        call_count = lazy_parser.read_selectors_from_methlist_ptr.call_count
+        assert 0 < call_count < len(lazy_parser.classes)
+        assert [sel.name for sel in objc_class.selectors] == selector_names
+        assert lazy_parser.read_selectors_from_methlist_ptr.call_count == call_count
+        eager_class = eager_parser.objc_class_for_name("V04_Generic")
+        assert eager_class
+        assert selector_names == [sel.name for sel in eager_class.selectors]
+
+        # And queries over every selector give the same results as an eager parse
+        def describe(selectors: Iterable[ObjcSelector]) -> List[Tuple[str, Optional[VirtualMemoryPointer]]]:
+            return [(sel.name, sel.implementation) for sel in selectors]
+
+        lazy_selrefs, eager_selrefs = lazy_parser.selrefs_to_selectors(), eager_parser.selrefs_to_selectors()
+        assert list(lazy_selrefs.keys()) == list(eager_selrefs.keys())
+        assert describe(lazy_selrefs.values()) == describe(eager_selrefs.values())
+        assert [p.name for p in lazy_parser.protocols] == [p.name for p in eager_parser.protocols]
+        for lazy_class, eager_class in zip(lazy_parser.classes, eager_parser.classes):
+            assert describe(lazy_class.selectors) == describe(eager_class.selectors)
+            assert [ivar.name for ivar in lazy_class.ivars] == [ivar.name for ivar in eager_class.ivars]
+        assert lazy_parser.path_for_external_symbol("_objc_msgSend") == eager_parser.path_for_external_symbol(
+            "_objc_msgSend"
+        )
+
     def test_parse_ivars(self) -> None:
         parser = MachoParser(TestObjcRuntimeDataParser.CATEGORY_PATH)
         binary = parser.get_arm64_slice()